@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What `import marketing_agency` used to pull in eagerly, for comparison
+EAGER_IMPORTS = "import requests, bs4, groq, dotenv, streamlit, pandas"
+
+def time_import(statement: str, runs: int) -> dict:
+    # Each run is a fresh interpreter; -X importtime reports cumulative microseconds per module on stderr
+    totals, slowest = [], {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                                cwd=REPO_ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            return {"statement": statement, "error": result.stderr.strip().splitlines()[-1]}
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, raw_name = line[len("import time:"):].split("|")
+            if not cumulative.strip().isdigit():
+                continue
+            name, cumulative = raw_name.strip(), int(cumulative)
+            # Nested imports are indented under their parent; top-level entries sum to the whole import cost
+            if not raw_name[1:].startswith(" "):
+                total += cumulative
+            slowest[name] = max(slowest.get(name, 0), cumulative)
+        totals.append(total / 1000)
+    top = sorted(slowest.items(), key=lambda item: -item[1])[:10]
+    return {
+        "statement": statement,
+        "runs": runs,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "slowest_modules_ms": {name: round(us / 1000, 1) for name, us in top}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of marketing_agency.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    report = {
+        "lazy": time_import("import marketing_agency", args.runs),
+        "eager_baseline": time_import(EAGER_IMPORTS, args.runs)
+    }
+    if "median_ms" in report["lazy"] and "median_ms" in report["eager_baseline"]:
+        report["saved_ms"] = round(report["eager_baseline"]["median_ms"] - report["lazy"]["median_ms"], 1)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixture_site import FixtureSite
+from benchmarks.mock_groq import MockGroqServer
+from benchmarks.run_bench import KEYWORDS, percentile
+
+# Compares model tiers on the prompts the tools actually send. Each tool is run once with completions captured
+# instead of sent, then every captured prompt is answered by each tier ("routed" is the configured routing)
+# and timed. Quality is measured with the checks the app itself relies on (JSON that parses into all sections
+# or scores, the requested number of lines, no cut-off answers) plus word overlap with the reference tier.
+# Offline, the mock API only makes latency and token budgets meaningful; pass --live for output quality.
+
+def capture_prompts(system, site: FixtureSite):
+    from marketing_agency import REPORT_AUDIENCE
+    from telemetry import current_tool
+
+    captured = {}
+
+    def capture(prompt, use_cache=True, placeholder=None, max_tokens=None, json_mode=False, semantic=None,
+                task=None, semantic_scope=""):
+        # One prompt per tool and task class; JSON prompts get an empty object so tools take their fallbacks
+        captured.setdefault((current_tool.get(), task or "default"),
+                            {"prompt": prompt, "json_mode": json_mode, "max_tokens": max_tokens})
+        return "{}" if json_mode else ""
+
+    system._get_completion = capture
+    system.seo_optimizer(f"{site.base_url}/page/0", KEYWORDS)
+    system.competitor_watchdog([f"{site.base_url}/page/1"], KEYWORDS, incremental=False, grounded=False)
+    system.post_creator("Trail running", "LinkedIn")
+    system.smart_email_manager("Promotional", REPORT_AUDIENCE[:1])
+    return captured
+
+def passes_checks(task: str, content: str, json_mode: bool) -> bool:
+    from marketing_agency import _load_json_object, structure_competitor_result
+    lines = [line for line in content.splitlines() if line.strip()]
+    if task == "scoring":
+        return all(score is not None for score in structure_competitor_result("", "", content)["scores"].values())
+    if task == "analysis":
+        return all(structure_competitor_result("", content, "")["sections"].values())
+    if json_mode:
+        return bool(_load_json_object(content))
+    if task == "short":
+        return len(lines) >= 5
+    if task == "summary":
+        return len(lines) >= 3
+    return len(content.split()) >= 20
+
+def overlap(text: str, reference: str) -> float:
+    words, reference_words = set(text.lower().split()), set(reference.lower().split())
+    return len(words & reference_words) / len(words | reference_words) if words | reference_words else 1.0
+
+def run_tier(system, router, captured, repeats: int):
+    from telemetry import tool_span
+    answers = {}
+    for (tool, task), item in captured.items():
+        route = router.route(task, tool)
+        max_tokens = item["max_tokens"] or route["max_tokens"]
+        request = system._completion_request(item["prompt"], route["model"], max_tokens, item["json_mode"])
+        for _ in range(repeats):
+            started = time.perf_counter()
+            with tool_span(tool):
+                completion = system.llm.create(**request)
+            answers.setdefault((tool, task), []).append({
+                "model": route["model"],
+                "max_tokens": max_tokens,
+                "latency": time.perf_counter() - started,
+                "content": completion.choices[0].message.content or "",
+                "truncated": completion.choices[0].finish_reason == "length",
+                "completion_tokens": completion.usage.completion_tokens if completion.usage else 0
+            })
+    return answers
+
+def summarize(tier, answers, captured, reference):
+    rows = []
+    for (tool, task), runs in answers.items():
+        references = reference.get((tool, task), [])
+        latencies = [run["latency"] for run in runs]
+        rows.append({
+            "tool": tool,
+            "task": task,
+            "tier": tier,
+            "model": runs[0]["model"],
+            "max_tokens": runs[0]["max_tokens"],
+            "p50_s": round(statistics.median(latencies), 3),
+            "p95_s": round(percentile(latencies, 0.95), 3),
+            "completion_tokens": round(statistics.mean(run["completion_tokens"] for run in runs), 1),
+            "valid_pct": round(100 * sum(passes_checks(task, run["content"], captured[(tool, task)]["json_mode"])
+                                         for run in runs) / len(runs), 1),
+            "truncated_pct": round(100 * sum(run["truncated"] for run in runs) / len(runs), 1),
+            "overlap_vs_reference": round(statistics.mean(
+                overlap(run["content"], ref["content"]) for run, ref in zip(runs, references)
+            ), 3) if references else None
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and output quality of each model tier per task class.")
+    parser.add_argument("--repeats", type=int, default=3, help="Answers per prompt and tier")
+    parser.add_argument("--tiers", default="", help="Comma-separated tiers (default: every configured tier)")
+    parser.add_argument("--reference", default="quality", help="Tier the others are compared against")
+    parser.add_argument("--live", action="store_true", help="Use the real Groq API (needs GROQ_API_KEY)")
+    parser.add_argument("--requests-per-minute", type=int, default=30, help="Rate limit for --live")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0, help="Mock rate of the default tier")
+    parser.add_argument("--fast-speedup", type=float, default=4.0, help="Mock rate multiplier for the fast tier")
+    parser.add_argument("--completion-tokens", type=int, default=400, help="Mock natural answer length")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    from model_routing import ModelRouter
+    router = ModelRouter()
+    site = FixtureSite(("127.0.0.1", 0), 5, 20).start()
+    workdir = tempfile.mkdtemp(prefix="brandpulse-tiers-")
+    os.environ.update({
+        "BRANDPULSE_CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "BRANDPULSE_JOBS_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "BRANDPULSE_RESULTS_PATH": os.path.join(workdir, "results.sqlite3"),
+        "BRANDPULSE_SITE_INDEX_PATH": os.path.join(workdir, "site.sqlite3")
+    })
+    requests_per_minute = args.requests_per_minute
+    if not args.live:
+        fast_model = router.tiers.get("fast", {}).get("model")
+        mock = MockGroqServer(("127.0.0.1", 0), args.latency, args.tokens_per_second, args.completion_tokens,
+                              {fast_model: args.tokens_per_second * args.fast_speedup} if fast_model else None).start()
+        os.environ.update({"GROQ_API_KEY": "bench-key", "GROQ_BASE_URL": mock.base_url})
+        requests_per_minute = 100000
+
+    from marketing_agency import MarketingAgencyAutomation
+    system = MarketingAgencyAutomation(requests_per_minute=requests_per_minute)
+    captured = capture_prompts(MarketingAgencyAutomation(requests_per_minute=requests_per_minute), site)
+
+    tiers = [tier.strip() for tier in args.tiers.split(",") if tier.strip()] or list(router.tiers)
+    routers = {tier: router.pinned(tier) for tier in tiers}
+    routers["routed"] = router
+    answers = {tier: run_tier(system, tier_router, captured, args.repeats) for tier, tier_router in routers.items()}
+    reference = answers.get(args.reference, {})
+    results = [row for tier in routers for row in summarize(tier, answers[tier], captured, reference)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    if not args.live:
+        print("Mock API: latency and budgets are meaningful, output quality is not (use --live)\n")
+    print(f"{'tool':<22}{'task':<11}{'tier':<9}{'model':<26}{'budget':>7}{'p50 s':>8}{'p95 s':>8}"
+          f"{'tokens':>8}{'valid %':>9}{'cut %':>7}{'overlap':>9}")
+    for row in sorted(results, key=lambda row: (row["tool"], row["task"], row["tier"])):
+        overlap_text = "-" if row["overlap_vs_reference"] is None else row["overlap_vs_reference"]
+        print(f"{row['tool']:<22}{row['task']:<11}{row['tier']:<9}{row['model']:<26}{row['max_tokens']:>7}"
+              f"{row['p50_s']:>8}{row['p95_s']:>8}{row['completion_tokens']:>8}{row['valid_pct']:>9}"
+              f"{row['truncated_pct']:>7}{overlap_text:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Fixture Page {index} &ndash; Running Shoes</title>
+<meta name="description" content="Fixture landing page {index} about running shoes and trail gear.">
+<link rel="stylesheet" href="/static/site.css">
+</head>
+<body>
+<header><nav>{nav}</nav></header>
+<h1>Running Shoes Collection {index}</h1>
+<main>{body}</main>
+<h1 class="secondary">Why runners choose us</h1>
+</body>
+</html>
+"""
+
+class FixtureSite(ThreadingHTTPServer):
+    # Serves deterministic landing pages (/page/<n>) and a /sitemap.xml listing them, with ETag support
+    daemon_threads = True
+
+    def __init__(self, address, pages: int = 50, page_kb: int = 200):
+        super().__init__(address, FixtureHandler)
+        self.pages = pages
+        self.page_kb = page_kb
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def page_urls(self):
+        return [f"{self.base_url}/page/{index}" for index in range(self.pages)]
+
+    def render(self, index: int) -> bytes:
+        nav = "".join(f'<a href="/page/{i}">Page {i}</a>' for i in range(min(self.pages, 20)))
+        paragraph = "<p>Lightweight cushioning, breathable mesh and durable outsoles for every distance.</p>\n"
+        body = paragraph * max(1, self.page_kb * 1024 // len(paragraph))
+        return PAGE_TEMPLATE.format(index=index, nav=nav, body=body).encode("utf-8")
+
+    def start(self) -> "FixtureSite":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server: FixtureSite
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        with self.server._lock:
+            self.server.requests += 1
+        if self.path == "/sitemap.xml":
+            urls = "".join(f"<url><loc>{url}</loc></url>" for url in self.server.page_urls())
+            body = f'<?xml version="1.0" encoding="UTF-8"?>' \
+                   f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+            self._send(body.encode("utf-8"), "application/xml")
+            return
+        if self.path.startswith("/page/") and self.path[6:].isdigit() and int(self.path[6:]) < self.server.pages:
+            self._send(self.server.render(int(self.path[6:])), "text/html; charset=utf-8")
+            return
+        if self.path == "/" or self.path == "":
+            self._send(self.server.render(0), "text/html; charset=utf-8")
+            return
+        self.send_error(404)
+
+    def _send(self, body: bytes, content_type: str):
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local fixture pages for SEO benchmarks.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-kb", type=int, default=200)
+    args = parser.parse_args()
+    site = FixtureSite(("127.0.0.1", args.port), args.pages, args.page_kb)
+    print(f"Fixture site on {site.base_url} (sitemap at {site.base_url}/sitemap.xml)")
+    site.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+SEGMENTS_RE = re.compile(r"Audience Segments: (\[.*?\])\n", re.DOTALL)
+SECTIONS_SCHEMA_RE = re.compile(r'^\s*(\{"sections": .*\})\s*$', re.MULTILINE)
+METRIC_RE = re.compile(r"^\s*\d+\. (.+?) \(0-100\)", re.MULTILINE)
+POST_DATES_RE = re.compile(r"publishing dates: ([\d\-, ]+)\.")
+FILLER = ("Focus on clear positioning, consistent publishing and measurable calls to action "
+          "while tracking keyword coverage and engagement against competitors").split()
+
+class MockGroqServer(ThreadingHTTPServer):
+    # OpenAI/Groq-compatible chat completions with a fixed time-to-first-token and a steady token rate.
+    # model_tokens_per_second gives individual models their own rate, e.g. a faster small tier.
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.3, tokens_per_second: float = 250.0,
+                 completion_tokens: int = 200, model_tokens_per_second: Optional[Dict[str, float]] = None):
+        super().__init__(address, MockGroqHandler)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.model_tokens_per_second = model_tokens_per_second or {}
+        self.completion_tokens = completion_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def record(self, prompt_tokens: int) -> int:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            return self.calls
+
+    def speed(self, model: str) -> float:
+        return self.model_tokens_per_second.get(model, self.tokens_per_second)
+
+    def start(self) -> "MockGroqServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def mock_content(request: Dict[str, Any], tokens: int) -> str:
+    prompt = request["messages"][-1]["content"]
+    words = [FILLER[i % len(FILLER)] for i in range(tokens)]
+    if request.get("response_format", {}).get("type") != "json_object":
+        return " ".join(words)
+    # JSON mode: answer the batched email, competitor and calendar prompts in the shapes the app asks for
+    post_dates = POST_DATES_RE.search(prompt)
+    if post_dates:
+        return json.dumps({"posts": [
+            {"date": day.strip(), "content": " ".join(words), "hashtags": ["#running"], "call_to_action": "Shop now"}
+            for day in post_dates.group(1).split(",")
+        ]})
+    schema = SECTIONS_SCHEMA_RE.search(prompt)
+    if schema:
+        return json.dumps({"sections": {name: " ".join(words) for name in json.loads(schema.group(1))["sections"]}})
+    metrics = METRIC_RE.findall(prompt)
+    if metrics:
+        return json.dumps({"metrics": [
+            {"name": name, "score": 40 + (7 * index) % 60, "justification": " ".join(words[:20])}
+            for index, name in enumerate(metrics)
+        ]})
+    match = SEGMENTS_RE.search(prompt)
+    segments = json.loads(match.group(1)) if match else []
+    return json.dumps({"segments": [
+        {"segment_name": segment["segment_name"], "content": " ".join(words),
+         "subject_lines": [f"Subject {i + 1}" for i in range(5)]}
+        for segment in segments
+    ]})
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    server: MockGroqServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        prompt_tokens = len(request["messages"][-1]["content"].split())
+        completion_tokens = min(self.server.completion_tokens, request.get("max_tokens") or self.server.completion_tokens)
+        # An answer cut off by max_tokens is reported the way the real API does
+        finish_reason = "length" if completion_tokens < self.server.completion_tokens else "stop"
+        tokens_per_second = self.server.speed(request["model"])
+        self.server.record(prompt_tokens)
+        content = mock_content(request, completion_tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        time.sleep(self.server.latency)
+
+        if request.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            pieces = content.split(" ")
+            for index, piece in enumerate(pieces):
+                time.sleep(1 / tokens_per_second)
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": request["model"],
+                         "choices": [{"index": 0, "delta": {"content": piece + (" " if index < len(pieces) - 1 else "")},
+                                      "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        time.sleep(completion_tokens / tokens_per_second)
+        body = json.dumps({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-ratelimit-remaining-requests", "10000")
+        self.send_header("x-ratelimit-reset-requests", "1s")
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Groq chat completions API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    parser.add_argument("--completion-tokens", type=int, default=200)
+    args = parser.parse_args()
+    server = MockGroqServer(("127.0.0.1", args.port), args.latency, args.tokens_per_second, args.completion_tokens)
+    print(f"Mock Groq API on {server.base_url} (set GROQ_BASE_URL to this)")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixture_site import FixtureSite
+from benchmarks.mock_groq import MockGroqServer
+
+KEYWORDS = ["running shoes", "trail gear"]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def build_scenarios(site: FixtureSite):
+    from marketing_agency import REPORT_AUDIENCE, build_report_graph
+    competitors = [f"{site.base_url}/page/{index}" for index in (1, 2, 3)]
+    return {
+        "seo_optimizer": lambda system: system.seo_optimizer(f"{site.base_url}/page/0", KEYWORDS),
+        "competitor_watchdog": lambda system: system.competitor_watchdog(competitors, KEYWORDS),
+        "smart_email_manager": lambda system: system.smart_email_manager("Promotional", REPORT_AUDIENCE),
+        "content_calendar": lambda system: system.content_calendar(
+            ["Trail running", "Marathon training"], ["LinkedIn", "Instagram"], ["professional"],
+            [date(2025, 3, 24) + timedelta(days=offset) for offset in range(10)]),
+        "seo_batch_audit": lambda system: system.seo_batch_audit(sitemap_url=f"{site.base_url}/sitemap.xml"),
+        "comprehensive_report": lambda system: build_report_graph(
+            system, f"{site.base_url}/page/0", "Fixture Brand", "Sportswear", KEYWORDS, competitors,
+            datetime(2025, 3, 24)).run()
+    }
+
+def run_scenario(name, scenario, mock: MockGroqServer, iterations: int, concurrency: int, warm_cache: bool,
+                 coalesce: bool, workdir: str):
+    from completion_cache import CompletionCache
+    from competitor_store import CompetitorStore
+    from marketing_agency import MarketingAgencyAutomation
+    from semantic_cache import SemanticCache
+    from singleflight import set_coalescing
+    from site_index import SiteIndex
+
+    shared_cache = CompletionCache(os.path.join(workdir, f"{name}.sqlite3"))
+    shared_store = CompetitorStore(os.path.join(workdir, f"{name}-results.sqlite3"))
+    shared_index = SiteIndex(os.path.join(workdir, f"{name}-site.sqlite3"))
+    shared_semantic = SemanticCache(os.path.join(workdir, f"{name}-semantic.sqlite3"))
+    # Concurrent runs send identical prompts, so unless --coalesce is given they are kept from sharing calls
+    # and fetches; otherwise "cold" runs would mostly wait on each other's requests
+    set_coalescing(coalesce)
+
+    def one_run(iteration):
+        # Cold caches per run measure real round trips; --warm-cache measures the cached and incremental paths
+        if warm_cache:
+            cache, store, index, semantic = shared_cache, shared_store, shared_index, shared_semantic
+        else:
+            cache = CompletionCache(os.path.join(workdir, f"{name}-{iteration}.sqlite3"))
+            store = CompetitorStore(os.path.join(workdir, f"{name}-{iteration}-results.sqlite3"))
+            index = SiteIndex(os.path.join(workdir, f"{name}-{iteration}-site.sqlite3"))
+            semantic = SemanticCache(os.path.join(workdir, f"{name}-{iteration}-semantic.sqlite3"))
+        system = MarketingAgencyAutomation(requests_per_minute=100000, cache=cache, competitor_store=store,
+                                           site_index=index, semantic_cache=semantic)
+        started = time.perf_counter()
+        scenario(system)
+        return time.perf_counter() - started
+
+    calls_before = mock.calls
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one_run, range(iterations)))
+    wall = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "p50_s": round(statistics.median(latencies), 3),
+        "p95_s": round(percentile(latencies, 0.95), 3),
+        "llm_calls_per_run": round((mock.calls - calls_before) / iterations, 2),
+        "throughput_runs_per_s": round(iterations / wall, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks against a mock Groq API.")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs in flight at once (throughput)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    parser.add_argument("--completion-tokens", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=50, help="Fixture pages in the sitemap")
+    parser.add_argument("--page-kb", type=int, default=200)
+    parser.add_argument("--warm-cache", action="store_true", help="Reuse the completion cache across runs")
+    parser.add_argument("--coalesce", action="store_true",
+                        help="Let concurrent runs share identical in-flight requests (off keeps runs independent)")
+    parser.add_argument("--scenarios", default="", help="Comma-separated subset of scenarios")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    mock = MockGroqServer(("127.0.0.1", 0), args.latency, args.tokens_per_second, args.completion_tokens).start()
+    site = FixtureSite(("127.0.0.1", 0), args.pages, args.page_kb).start()
+    workdir = tempfile.mkdtemp(prefix="brandpulse-bench-")
+    # Point the app at the local stand-ins and keep every on-disk store inside the scratch directory
+    os.environ.update({
+        "GROQ_API_KEY": "bench-key",
+        "GROQ_BASE_URL": mock.base_url,
+        "BRANDPULSE_CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "BRANDPULSE_JOBS_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "BRANDPULSE_RESULTS_PATH": os.path.join(workdir, "results.sqlite3"),
+        "BRANDPULSE_SITE_INDEX_PATH": os.path.join(workdir, "site.sqlite3")
+    })
+
+    scenarios = build_scenarios(site)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()] or list(scenarios)
+    results = [run_scenario(name, scenarios[name], mock, args.iterations, args.concurrency, args.warm_cache,
+                            args.coalesce, workdir)
+               for name in selected]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<24}{'p50 s':>9}{'p95 s':>9}{'calls/run':>11}{'runs/s':>9}")
+    for result in results:
+        print(f"{result['scenario']:<24}{result['p50_s']:>9}{result['p95_s']:>9}"
+              f"{result['llm_calls_per_run']:>11}{result['throughput_runs_per_s']:>9}")
+
+if __name__ == "__main__":
+    main()
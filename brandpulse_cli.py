@@ -0,0 +1,128 @@
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from marketing_agency import MarketingAgencyAutomation, REPORT_AUDIENCE, build_report_graph
+from fair_scheduler import BATCH, tenant_scope
+from results_store import brand_scope
+from telemetry import get_tracer
+
+TOOLS = ["seo", "competitors", "content", "email", "report"]
+
+def _split(value: Any, separator: str) -> List[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or "").split(separator) if item.strip()]
+
+def load_rows(path: str) -> List[Dict[str, Any]]:
+    # CSV columns: brand, url, competitors (";"-separated), keywords (","-separated), industry, optional topic/platform.
+    # JSONL rows use the same keys, with competitors/keywords as lists or strings.
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith(".csv"):
+            raw_rows = list(csv.DictReader(handle))
+        else:
+            raw_rows = [json.loads(line) for line in handle if line.strip()]
+    rows = []
+    for raw in raw_rows:
+        rows.append({
+            "brand": (raw.get("brand") or "").strip(),
+            "url": (raw.get("url") or "").strip(),
+            "competitors": _split(raw.get("competitors"), ";"),
+            "keywords": _split(raw.get("keywords"), ",") or ["generic"],
+            "industry": (raw.get("industry") or "").strip(),
+            "topic": (raw.get("topic") or "").strip(),
+            "platform": (raw.get("platform") or "LinkedIn").strip()
+        })
+    return rows
+
+def run_row(row: Dict[str, Any], tools: List[str], system_options: Dict[str, Any],
+            incremental: bool = True) -> Dict[str, Any]:
+    marketing_system = MarketingAgencyAutomation(**system_options)
+    started = time.perf_counter()
+    results, errors = {}, {}
+    # Headless runs queue as batch work, one tenant per brand
+    with brand_scope(row["brand"]), tenant_scope(row["brand"], BATCH):
+        for tool in tools:
+            try:
+                if tool == "seo":
+                    results["seo"] = marketing_system.seo_optimizer(row["url"], row["keywords"])
+                elif tool == "competitors":
+                    results["competitors"] = marketing_system.competitor_watchdog(
+                        row["competitors"], row["keywords"], incremental=incremental)
+                elif tool == "content":
+                    topic = row["topic"] or f"{row['industry']} trends"
+                    results["content"] = marketing_system.post_creator(topic, row["platform"], "professional")
+                elif tool == "email":
+                    results["email"] = marketing_system.smart_email_manager("Promotional", REPORT_AUDIENCE)
+                elif tool == "report":
+                    graph = build_report_graph(marketing_system, row["url"], row["brand"], row["industry"],
+                                               row["keywords"], row["competitors"], datetime.now())
+                    results["report"] = graph.run()["summary"]
+            except Exception as e:
+                errors[tool] = str(e)
+    return {
+        "brand": row["brand"],
+        "inputs": row,
+        "results": results,
+        "errors": errors,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "finished_at": datetime.now().isoformat()
+    }
+
+def run_batch(rows: List[Dict[str, Any]], tools: List[str], workers: int = 4,
+              system_options: Dict[str, Any] = None, incremental: bool = True) -> Iterator[Dict[str, Any]]:
+    # Yields each brand's result as soon as it is done; all workers share the process-wide rate limit
+    system_options = system_options or {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_row, row, tools, system_options, incremental) for row in rows]
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run BrandPulse AI tools headlessly over a batch of brands.")
+    parser.add_argument("input", help="CSV or JSONL file of brands")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output path (default: stdout)")
+    parser.add_argument("--tools", default="seo,competitors",
+                        help=f"Comma-separated tools to run: {', '.join(TOOLS)}")
+    parser.add_argument("--workers", type=int, default=4, help="Brands processed in parallel")
+    parser.add_argument("--max-concurrency", type=int, default=6, help="Parallel LLM calls per tool")
+    parser.add_argument("--requests-per-minute", type=int, default=30, help="Shared Groq request budget")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="Re-analyse every competitor, even if its site is unchanged since the last run")
+    parser.add_argument("--telemetry", help="Write per-call latency/token telemetry as JSON to this path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    tools = _split(args.tools, ",")
+    unknown = [tool for tool in tools if tool not in TOOLS]
+    if unknown:
+        parser.error(f"Unknown tools: {', '.join(unknown)}")
+
+    rows = load_rows(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    failures = 0
+    try:
+        for result in run_batch(rows, tools, args.workers, {"max_concurrency": args.max_concurrency,
+                                                            "requests_per_minute": args.requests_per_minute},
+                                not args.full_refresh):
+            failures += bool(result["errors"])
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            logging.info("Finished %s in %.1fs", result["brand"], result["elapsed_seconds"])
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    logging.info("Processed %d brands, %d with errors", len(rows), failures)
+    if args.telemetry:
+        with open(args.telemetry, "w", encoding="utf-8") as handle:
+            handle.write(get_tracer().to_json())
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from completion_cache import DEFAULT_CACHE_PATH
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_RE = re.compile(r"[^\n.!?]+[.!?]*")
+HEADING_RE = re.compile(r"^\s*(#+\s|\d+\.\s|\*\*)")
+
+# Token budgets for each input of the comprehensive summary prompt
+SUMMARY_BUDGETS = {
+    "seo": 400,
+    "competitors": 900,
+    "content": 250,
+    "email": 150
+}
+
+def count_tokens(text: str) -> int:
+    # Word pieces plus punctuation; close to BPE counts for English prose without needing a tokenizer
+    return len(TOKEN_RE.findall(text or ""))
+
+def truncate_tokens(text: str, budget: int) -> str:
+    # Cuts text after its first `budget` tokens
+    for index, match in enumerate(TOKEN_RE.finditer(text)):
+        if index + 1 == budget:
+            return text[:match.end()]
+    return text if budget > 0 else ""
+
+def trim_to_budget(text: str, budget: int, keywords: Optional[List[str]] = None) -> str:
+    # Extractive trim: keep the sentences that mention keywords or open their section,
+    # plus the heading of every section something was kept from, in original order
+    if count_tokens(text) <= budget:
+        return text
+    keywords = [k.lower() for k in (keywords or []) if k]
+    headings: Dict[int, str] = {}
+    candidates = []
+    heading_line, position_in_section = -1, 0
+    for line_number, line in enumerate(text.splitlines()):
+        if not line.strip():
+            continue
+        if HEADING_RE.match(line):
+            heading_line, position_in_section = line_number, 0
+            headings[line_number] = line.strip()
+            continue
+        for sentence_number, sentence in enumerate(SENTENCE_RE.findall(line)):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            lowered = sentence.lower()
+            score = 1.0 / (1 + position_in_section) + sum(1.0 for k in keywords if k in lowered)
+            candidates.append((score, heading_line, line_number, sentence_number, sentence))
+            position_in_section += 1
+
+    kept_headings, selected, used = set(), [], 0
+    for score, heading, line_number, sentence_number, sentence in sorted(candidates, key=lambda c: -c[0]):
+        cost = count_tokens(sentence)
+        if heading in headings and heading not in kept_headings:
+            cost += count_tokens(headings[heading])
+        if used + cost > budget:
+            continue
+        used += cost
+        kept_headings.add(heading)
+        selected.append((line_number, sentence_number, sentence))
+    selected.extend((line_number, -1, headings[line_number]) for line_number in kept_headings if line_number in headings)
+    if not selected:
+        # Every sentence is over the budget on its own: keep the start of the best one rather than nothing
+        best = max(candidates, key=lambda c: c[0])[4] if candidates else text.strip()
+        return truncate_tokens(best, budget)
+
+    lines: Dict[int, List[str]] = {}
+    for line_number, _, sentence in sorted(selected):
+        lines.setdefault(line_number, []).append(sentence)
+    return "\n".join(" ".join(parts) for _, parts in sorted(lines.items()))
+
+class ContextCompactor:
+    # Shrinks prompt inputs to a token budget and remembers the result next to a hash of its source text
+    def __init__(self, summarizer: Optional[Callable[[str, int], str]] = None, path: str = DEFAULT_CACHE_PATH):
+        self.summarizer = summarizer
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS compactions (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                compacted TEXT NOT NULL,
+                source_tokens INTEGER NOT NULL,
+                compacted_tokens INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def compact(self, text: str, budget: int, keywords: Optional[List[str]] = None) -> str:
+        text = text or ""
+        source_tokens = count_tokens(text)
+        if source_tokens <= budget:
+            return text
+        method = "summary" if self.summarizer else "extractive"
+        key_source = "\x1f".join([method, str(budget), ",".join(keywords or []), text])
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT compacted FROM compactions WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+
+        # Pre-summarise when trimming alone would throw most of the text away
+        if self.summarizer and source_tokens > 3 * budget:
+            compacted = trim_to_budget(self.summarizer(text, budget), budget, keywords)
+        else:
+            compacted = trim_to_budget(text, budget, keywords)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO compactions "
+                "(key, source, compacted, source_tokens, compacted_tokens, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, compacted, source_tokens, count_tokens(compacted), time.time())
+            )
+            self._conn.commit()
+        return compacted
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from html_extract import extract_seo_fields, extract_text
+
+DEFAULT_RESULTS_PATH = os.getenv("BRANDPULSE_RESULTS_PATH", ".brandpulse_results.sqlite3")
+
+def keywords_key(keywords: List[str]) -> str:
+    # Order and case of the keyword list do not change the analysis, so they do not change the key
+    return json.dumps(sorted({keyword.strip().lower() for keyword in keywords if keyword.strip()}))
+
+def page_fingerprint(body: bytes, content_type: str = "") -> str:
+    fields = extract_seo_fields(body, content_type)
+    payload = [fields["current_title"], fields["current_meta"], fields["current_h1"], extract_text(body, content_type)]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class CompetitorStore:
+    # Latest analysis per competitor and keyword set, with the site fingerprint it was generated from
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS competitor_results (
+                competitor TEXT NOT NULL,
+                keywords_key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                result TEXT NOT NULL,
+                analysed_at REAL NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (competitor, keywords_key)
+            )
+        """)
+        # Long format, one row per competitor, metric and run, so the history loads straight into a DataFrame
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS competitor_scores (
+                competitor TEXT NOT NULL,
+                keywords_key TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                score REAL NOT NULL,
+                run_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_competitor_scores_run ON competitor_scores (keywords_key, run_at)"
+        )
+        self._conn.commit()
+
+    def get(self, competitor: str, keywords: List[str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, result, analysed_at FROM competitor_results "
+                "WHERE competitor = ? AND keywords_key = ?",
+                (competitor, keywords_key(keywords))
+            ).fetchone()
+        if row is None:
+            return None
+        return {"fingerprint": row[0], "result": json.loads(row[1]), "analysed_at": row[2]}
+
+    def save(self, competitor: str, keywords: List[str], fingerprint: str, result: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO competitor_results "
+                "(competitor, keywords_key, fingerprint, result, analysed_at, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (competitor, keywords_key(keywords), fingerprint, json.dumps(result), now, now)
+            )
+            self._conn.commit()
+
+    def touch(self, competitor: str, keywords: List[str]):
+        # Records that the stored result was checked against the live site and is still current
+        with self._lock:
+            self._conn.execute(
+                "UPDATE competitor_results SET checked_at = ? WHERE competitor = ? AND keywords_key = ?",
+                (time.time(), competitor, keywords_key(keywords))
+            )
+            self._conn.commit()
+
+    def record_scores(self, competitor: str, keywords: List[str], scores: Dict[str, Optional[float]], run_at: float):
+        rows = [(competitor, keywords_key(keywords), metric, score, run_at)
+                for metric, score in scores.items() if score is not None]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO competitor_scores (competitor, keywords_key, metric, score, run_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def score_history(self, keywords: List[str], since: Optional[float] = None) -> List[Tuple[str, str, float, float]]:
+        # (competitor, metric, score, run_at) rows for every run with this keyword set, oldest first
+        with self._lock:
+            return self._conn.execute(
+                "SELECT competitor, metric, score, run_at FROM competitor_scores "
+                "WHERE keywords_key = ? AND run_at >= ? ORDER BY run_at",
+                (keywords_key(keywords), since or 0)
+            ).fetchall()
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def get_competitor_store() -> CompetitorStore:
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = CompetitorStore()
+        return _shared_store
@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+CALENDAR_FIELDS = ["date", "posting_time", "platform", "topic", "tone", "content", "hashtags", "call_to_action"]
+
+# Typical engagement peaks per platform, local time, by weekday (Monday = 0)
+POSTING_TIMES = {
+    "LinkedIn": ["08:00", "10:00", "10:00", "09:00", "08:00", "10:00", "10:00"],
+    "Twitter": ["09:00", "09:00", "12:00", "09:00", "09:00", "11:00", "11:00"],
+    "Facebook": ["09:00", "13:00", "13:00", "13:00", "11:00", "12:00", "12:00"],
+    "Instagram": ["11:00", "11:00", "11:00", "14:00", "10:00", "09:00", "18:00"],
+    "Blog Post": ["10:00", "10:00", "10:00", "10:00", "10:00", "09:00", "09:00"],
+    "Marketing Copy": ["09:00", "09:00", "09:00", "09:00", "09:00", "10:00", "10:00"]
+}
+DEFAULT_POSTING_TIMES = ["10:00"] * 7
+
+def recommend_posting_time(platform: str, day: date) -> str:
+    return POSTING_TIMES.get(platform, DEFAULT_POSTING_TIMES)[day.weekday()]
+
+def date_range(start: date, end: date, weekdays: Optional[List[int]] = None) -> List[date]:
+    # Every day from start to end inclusive, optionally only on the given weekdays
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    return [day for day in days if weekdays is None or day.weekday() in weekdays]
+
+def calendar_to_csv(entries: List[Dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CALENDAR_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for entry in entries:
+        writer.writerow({**entry, "hashtags": " ".join(entry.get("hashtags") or [])})
+    return buffer.getvalue()
+
+def calendar_to_jsonl(entries: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps({field: entry.get(field) for field in CALENDAR_FIELDS}, ensure_ascii=False) + "\n"
+                   for entry in entries)
@@ -0,0 +1,139 @@
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY_CLASSES = [INTERACTIVE, BATCH]
+# A batch request that has waited this long competes with interactive ones, so batch work is slowed, never starved
+DEFAULT_BATCH_AGING_SECONDS = 60.0
+# Expected waits above these are refused up front instead of leaving a user staring at a spinner
+DEFAULT_MAX_WAIT = {INTERACTIVE: 300.0, BATCH: None}
+
+# Who a request is for and how urgent it is; pool threads inherit both through submit_in_context
+current_tenant = contextvars.ContextVar("current_tenant", default="default")
+current_priority = contextvars.ContextVar("current_priority", default=INTERACTIVE)
+
+@contextmanager
+def tenant_scope(tenant: Optional[str] = None, priority: Optional[str] = None) -> Iterator[None]:
+    tokens = []
+    if tenant:
+        tokens.append((current_tenant, current_tenant.set(tenant)))
+    if priority:
+        tokens.append((current_priority, current_priority.set(priority)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+class AdmissionError(Exception):
+    def __init__(self, expected_wait: float, limit: float):
+        self.expected_wait = expected_wait
+        self.limit = limit
+        super().__init__(f"The Groq queue is too long right now: expected wait {expected_wait:.0f}s "
+                         f"is over the {limit:.0f}s limit")
+
+class FairScheduler:
+    # Decides which waiting request gets the next slot from the shared rate limiter. Interactive requests go
+    # before batch ones; within a class, tenants are served by weighted fair queuing, so one tenant's
+    # twelve-call report takes turns with another's single post instead of running ahead of it.
+    def __init__(self, bucket: Any, weights: Optional[Dict[str, float]] = None,
+                 batch_aging: float = DEFAULT_BATCH_AGING_SECONDS, max_wait: Optional[Dict[str, float]] = None):
+        self.bucket = bucket
+        self.weights = dict(weights or {})
+        self.batch_aging = batch_aging
+        self.max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self._waiting: List[Dict[str, Any]] = []
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._granting = False
+        self._sequence = itertools.count()
+        self._served = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._waited = {priority: 0.0 for priority in PRIORITY_CLASSES}
+        self._condition = threading.Condition()
+
+    def set_weight(self, tenant: str, weight: float):
+        with self._condition:
+            self.weights[tenant] = weight
+
+    def _finish_tag(self, tenant: str) -> float:
+        # Virtual finish time of the tenant's next request; callers hold self._condition
+        start = max(self._virtual_time, self._last_finish.get(tenant, 0.0))
+        return start + 1.0 / self.weights.get(tenant, 1.0)
+
+    def _rank(self, ticket: Dict[str, Any], now: float):
+        aged = now - ticket["enqueued_at"] >= self.batch_aging
+        urgent = ticket["priority"] == INTERACTIVE or aged
+        return (0 if urgent else 1, ticket["finish"], ticket["sequence"])
+
+    def _head(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return min(self._waiting, key=lambda ticket: self._rank(ticket, now))
+
+    def acquire(self, tenant: Optional[str] = None, priority: Optional[str] = None):
+        # Blocks until this request is at the head of the queue and the rate limiter has a slot for it
+        tenant = tenant or current_tenant.get()
+        priority = priority or current_priority.get()
+        with self._condition:
+            finish = self._finish_tag(tenant)
+            self._last_finish[tenant] = finish
+            ticket = {"tenant": tenant, "priority": priority, "finish": finish,
+                      "sequence": next(self._sequence), "enqueued_at": time.monotonic()}
+            self._waiting.append(ticket)
+            # Only the head draws from the bucket, so a request arriving later cannot overtake by luck
+            while self._granting or self._head() is not ticket:
+                self._condition.wait()
+            self._granting = True
+        try:
+            self.bucket.acquire()
+        finally:
+            with self._condition:
+                self._granting = False
+                self._waiting.remove(ticket)
+                self._virtual_time = max(self._virtual_time, ticket["finish"])
+                self._served[priority] += 1
+                self._waited[priority] += time.monotonic() - ticket["enqueued_at"]
+                self._condition.notify_all()
+
+    def estimate_wait(self, calls: int = 1, tenant: Optional[str] = None, priority: Optional[str] = None) -> float:
+        # Seconds until `calls` new requests from this tenant would all have been let through
+        tenant = tenant or current_tenant.get()
+        priority = priority or current_priority.get()
+        now = time.monotonic()
+        with self._condition:
+            probe = {"priority": priority, "finish": self._finish_tag(tenant), "sequence": float("inf"),
+                     "enqueued_at": now}
+            ahead = [ticket for ticket in self._waiting if self._rank(ticket, now) < self._rank(probe, now)]
+            # After the first call, each further one takes turns with every other tenant queued at this level
+            competing = len({ticket["tenant"] for ticket in ahead} - {tenant}) + 1
+        return self.bucket.expected_wait(len(ahead) + 1 + (calls - 1) * competing)
+
+    def admit(self, calls: int = 1, tenant: Optional[str] = None, priority: Optional[str] = None) -> float:
+        # Returns the expected wait, or raises AdmissionError when it is over the priority class's limit
+        priority = priority or current_priority.get()
+        expected_wait = self.estimate_wait(calls, tenant, priority)
+        limit = self.max_wait.get(priority)
+        if limit is not None and expected_wait > limit:
+            raise AdmissionError(expected_wait, limit)
+        return expected_wait
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            queued: Dict[tuple, int] = {}
+            for ticket in self._waiting:
+                key = (ticket["tenant"], ticket["priority"])
+                queued[key] = queued.get(key, 0) + 1
+            served = dict(self._served)
+            waited = dict(self._waited)
+        rows = [{"priority": priority, "tenant": "all",
+                 "queued": sum(count for (_, level), count in queued.items() if level == priority),
+                 "served": served[priority],
+                 "avg_wait_s": round(waited[priority] / served[priority], 3) if served[priority] else 0.0}
+                for priority in PRIORITY_CLASSES]
+        rows.extend({"priority": priority, "tenant": tenant, "queued": count, "served": None, "avg_wait_s": None}
+                    for (tenant, priority), count in sorted(queued.items()))
+        return rows
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from completion_cache import DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS
+from singleflight import ABANDONED, get_flight_group
+from telemetry import get_tracer
+
+USER_AGENT = "BrandPulseAI/1.0 (+seo-audit)"
+DEFAULT_PAGE_MAX_ENTRIES = int(os.getenv("BRANDPULSE_PAGE_CACHE_MAX_ENTRIES", "1000"))
+
+class PageValidatorCache:
+    # Remembers ETag/Last-Modified and the last body per URL so unchanged pages come back as 304s.
+    # Bodies are large, so entries expire after a TTL and the least recently validated ones are evicted.
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_PAGE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages (fetched_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_type, body, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None and time.time() - row[4] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._conn.commit()
+                row = None
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_type": row[2], "body": row[3]}
+
+    def touch(self, url: str):
+        # A 304 confirms the stored body is current, so it counts as freshly fetched
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def set(self, url: str, etag: Optional[str], last_modified: Optional[str], content_type: str, body: bytes):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_type, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_type, body, now)
+            )
+            # Drop expired rows first, then the least recently validated ones beyond the size bound
+            self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute("""
+                DELETE FROM pages WHERE url IN (
+                    SELECT url FROM pages ORDER BY fetched_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM pages").fetchone()
+        return {"entries": entries, "bytes": size}
+
+class AsyncFetcher:
+    # Pooled asyncio HTTP client with a global connection cap and a per-host concurrency limit
+    def __init__(self, max_connections: int = 32, per_host_limit: int = 4, timeout: float = 10.0,
+                 validators: Optional[PageValidatorCache] = None):
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.validators = validators or PageValidatorCache()
+
+    async def _fetch(self, client: httpx.AsyncClient, host_limits: Dict[str, asyncio.Semaphore],
+                     url: str) -> Dict[str, Any]:
+        # A fetch of the same URL already running in any thread or event loop is awaited instead of repeated
+        flights = get_flight_group("http")
+        while True:
+            future, leader = flights.join(("async", url))
+            if leader:
+                break
+            started = time.perf_counter()
+            result = await asyncio.wrap_future(future)
+            # A cancelled leader hands the fetch over instead of cancelling everyone waiting on it
+            if result is ABANDONED:
+                continue
+            get_tracer().record_http(url, time.perf_counter() - started, status=result.get("status"),
+                                     size=len(result.get("content") or b""), error=result.get("error"),
+                                     coalesced=True)
+            return result
+        try:
+            result = await self._request(client, host_limits, url)
+        except BaseException as e:
+            flights.finish(("async", url), future, error=e)
+            raise
+        flights.finish(("async", url), future, result=result)
+        return result
+
+    async def _request(self, client: httpx.AsyncClient, host_limits: Dict[str, asyncio.Semaphore],
+                       url: str) -> Dict[str, Any]:
+        host = urlparse(url).netloc
+        semaphore = host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        cached = self.validators.get(url)
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        started = time.perf_counter()
+        try:
+            async with semaphore:
+                # Time the request itself, not the wait for a per-host slot
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+            get_tracer().record_http(url, time.perf_counter() - started, status=response.status_code,
+                                     size=len(response.content), not_modified=response.status_code == 304)
+            if response.status_code == 304 and cached:
+                self.validators.touch(url)
+                return {"url": url, "status": 304, "content": cached["body"],
+                        "content_type": cached["content_type"], "not_modified": True}
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            if etag or last_modified:
+                self.validators.set(url, etag, last_modified, content_type, response.content)
+            return {"url": url, "status": response.status_code, "content": response.content,
+                    "content_type": content_type, "not_modified": False}
+        except httpx.HTTPStatusError as e:
+            return {"url": url, "error": str(e)}
+        except Exception as e:
+            get_tracer().record_http(url, time.perf_counter() - started, error=str(e))
+            return {"url": url, "error": str(e)}
+
+    async def fetch_all_async(self, urls: List[str]) -> List[Dict[str, Any]]:
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        host_limits = {}
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True,
+                                     headers={"User-Agent": USER_AGENT}) as client:
+            return await asyncio.gather(*(self._fetch(client, host_limits, url) for url in urls))
+
+    def fetch_all(self, urls: List[str]) -> List[Dict[str, Any]]:
+        return asyncio.run(self.fetch_all_async(urls))
+
+    def sitemap_urls(self, sitemap_url: str, max_urls: int = 500) -> List[str]:
+        # Follows nested sitemap indexes breadth-first until max_urls page URLs are collected
+        pages, queue, seen = [], [sitemap_url], set()
+        while queue and len(pages) < max_urls:
+            batch = [url for url in queue if url not in seen]
+            seen.update(batch)
+            queue = []
+            for result in self.fetch_all(batch):
+                if "error" in result:
+                    continue
+                try:
+                    root = ET.fromstring(result["content"])
+                except ET.ParseError:
+                    continue
+                for element in root.iter():
+                    if not element.tag.endswith("}loc") and element.tag != "loc":
+                        continue
+                    loc = (element.text or "").strip()
+                    if root.tag.endswith("sitemapindex"):
+                        queue.append(loc)
+                    elif len(pages) < max_urls:
+                        pages.append(loc)
+        return pages
@@ -0,0 +1,191 @@
+import codecs
+import html
+import html.entities
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+HEADER_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+FEED_CHUNK_SIZE = 16384
+
+# BeautifulSoup's html.parser tree builder rules that decide the SEO fields: elements closed as soon as they
+# open, elements whose text is not "text" (and so is left out of get_text()), and elements whose whitespace
+# is kept as is
+VOID_ELEMENTS = {"area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+                 "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+                 "spacer", "track", "wbr"}
+STRING_CONTAINERS = {"rt", "rp", "style", "script", "template"}
+PRESERVE_WHITESPACE = {"pre", "textarea"}
+ASCII_SPACES = " \n\t\x0c\r"
+
+class _SeoParser(HTMLParser):
+    # Reproduces what BeautifulSoup(html, "html.parser") reports for soup.title.string, the first
+    # meta[name=description] and h1.text, from the same parser events but without building a tree: only the
+    # names of the open elements are kept, plus the (small) subtree of the first <title>.
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.meta_description: Optional[Dict[str, str]] = None
+        self.h1_parts: List[List[str]] = []
+        self.title_node: Optional[List[Any]] = None
+        self._data: List[str] = []
+        # Open elements as (name, title subtree node or None)
+        self._stack: List[tuple] = []
+        self._open_h1: List[int] = []
+        self._title_path: List[List[Any]] = []
+        # Void elements still expecting a stray end tag, by name
+        self._already_closed: Counter = Counter()
+
+    def _end_data(self, kind: str = "text"):
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data = []
+        if not any(name in PRESERVE_WHITESPACE for name, _ in self._stack) and not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        if self._title_path:
+            self._title_path[-1].append(data)
+        if kind == "cdata" or kind == "text" and not any(name in STRING_CONTAINERS for name, _ in self._stack):
+            for index in self._open_h1:
+                self.h1_parts[index].append(data)
+
+    def _push(self, tag: str, attrs: List[Any]):
+        self._end_data()
+        node = None
+        if self._title_path or (tag == "title" and self.title_node is None):
+            node = []
+            if self._title_path:
+                self._title_path[-1].append(node)
+            else:
+                self.title_node = node
+            self._title_path.append(node)
+        self._stack.append((tag, node))
+        if tag == "h1":
+            self._open_h1.append(len(self.h1_parts))
+            self.h1_parts.append([])
+        elif tag == "meta" and self.meta_description is None:
+            attributes = {key: value or "" for key, value in attrs}
+            if attributes.get("name") == "description":
+                self.meta_description = attributes
+
+    def _pop_to(self, tag: str):
+        self._end_data()
+        if not any(name == tag for name, _ in self._stack):
+            return
+        while True:
+            name, node = self._stack.pop()
+            if node is not None:
+                self._title_path.pop()
+            if name == "h1":
+                self._open_h1.pop()
+            if name == tag:
+                return
+
+    def handle_starttag(self, tag: str, attrs: List[Any]):
+        self._push(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._pop_to(tag)
+            # A later </br> or </img> belongs to this element and must not close anything else
+            self._already_closed[tag] += 1
+
+    def handle_startendtag(self, tag: str, attrs: List[Any]):
+        self._push(tag, attrs)
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag: str):
+        if self._already_closed[tag] > 0:
+            self._already_closed[tag] -= 1
+        else:
+            self._pop_to(tag)
+
+    def handle_data(self, data: str):
+        self._data.append(data)
+
+    def handle_charref(self, name: str):
+        number = int(name[1:], 16) if name[:1] in ("x", "X") else int(name)
+        # html.unescape drops control and noncharacter references; BeautifulSoup keeps them as is
+        self._data.append(html.unescape(f"&#{number};") or chr(number))
+
+    def handle_entityref(self, name: str):
+        self._data.append(html.entities.html5.get(f"{name};") or html.entities.html5.get(name) or f"&{name}")
+
+    def _handle_special(self, data: str, kind: str):
+        self._end_data()
+        self._data.append(data)
+        self._end_data(kind)
+
+    def handle_comment(self, data: str):
+        self._handle_special(data, "comment")
+
+    def handle_decl(self, decl: str):
+        self._handle_special(decl[len("DOCTYPE "):], "doctype")
+
+    def unknown_decl(self, data: str):
+        if data.upper().startswith("CDATA["):
+            self._handle_special(data[len("CDATA["):], "cdata")
+        else:
+            self._handle_special(data, "declaration")
+
+    def handle_pi(self, data: str):
+        self._handle_special(data, "pi")
+
+    def close(self):
+        super().close()
+        self._end_data()
+
+    @property
+    def title(self) -> Optional[str]:
+        # soup.title.string: "" without a <title>, None unless it holds exactly one string (at any depth)
+        if self.title_node is None:
+            return ""
+        node = self.title_node
+        while len(node) == 1 and isinstance(node[0], list):
+            node = node[0]
+        return node[0] if len(node) == 1 else None
+
+    @property
+    def h1_tags(self) -> List[str]:
+        return ["".join(parts).strip() for parts in self.h1_parts]
+
+def detect_charset(body: bytes, content_type: str = "") -> str:
+    match = HEADER_CHARSET_RE.search(content_type or "") or META_CHARSET_RE.search(body[:4096])
+    charset = match.group(1) if match else "utf-8"
+    if isinstance(charset, bytes):
+        charset = charset.decode("ascii", "ignore")
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    return charset
+
+def extract_seo_fields(body: bytes, content_type: str = "") -> Dict[str, Any]:
+    # Fed incrementally through an incremental decoder, so the page is never decoded or held as a tree whole.
+    # Each feed ends just before a "<": html.parser can read an entity split across feeds differently.
+    parser = _SeoParser()
+    decoder = codecs.getincrementaldecoder(detect_charset(body, content_type))(errors="replace")
+    pending = ""
+    for start in range(0, len(body), FEED_CHUNK_SIZE):
+        pending += decoder.decode(body[start:start + FEED_CHUNK_SIZE])
+        cut = pending.rfind("<")
+        if cut > 0:
+            parser.feed(pending[:cut])
+            pending = pending[cut:]
+    parser.feed(pending + decoder.decode(b"", final=True))
+    parser.close()
+    meta = parser.meta_description or {}
+    return {
+        "current_title": parser.title,
+        "current_meta": meta.get("content", ""),
+        "current_h1": parser.h1_tags
+    }
+
+SKIPPED_BLOCK_RE = re.compile(rb"<(script|style|noscript|svg|template)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+BYTES_TAG_RE = re.compile(rb"<[^>]*>")
+WHITESPACE_RE = re.compile(r"\s+")
+
+def extract_text(body: bytes, content_type: str = "") -> str:
+    # Visible text only: scripts, styles and comments are dropped before tags are stripped
+    charset = detect_charset(body, content_type)
+    stripped = BYTES_TAG_RE.sub(b" ", SKIPPED_BLOCK_RE.sub(b" ", body))
+    return WHITESPACE_RE.sub(" ", html.unescape(stripped.decode(charset, errors="replace"))).strip()
@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_JOBS_PATH = os.getenv("BRANDPULSE_JOBS_PATH", ".brandpulse_jobs.sqlite3")
+HEARTBEAT_SECONDS = 10
+STALE_AFTER_SECONDS = 60
+
+# A runner receives the job params, the stage results already persisted for it and a callback to persist
+# each newly finished stage; whatever it returns is stored as the job result
+JobRunner = Callable[[Dict[str, Any], Dict[str, Any], Callable[[str, Any], None]], Any]
+
+class JobStore:
+    # SQLite-backed queue; stage results are stored as they finish so interrupted jobs can resume
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                heartbeat_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_stages (
+                job_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                result TEXT NOT NULL,
+                finished_at REAL NOT NULL,
+                PRIMARY KEY (job_id, stage)
+            )
+        """)
+
+    def create(self, kind: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(params), now, now)
+            )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes can never claim the same job
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, kind, params FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row:
+                    now = time.time()
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', updated_at = ?, heartbeat_at = ? WHERE id = ?",
+                        (now, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row[0], "kind": row[1], "params": json.loads(row[2])}
+
+    def save_stage(self, job_id: str, stage: str, result: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_stages (job_id, stage, result, finished_at) VALUES (?, ?, ?, ?)",
+                (job_id, stage, json.dumps(result), time.time())
+            )
+
+    def stages(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, result FROM job_stages WHERE job_id = ? ORDER BY finished_at", (job_id,)
+            ).fetchall()
+        return {stage: json.loads(result) for stage, result in rows}
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None):
+        status = "failed" if error else "done"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result), error, time.time(), job_id)
+            )
+
+    def heartbeat(self, job_ids: List[str]):
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE id IN ({','.join('?' * len(job_ids))})",
+                (time.time(), *job_ids)
+            )
+
+    def requeue(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', error = NULL, updated_at = ? WHERE id = ? AND status != 'running'",
+                (time.time(), job_id)
+            )
+
+    def requeue_stale(self, stale_after: float = STALE_AFTER_SECONDS) -> int:
+        # Jobs whose worker stopped heartbeating (crash, redeploy) go back to the queue and resume from their stages
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND heartbeat_at < ?",
+                (time.time(), time.time() - stale_after)
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, params, status, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0], "kind": row[1], "params": json.loads(row[2]), "status": row[3],
+            "result": json.loads(row[4]) if row[4] else None, "error": row[5],
+            "created_at": row[6], "updated_at": row[7], "stages": self.stages(job_id)
+        }
+
+    def list_jobs(self, kind: Optional[str] = None, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        query = "SELECT id, kind, params, status, created_at FROM jobs"
+        args: List[Any] = []
+        if kind:
+            query += " WHERE kind = ?"
+            args.append(kind)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*args, limit, offset)).fetchall()
+        return [{"id": r[0], "kind": r[1], "params": json.loads(r[2]), "status": r[3], "created_at": r[4]}
+                for r in rows]
+
+class JobManager:
+    # Local worker pool that drains the JobStore queue independently of any Streamlit script run
+    def __init__(self, runners: Dict[str, JobRunner], workers: int = 2, store: Optional[JobStore] = None,
+                 poll_interval: float = 1.0):
+        self.runners = runners
+        self.store = store or JobStore()
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._running_jobs = set()
+        self._running_lock = threading.Lock()
+        self.store.requeue_stale()
+        for index in range(workers):
+            threading.Thread(target=self._work, name=f"brandpulse-job-worker-{index}", daemon=True).start()
+        threading.Thread(target=self._heartbeat, name="brandpulse-job-heartbeat", daemon=True).start()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = self.store.create(kind, params)
+        self._wakeup.set()
+        return job_id
+
+    def resume(self, job_id: str):
+        self.store.requeue(job_id)
+        self._wakeup.set()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def list_jobs(self, kind: Optional[str] = None, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        return self.store.list_jobs(kind, limit, offset)
+
+    def _work(self):
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                self.store.requeue_stale()
+                continue
+            with self._running_lock:
+                self._running_jobs.add(job["id"])
+            try:
+                result = self.runners[job["kind"]](
+                    job["params"],
+                    self.store.stages(job["id"]),
+                    lambda stage, stage_result, job_id=job["id"]: self.store.save_stage(job_id, stage, stage_result)
+                )
+                self.store.finish(job["id"], result=result)
+            except Exception as e:
+                self.store.finish(job["id"], error=f"{e}\n{traceback.format_exc()}")
+            finally:
+                with self._running_lock:
+                    self._running_jobs.discard(job["id"])
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            with self._running_lock:
+                running = list(self._running_jobs)
+            self.store.heartbeat(running)
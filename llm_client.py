@@ -0,0 +1,213 @@
+import random
+import re
+import threading
+import time
+from typing import Any, Optional
+
+import groq
+
+from fair_scheduler import FairScheduler
+
+DURATION_PART_RE = re.compile(r"([\d.]+)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+RETRYABLE_ERRORS = (groq.RateLimitError, groq.APIConnectionError, groq.APITimeoutError, groq.InternalServerError)
+
+class CircuitOpenError(Exception):
+    pass
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    # Groq reports resets like "7.66s", "2m59.56s" or "120ms"; retry-after is plain seconds
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parts = DURATION_PART_RE.findall(value)
+        return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts) if parts else None
+
+class TokenBucket:
+    # Request-rate limiter shared by every tool; the server's rate-limit headers can pause or drain it
+    def __init__(self, requests_per_minute: int, burst: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, requests_per_minute // 6)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def set_rate(self, requests_per_minute: int, burst: Optional[int] = None):
+        # Tokens already earned at the old rate are kept, up to the new capacity
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.requests_per_minute = requests_per_minute
+            self.rate = requests_per_minute / 60.0
+            self.capacity = burst or max(1, requests_per_minute // 6)
+            self.tokens = min(self.tokens, float(self.capacity))
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def expected_wait(self, requests: int) -> float:
+        # Seconds until this many more requests would be let through at the current rate and pause
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            return max(self.paused_until - now, 0.0) + max(requests - tokens, 0.0) / self.rate
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Any):
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+        if remaining is not None and reset is not None and int(float(remaining)) <= 0:
+            self.pause(reset)
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        reset_tokens = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+        if remaining_tokens is not None and reset_tokens is not None and int(float(remaining_tokens)) <= 0:
+            self.pause(reset_tokens)
+
+class CircuitBreaker:
+    # Opens after consecutive failures, then lets a single probe through once reset_timeout has passed
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe: Optional[object] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> Optional[object]:
+        # Returns a probe token when this call is the half-open probe; pass it to release_probe when done
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half_open" and self._probe is not None):
+                raise CircuitOpenError("Groq API circuit is open after repeated failures; try again shortly")
+            if state == "half_open":
+                self._probe = object()
+                return self._probe
+            return None
+
+    def release_probe(self, probe: Optional[object]):
+        # Lets another probe through when this one ended without an outcome (e.g. it was interrupted)
+        with self._lock:
+            if probe is not None and self._probe is probe:
+                self._probe = None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probe is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probe = None
+
+class ResilientGroq:
+    # Wraps chat completions with rate-limit pacing, jittered exponential backoff and a circuit breaker.
+    # With a scheduler, requests take their turn from it rather than racing each other for the bucket.
+    def __init__(self, client: groq.Groq, bucket: TokenBucket, breaker: CircuitBreaker,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 scheduler: Optional[FairScheduler] = None):
+        self.client = client
+        self.bucket = bucket
+        self.breaker = breaker
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def create(self, **request) -> Any:
+        attempt = 0
+        while True:
+            probe = self.breaker.before_call()
+            try:
+                if self.scheduler is not None:
+                    self.scheduler.acquire()
+                else:
+                    self.bucket.acquire()
+                raw = self.client.chat.completions.with_raw_response.create(**request)
+                self.bucket.update_from_headers(raw.headers)
+                result = raw.parse()
+                self.breaker.record_success()
+                return result
+            except RETRYABLE_ERRORS as e:
+                # Throttling means the API is up: it never counts towards the breaker, and a throttled probe
+                # closes it again. Only outages and timeouts count as failures.
+                if not isinstance(e, groq.RateLimitError):
+                    self.breaker.record_failure()
+                elif probe is not None:
+                    self.breaker.record_success()
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                response = getattr(e, "response", None)
+                if response is not None:
+                    retry_after = parse_duration(response.headers.get("retry-after"))
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
+                        self.bucket.pause(retry_after)
+                time.sleep(delay)
+            except groq.APIStatusError:
+                # Any other HTTP error still proves the API is reachable
+                self.breaker.record_success()
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            finally:
+                # A probe that ended any other way (e.g. KeyboardInterrupt) must not keep the breaker half-open
+                self.breaker.release_probe(probe)
+
+_shared_bucket: Optional[TokenBucket] = None
+_shared_scheduler: Optional[FairScheduler] = None
+_shared_breaker = CircuitBreaker()
+_shared_lock = threading.Lock()
+
+def shared_bucket(requests_per_minute: int) -> TokenBucket:
+    # One bucket for the whole process, so every tool and session draws from the same quota. A caller
+    # configured with a different rate retunes that bucket rather than getting a quota of its own.
+    global _shared_bucket
+    with _shared_lock:
+        if _shared_bucket is None:
+            _shared_bucket = TokenBucket(requests_per_minute)
+        elif _shared_bucket.requests_per_minute != requests_per_minute:
+            _shared_bucket.set_rate(requests_per_minute)
+        return _shared_bucket
+
+def shared_breaker() -> CircuitBreaker:
+    return _shared_breaker
+
+def shared_scheduler(requests_per_minute: int) -> FairScheduler:
+    # Queues every session's requests for the shared bucket
+    global _shared_scheduler
+    bucket = shared_bucket(requests_per_minute)
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = FairScheduler(bucket)
+        return _shared_scheduler
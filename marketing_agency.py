@@ -1,24 +1,146 @@
 import os
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
-from groq import Groq
+import sys
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import List, Dict, Any, Hashable, Callable, Optional, Iterator
+from urllib.parse import urlparse
+from datetime import date, datetime, timedelta
 import time
 from dotenv import load_dotenv
-import streamlit as st
-import pandas as pd
+from completion_cache import CompletionCache, get_completion_cache
+from competitor_store import CompetitorStore, get_competitor_store, page_fingerprint
+from content_calendar import recommend_posting_time
+from fair_scheduler import BATCH, AdmissionError, current_tenant, tenant_scope
+from results_store import ResultsStore, brand_scope, current_brand, get_results_store
+from semantic_cache import SemanticCache, get_semantic_cache
+from singleflight import ABANDONED, flight_stats, get_flight_group
+from site_index import SiteIndex, get_site_index
+from html_extract import extract_seo_fields
+from compaction import ContextCompactor, SUMMARY_BUDGETS
+from jobs import JobManager
+from model_routing import DEFAULT_MAX_TOKENS, DEFAULT_MODEL, ModelRouter, get_model_router
+from telemetry import current_tool, get_tracer, submit_in_context, tool_span, traced_tool
 
-# Load environment variables
-load_dotenv()
+# streamlit, groq, requests and httpx are imported where they are first needed, so headless
+# callers and cold-starting workers only pay for what they use (see benchmarks/bench_import.py)
 
-# Initialize Groq
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+logger = logging.getLogger(__name__)
 
-if not os.getenv("GROQ_API_KEY"):
-    raise ValueError("Missing GROQ_API_KEY in environment variables")
+_groq_client = None
+_groq_client_lock = threading.Lock()
+
+def require_api_key() -> str:
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("Missing GROQ_API_KEY in environment variables")
+    return api_key
+
+def get_groq_client():
+    # Built on first use rather than at import, so importing this module needs no API key
+    global _groq_client
+    with _groq_client_lock:
+        if _groq_client is None:
+            from groq import Groq
+            # Retries are handled by ResilientGroq, so the SDK's own retry loop is disabled
+            _groq_client = Groq(api_key=require_api_key(), max_retries=0)
+        return _groq_client
+
+def _worker_context() -> Dict[str, Any]:
+    # Pool threads inherit the Streamlit script context, when there is one, so UI callbacks still reach the page
+    if "streamlit" not in sys.modules:
+        return {}
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    return {"initializer": add_script_run_ctx, "initargs": (None, get_script_run_ctx())}
+
+# Arguments that only steer rendering and are left out of recorded inputs
+UNRECORDED_ARGUMENTS = {"self", "stream_to", "on_post"}
+
+def recorded_tool(func: Callable) -> Callable:
+    # Stores each call's inputs, output and timing in the results store, so the run can be reopened later
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started_at, started = time.time(), time.perf_counter()
+        output = func(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        inputs = {name: value for name, value in bound.arguments.items() if name not in UNRECORDED_ARGUMENTS}
+        try:
+            self.results_store.record(func.__name__, inputs, output, time.perf_counter() - started,
+                                      started_at=started_at)
+        except Exception as e:
+            logger.warning("Could not record %s run: %s", func.__name__, e)
+        return output
+    return wrapper
+
+DEFAULT_TEMPERATURE = 0.7
+COMPLETION_FALLBACK = "Sorry, there was an error generating the content. Please try again later."
+
+COMPETITOR_SECTIONS = ["Content Strategy", "Keyword Analysis", "Market Presence", "Competitive Advantages",
+                       "Actionable Recommendations"]
+COMPETITOR_METRICS = ["Content Quality Score", "Keyword Optimization Level", "Market Position Strength",
+                      "Brand Authority Score"]
+ANALYSIS_SCHEMA = json.dumps({"sections": {name: "<markdown>" for name in COMPETITOR_SECTIONS}})
+# Any line naming a section starts that section, so one regex scan splits the whole analysis
+SECTION_HEADING_RE = re.compile(r"^.*?(" + "|".join(map(re.escape, COMPETITOR_SECTIONS)) + r").*$", re.MULTILINE)
+
+def parse_analysis_sections(analysis_text: str) -> Dict[str, str]:
+    sections = dict.fromkeys(COMPETITOR_SECTIONS, "")
+    headings = list(SECTION_HEADING_RE.finditer(analysis_text))
+    for heading, following in zip(headings, headings[1:] + [None]):
+        body = analysis_text[heading.end():following.start() if following else len(analysis_text)]
+        content = "\n".join(line for line in body.split("\n") if line.strip())
+        if content:
+            sections[heading.group(1)] = content
+    return sections
+
+def _load_json_object(text: str) -> Dict[str, Any]:
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def structure_competitor_result(quick_summary: str, analysis: str, metrics: str) -> Dict[str, Any]:
+    # Turns the JSON-mode analysis and metrics into sections and numeric scores, plus markdown renderings of both.
+    # Free-text answers (older stored results, or a model that ignored the format) go through the section parser.
+    analysis_data = _load_json_object(analysis).get("sections")
+    if isinstance(analysis_data, dict):
+        sections = {name: str(analysis_data.get(name) or "").strip() for name in COMPETITOR_SECTIONS}
+        analysis = "\n\n".join(f"### {name}\n{content}" for name, content in sections.items() if content)
+    else:
+        sections = parse_analysis_sections(analysis)
+
+    scores = dict.fromkeys(COMPETITOR_METRICS)
+    metrics_data = _load_json_object(metrics).get("metrics")
+    if isinstance(metrics_data, list):
+        lines = []
+        for item in metrics_data:
+            name = str(item.get("name", "")).split("(")[0].strip() if isinstance(item, dict) else ""
+            if name not in scores:
+                continue
+            try:
+                score = max(0.0, min(100.0, float(item.get("score"))))
+            except (TypeError, ValueError):
+                continue
+            scores[name] = score
+            lines.append(f"**{name}:** {score:g}/100 - {item.get('justification', '')}")
+        metrics = "\n\n".join(lines) or metrics
+    return {"quick_summary": quick_summary, "analysis": analysis, "metrics": metrics, "sections": sections,
+            "scores": scores}
+
+def _site_url(competitor: str) -> str:
+    return competitor if "://" in competitor else f"https://{competitor}"
 
 def init_streamlit():
+    import streamlit as st
     st.set_page_config(page_title="BrandPulse AI", layout="wide")
     
     # Update custom CSS with theme adaptability
@@ -231,161 +353,552 @@ def init_streamlit():
     st.title("BrandPulse AI")
 
 class MarketingAgencyAutomation:
-    def __init__(self):
-        self.groq = groq_client
-        self.session = requests.Session()
+    def __init__(self, max_concurrency: int = 6, requests_per_minute: int = 30,
+                 cache: Optional[CompletionCache] = None, presummarize: bool = False,
+                 on_error: Optional[Callable[[str], Any]] = None,
+                 competitor_store: Optional[CompetitorStore] = None,
+                 semantic_cache: Optional[SemanticCache] = None, site_index: Optional[SiteIndex] = None,
+                 results_store: Optional[ResultsStore] = None, router: Optional[ModelRouter] = None,
+                 raise_errors: bool = False):
+        require_api_key()
+        # on_error lets the UI surface API failures (e.g. st.error); headless callers just get them logged.
+        # raise_errors makes failed completions raise instead of returning COMPLETION_FALLBACK, for callers
+        # such as report jobs that must not store the fallback text as a result.
+        self.on_error = on_error
+        self.raise_errors = raise_errors
+        self.cache = cache or get_completion_cache()
+        self.semantic_cache = semantic_cache or get_semantic_cache()
+        self.site_index = site_index or get_site_index()
+        self.competitor_store = competitor_store or get_competitor_store()
+        self.results_store = results_store or get_results_store()
+        self.router = router or get_model_router()
+        self.compactor = ContextCompactor(summarizer=self._summarize_to_budget if presummarize else None)
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self._llm = None
+        self._session = None
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from llm_client import ResilientGroq, shared_bucket, shared_breaker, shared_scheduler
+            self._llm = ResilientGroq(get_groq_client(), shared_bucket(self.requests_per_minute), shared_breaker(),
+                                      scheduler=shared_scheduler(self.requests_per_minute))
+        return self._llm
 
-    def _get_completion(self, prompt: str) -> str:
+    def admit(self, calls: int = 1, priority: Optional[str] = None) -> float:
+        # Expected wait for this many requests from the current tenant; raises AdmissionError when it is too long
+        return self.llm.scheduler.admit(calls, priority=priority)
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _completion_request(self, prompt: str, model: str, max_tokens: int, json_mode: bool) -> Dict[str, Any]:
+        request = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": DEFAULT_TEMPERATURE,
+            "max_tokens": max_tokens
+        }
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def _stream_completion(self, prompt: str, model: str = DEFAULT_MODEL, max_tokens: int = DEFAULT_MAX_TOKENS,
+                           json_mode: bool = False, usage: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        # usage, when given, is filled from the token counts Groq attaches to the last chunk
+        stream = self.llm.create(**self._completion_request(prompt, model, max_tokens, json_mode), stream=True)
+        for chunk in stream:
+            chunk_usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage is not None and chunk_usage is not None:
+                usage["prompt_tokens"] = chunk_usage.prompt_tokens
+                usage["completion_tokens"] = chunk_usage.completion_tokens
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+    def _get_completion(self, prompt: str, use_cache: bool = True, placeholder: Any = None,
+                        max_tokens: Optional[int] = None, json_mode: bool = False, semantic: Optional[str] = None,
+                        task: Optional[str] = None, semantic_scope: str = "") -> str:
+        # With a placeholder (e.g. st.empty()) the text is rendered as it arrives; the full text is still returned.
+        # semantic is the varying input of a templated prompt, e.g. a post's topic; an answer stored for a
+        # near-duplicate of it is reused (see semantic_cache.py). Only that input is compared, since the fixed
+        # template would otherwise make every prompt look alike. semantic_scope holds the inputs such an answer
+        # must share exactly, e.g. the platform and tone of a post.
+        # task is the prompt's task class; the router picks its model and, unless max_tokens is given, its budget.
+        tracer = get_tracer()
+        started = time.perf_counter()
+        route = self.router.route(task, current_tool.get())
+        model, max_tokens = route["model"], max_tokens or route["max_tokens"]
+        cache_key = CompletionCache.make_key(model, prompt, DEFAULT_TEMPERATURE, max_tokens, json_mode)
+        namespace = f"{current_tool.get()}|{model}|{max_tokens}|{json_mode}|{semantic_scope}"
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            cache_status = "hit"
+            if cached is None and semantic:
+                cached = self.semantic_cache.get(semantic, namespace)
+                cache_status = "semantic"
+            if cached is not None:
+                if placeholder is not None:
+                    placeholder.markdown(cached)
+                tracer.record_llm(model, time.perf_counter() - started, cache_status)
+                return cached
+        cache_status = "miss" if use_cache else "bypass"
+        usage = {}
+        flights = get_flight_group("llm")
+        flight_key = cache_key
         try:
-            completion = self.groq.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return completion.choices[0].message.content
+            # Identical requests already in flight from any session or thread are joined instead of repeated.
+            # Only the API call is shared: each caller renders into its own placeholder, so one session's
+            # rerun or closed page cannot fail the others (they retake the call instead).
+            while True:
+                future, leader = flights.join(flight_key)
+                if leader:
+                    break
+                content = future.result()
+                if content is not ABANDONED:
+                    if placeholder is not None:
+                        placeholder.markdown(content)
+                    tracer.record_llm(model, time.perf_counter() - started, "coalesced")
+                    return content
+            try:
+                if placeholder is not None:
+                    content = ""
+                    for delta in self._stream_completion(prompt, model, max_tokens, json_mode, usage):
+                        content += delta
+                        placeholder.markdown(content + "▌")
+                else:
+                    completion = self.llm.create(**self._completion_request(prompt, model, max_tokens, json_mode))
+                    if completion.usage:
+                        usage.update(prompt_tokens=completion.usage.prompt_tokens,
+                                     completion_tokens=completion.usage.completion_tokens)
+                    content = completion.choices[0].message.content
+            except BaseException as e:
+                flights.finish(flight_key, future, error=e)
+                raise
+            flights.finish(flight_key, future, result=content)
+            if placeholder is not None:
+                placeholder.markdown(content)
+            tracer.record_llm(model, time.perf_counter() - started, cache_status,
+                              streamed=placeholder is not None, **usage)
+            # Bypassed calls still refresh the entry so the next cached read sees the newest answer
+            self.cache.set(cache_key, content)
+            if semantic:
+                self.semantic_cache.set(semantic, namespace, content)
+            return content
         except Exception as e:
-            st.error(f"API Error: {str(e)}")
-            return "Sorry, there was an error generating the content. Please try again later."
+            tracer.record_llm(model, time.perf_counter() - started, cache_status,
+                              streamed=placeholder is not None, error=str(e), **usage)
+            logger.warning("Completion failed: %s", e)
+            if self.raise_errors:
+                raise
+            if self.on_error:
+                self.on_error(f"API Error: {str(e)}")
+            if placeholder is not None:
+                placeholder.markdown(COMPLETION_FALLBACK)
+            return COMPLETION_FALLBACK
+
+    def _summarize_to_budget(self, text: str, budget: int) -> str:
+        prompt = f"""
+        Summarize the following analysis in at most {budget} tokens.
+        Keep concrete findings, scores, keywords and recommendations; drop filler.
+
+        {text}
+        """
+        return self._get_completion(prompt, max_tokens=budget, task="summary")
 
-    def seo_optimizer(self, url: str, keywords: List[str]) -> Dict[str, Any]:
+    def _get_completions(self, prompts: Dict[Hashable, str], use_cache: bool = True,
+                         stream_to: Optional[Dict[Hashable, Any]] = None,
+                         options_for: Optional[Dict[Hashable, Dict[str, Any]]] = None,
+                         **completion_options) -> Dict[Hashable, str]:
+        # options_for overrides completion options (e.g. json_mode or use_cache) for individual prompts
+        if not prompts:
+            return {}
+        stream_to = stream_to or {}
+        options_for = options_for or {}
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(prompts)), **_worker_context()) as executor:
+            futures = {key: submit_in_context(executor, self._get_completion, prompt, placeholder=stream_to.get(key),
+                                              **{"use_cache": use_cache, **completion_options,
+                                                 **options_for.get(key, {})})
+                       for key, prompt in prompts.items()}
+            return {key: future.result() for key, future in futures.items()}
+
+    def _fetch_page(self, url: str):
+        # Concurrent fetches of the same URL share one request; the response is only read afterwards
+        started = time.perf_counter()
         try:
-            response = self.session.get(url, timeout=10)
+            response, shared = get_flight_group("http").do(("get", url), lambda: self.session.get(url, timeout=10))
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title = soup.title.string if soup.title else ""
-            meta_desc = soup.find("meta", {"name": "description"})
-            meta_desc = meta_desc["content"] if meta_desc else ""
-            h1_tags = [h1.text.strip() for h1 in soup.find_all("h1")]
-            analysis_prompt = f"""
-            Analyze this webpage SEO for:
-            URL: {url}
-            Title: {title}
-            Meta Description: {meta_desc}
-            H1 Tags: {', '.join(h1_tags)}
-            Target Keywords: {', '.join(keywords)}
-            Provide recommendations for:
-            1. Title optimization
-            2. Meta description improvements
-            3. Content structure
-            4. Keyword placement
-            5. Technical SEO improvements
-            """
-            seo_analysis = self._get_completion(analysis_prompt)
-            return {
-                "url": url,
-                "current_title": title,
-                "current_meta": meta_desc,
-                "current_h1": h1_tags,
-                "recommendations": seo_analysis
-            }
+        except Exception as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            get_tracer().record_http(url, time.perf_counter() - started, status=status, error=str(e))
+            raise
+        get_tracer().record_http(url, time.perf_counter() - started, status=response.status_code,
+                                 size=len(response.content), coalesced=shared)
+        return response
+
+    @traced_tool
+    @recorded_tool
+    def seo_optimizer(self, url: str, keywords: List[str], stream_to: Any = None) -> Dict[str, Any]:
+        try:
+            response = self._fetch_page(url)
+            content_type = response.headers.get("content-type", "")
+            fields = extract_seo_fields(response.content, content_type)
+            title, meta_desc, h1_tags = fields["current_title"], fields["current_meta"], fields["current_h1"]
+            page_excerpts = self._page_excerpts(url, response.content, content_type, keywords)
         except Exception as e:
             return {"error": str(e)}
+        analysis_prompt = f"""
+        Analyze this webpage SEO for:
+        URL: {url}
+        Title: {title}
+        Meta Description: {meta_desc}
+        H1 Tags: {', '.join(h1_tags)}
+        Target Keywords: {', '.join(keywords)}
+        Page Content Most Relevant To The Keywords:
+        {page_excerpts or 'N/A'}
+        Provide recommendations for:
+        1. Title optimization
+        2. Meta description improvements
+        3. Content structure
+        4. Keyword placement
+        5. Technical SEO improvements
+        """
+        seo_analysis = self._get_completion(analysis_prompt, placeholder=stream_to, task="long_form")
+        return {
+            "url": url,
+            "current_title": title,
+            "current_meta": meta_desc,
+            "current_h1": h1_tags,
+            "recommendations": seo_analysis
+        }
 
-    def competitor_watchdog(self, competitors: List[str], keywords: List[str]) -> Dict[str, Any]:
-        competitor_data = {}
-        for competitor in competitors:
-            # First, get a quick summary
-            summary_prompt = f"""
-            Provide a concise 3-point summary of {competitor}'s key strengths and market positioning:
-            1. Primary competitive advantage
-            2. Target audience focus
-            3. Market differentiation
-            Keep each point brief and actionable.
-            """
-            quick_summary = self._get_completion(summary_prompt)
-            
-            # Main analysis prompt
-            analysis_prompt = f"""
-            Provide a detailed competitive analysis for {competitor} focusing on:
-            1. Content Strategy:
-               - Content types and formats used
-               - Publishing frequency and consistency
-               - Content quality and engagement metrics
-               - Target audience alignment and reach
-            
-            2. Keyword Analysis:
-               - Usage of target keywords: {', '.join(keywords)}
-               - Keyword density and placement strategy
-               - Related keywords and semantic relevance
-               - Overall SEO optimization effectiveness
-            
-            3. Market Presence:
-               - Brand positioning and market share
-               - Unique selling propositions (USPs)
-               - Customer engagement and loyalty
-               - Brand authority and credibility indicators
+    def _page_excerpts(self, url: str, body: bytes, content_type: str, keywords: List[str]) -> str:
+        # The page just fetched is indexed in place; only its chunks closest to the keywords reach the prompt
+        try:
+            self.site_index.add_page(url, body, content_type)
+            return "\n---\n".join(self.site_index.search(urlparse(url).netloc, ", ".join(keywords), k=3))
+        except Exception as e:
+            logger.warning("Could not index %s: %s", url, e)
+            return ""
+
+    @traced_tool
+    def seo_batch_audit(self, urls: Optional[List[str]] = None, sitemap_url: Optional[str] = None,
+                        max_pages: int = 500) -> List[Dict[str, Any]]:
+        # Audits many pages in parallel and returns the raw on-page fields only, without LLM recommendations
+        from fetcher import AsyncFetcher
+        fetcher = AsyncFetcher()
+        urls = list(urls or [])
+        if sitemap_url:
+            urls.extend(fetcher.sitemap_urls(sitemap_url, max_urls=max_pages))
+        urls = list(dict.fromkeys(urls))[:max_pages]
+        results = []
+        for page in fetcher.fetch_all(urls):
+            if "error" in page:
+                results.append({"url": page["url"], "error": page["error"]})
+                continue
+            try:
+                results.append({"url": page["url"], **extract_seo_fields(page["content"], page["content_type"])})
+            except Exception as e:
+                results.append({"url": page["url"], "error": str(e)})
+        return results
+
+    def _competitor_prompts(self, competitor: str, keywords: List[str], site_context: str = "") -> Dict[str, str]:
+        # site_context holds retrieved excerpts of the competitor's own pages, when there are any
+        grounding = f"""
+                Excerpts from {competitor}'s website; base your answer on them where they are relevant:
+                {site_context}
+                """ if site_context else ""
+        prompts = {
+            "quick_summary": f"""
+                Provide a concise 3-point summary of {competitor}'s key strengths and market positioning:
+                1. Primary competitive advantage
+                2. Target audience focus
+                3. Market differentiation
+                Keep each point brief and actionable.
+                """,
+            "analysis": f"""
+                Provide a detailed competitive analysis for {competitor} covering these sections:
+                1. Content Strategy:
+                   - Content types and formats used
+                   - Publishing frequency and consistency
+                   - Content quality and engagement metrics
+                   - Target audience alignment and reach
             
-            4. Competitive Advantages:
-               - Key strengths and core competencies
-               - Notable weaknesses and gaps
-               - Market opportunities to exploit
-               - Potential threats to address
+                2. Keyword Analysis:
+                   - Usage of target keywords: {', '.join(keywords)}
+                   - Keyword density and placement strategy
+                   - Related keywords and semantic relevance
+                   - Overall SEO optimization effectiveness
             
-            5. Actionable Recommendations:
-               - Immediate actions (next 30 days):
-                 * Specific tactical improvements
-                 * Quick wins and low-hanging fruit
-               - Strategic initiatives (next 90 days):
-                 * Long-term competitive advantages
-                 * Market positioning improvements
-               - Resource allocation suggestions:
-                 * Required investments
-                 * Expected outcomes
+                3. Market Presence:
+                   - Brand positioning and market share
+                   - Unique selling propositions (USPs)
+                   - Customer engagement and loyalty
+                   - Brand authority and credibility indicators
             
-            Format each section with clear bullet points and specific examples.
-            """
-            competitor_analysis = self._get_completion(analysis_prompt)
+                4. Competitive Advantages:
+                   - Key strengths and core competencies
+                   - Notable weaknesses and gaps
+                   - Market opportunities to exploit
+                   - Potential threats to address
             
-            # Metrics analysis
-            metrics_prompt = f"""
-            Based on the website {competitor}, provide detailed metrics with justification:
-            1. Content Quality Score (0-100):
-               - Writing quality
-               - Visual appeal
-               - User engagement
+                5. Actionable Recommendations:
+                   - Immediate actions (next 30 days):
+                     * Specific tactical improvements
+                     * Quick wins and low-hanging fruit
+                   - Strategic initiatives (next 90 days):
+                     * Long-term competitive advantages
+                     * Market positioning improvements
+                   - Resource allocation suggestions:
+                     * Required investments
+                     * Expected outcomes
             
-            2. Keyword Optimization Level (0-100):
-               - Keyword relevance
-               - Content optimization
-               - Technical SEO
+                Format each section with clear bullet points and specific examples.
+                Respond with a JSON object only, in exactly this form:
+                {ANALYSIS_SCHEMA}
+                """,
+            "metrics": f"""
+                Based on the website {competitor}, provide detailed metrics with justification:
+                1. Content Quality Score (0-100):
+                   - Writing quality
+                   - Visual appeal
+                   - User engagement
             
-            3. Market Position Strength (0-100):
-               - Brand authority
-               - Market share
-               - Competitive advantage
+                2. Keyword Optimization Level (0-100):
+                   - Keyword relevance
+                   - Content optimization
+                   - Technical SEO
             
-            4. Brand Authority Score (0-100):
-               - Industry presence
-               - Social proof
-               - Thought leadership
+                3. Market Position Strength (0-100):
+                   - Brand authority
+                   - Market share
+                   - Competitive advantage
             
-            For each metric, provide a specific score and brief justification.
-            """
-            metrics_analysis = self._get_completion(metrics_prompt)
+                4. Brand Authority Score (0-100):
+                   - Industry presence
+                   - Social proof
+                   - Thought leadership
             
-            competitor_data[competitor] = {
-                "quick_summary": quick_summary,
-                "analysis": competitor_analysis,
-                "metrics": metrics_analysis
-            }
-        return competitor_data
+                For each metric, provide a specific score and brief justification.
+                Respond with a JSON object only, in exactly this form:
+                {{"metrics": [{{"name": "<metric name as listed above, without the range>",
+                               "score": <integer 0-100>, "justification": "<one or two sentences>"}}]}}
+                """,
+        }
+        return {field: grounding + prompt for field, prompt in prompts.items()}
+
+    def _competitor_contexts(self, competitors: List[str], keywords: List[str],
+                             refresh: Optional[List[str]] = None) -> Dict[str, str]:
+        # Crawls (or reuses the index of) each competitor site in parallel and retrieves its top chunks;
+        # sites in refresh are crawled again even if their pages were indexed recently
+        refresh = set(refresh or [])
+        if not competitors:
+            return {}
+        query = f"{', '.join(keywords)}; products, services, audience, positioning, pricing, content"
+        workers = min(self.max_concurrency, len(competitors))
+        with ThreadPoolExecutor(max_workers=workers, **_worker_context()) as executor:
+            futures = {competitor: submit_in_context(executor, self.site_index.context_for, _site_url(competitor),
+                                                     query, refresh=competitor in refresh)
+                       for competitor in competitors}
+            return {competitor: future.result() for competitor, future in futures.items()}
+
+    def _competitor_fingerprints(self, competitors: List[str]) -> Dict[str, Optional[str]]:
+        # One conditional fetch per site; unreachable sites get None and are always re-analysed
+        from fetcher import AsyncFetcher
+        urls = {competitor: _site_url(competitor) for competitor in competitors}
+        pages = {page["url"]: page for page in AsyncFetcher().fetch_all(list(dict.fromkeys(urls.values())))}
+        fingerprints = {}
+        for competitor, url in urls.items():
+            page = pages[url]
+            try:
+                fingerprints[competitor] = None if "error" in page else page_fingerprint(page["content"],
+                                                                                        page["content_type"])
+            except Exception as e:
+                logger.warning("Could not fingerprint %s: %s", competitor, e)
+                fingerprints[competitor] = None
+        return fingerprints
+
+    @traced_tool
+    @recorded_tool
+    def competitor_watchdog(self, competitors: List[str], keywords: List[str], concurrent: bool = True,
+                            stream_to: Optional[Dict[str, Any]] = None, incremental: bool = True,
+                            grounded: bool = True) -> Dict[str, Any]:
+        # stream_to maps a competitor to the placeholder its quick summary is streamed into; the analysis and
+        # metrics come back as JSON and are returned structured (see structure_competitor_result).
+        # With incremental, competitors whose site and keywords are unchanged since the last run reuse its result.
+        # With grounded, the prompts carry the most relevant excerpts of each competitor's crawled site.
+        # Without incremental, fingerprints are still taken so the fresh results replace the stored ones
+        competitor_data = {}
+        fingerprints = self._competitor_fingerprints(competitors)
+        refresh = []
+        for competitor, fingerprint in fingerprints.items() if incremental else ():
+            stored = self.competitor_store.get(competitor, keywords) if fingerprint else None
+            if stored and stored["fingerprint"] != fingerprint:
+                refresh.append(competitor)
+            elif stored:
+                result = stored["result"]
+                if "scores" not in result:
+                    result = structure_competitor_result(result["quick_summary"], result["analysis"], result["metrics"])
+                competitor_data[competitor] = result
+                self.competitor_store.touch(competitor, keywords)
+                if stream_to and competitor in stream_to:
+                    stream_to[competitor].markdown(result["quick_summary"])
+        changed = [competitor for competitor in competitors if competitor not in competitor_data]
+        if incremental:
+            logger.info("Competitor watchdog: %d unchanged, %d to analyse", len(competitor_data), len(changed))
+        else:
+            refresh = changed
+
+        stream_to = {(competitor, "quick_summary"): placeholder
+                     for competitor, placeholder in (stream_to or {}).items()}
+        # A changed site is crawled again, so its new pages reach the prompts
+        contexts = self._competitor_contexts(changed, keywords, refresh) if grounded else {}
+        prompts = {
+            (competitor, field): prompt
+            for competitor in changed
+            for field, prompt in self._competitor_prompts(competitor, keywords, contexts.get(competitor, "")).items()
+        }
+        # The 3-point summary and the scores are short, so they can go to a smaller, faster model
+        tasks = {"quick_summary": {"task": "summary"}, "analysis": {"json_mode": True, "task": "analysis"},
+                 "metrics": {"json_mode": True, "task": "scoring"}}
+        # Only competitors that need a new analysis get here. Their prompts can be identical to the last run's
+        # (e.g. ungrounded, or the same excerpts), so cached answers would just return the stale analysis.
+        options_for = {key: {**tasks[key[1]], "use_cache": False} for key in prompts}
+        if concurrent:
+            # All prompts of a run are independent, so send them at once
+            completions = self._get_completions(prompts, stream_to=stream_to, options_for=options_for)
+        else:
+            completions = {key: self._get_completion(prompt, placeholder=stream_to.get(key), **options_for.get(key, {}))
+                           for key, prompt in prompts.items()}
+        for competitor in changed:
+            raw = [completions[(competitor, field)] for field in ("quick_summary", "analysis", "metrics")]
+            competitor_data[competitor] = structure_competitor_result(*raw)
+            # Failed generations are not stored, so the next run retries them
+            if fingerprints.get(competitor) and COMPLETION_FALLBACK not in raw:
+                self.competitor_store.save(competitor, keywords, fingerprints[competitor], competitor_data[competitor])
+        # Every run is added to the score history, reused results included, so deltas line up by run date
+        run_at = time.time()
+        for competitor, result in competitor_data.items():
+            self.competitor_store.record_scores(competitor, keywords, result["scores"], run_at)
+        return {competitor: competitor_data[competitor] for competitor in competitors}
 
-    def post_creator(self, topic: str, platform: str, tone: str = "professional") -> Dict[str, Any]:
+    def competitor_score_matrix(self, keywords: List[str], competitors: Optional[List[str]] = None,
+                                weights: Optional[Dict[str, float]] = None):
+        # Scores of every recorded run for this keyword set as a DataFrame (see scoring.scoring_matrix)
+        from scoring import scores_frame, scoring_matrix
+        history = scores_frame(self.competitor_store.score_history(keywords))
+        if competitors is not None:
+            history = history[history["competitor"].isin(competitors)]
+        return scoring_matrix(history, COMPETITOR_METRICS, weights)
+
+    @traced_tool
+    @recorded_tool
+    def post_creator(self, topic: str, platform: str, tone: str = "professional", stream_to: Any = None) -> Dict[str, Any]:
         content_prompt = f"""
         Create a {platform} post about {topic} with a {tone} tone.
         Include:
         1. Main post content
         2. Relevant hashtags
         3. Call to action
-        4. Best posting time recommendation
         """
-        content = self._get_completion(content_prompt)
-        return {"platform": platform, "content": content, "topic": topic, "created_at": datetime.now().isoformat()}
+        # Near-duplicate topics may share a post, but only one written for the same platform and tone
+        content = self._get_completion(content_prompt, placeholder=stream_to, semantic=topic, task="creative",
+                                       semantic_scope=f"{platform}|{tone}")
+        # Posting times come from a local table rather than another generated paragraph
+        return {"platform": platform, "content": content, "topic": topic,
+                "posting_time": recommend_posting_time(platform, date.today()),
+                "created_at": datetime.now().isoformat()}
+
+    @traced_tool
+    @recorded_tool
+    def content_calendar(self, topics: List[str], platforms: List[str], tones: List[str], dates: List[date],
+                         posts_per_request: int = 5,
+                         on_post: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        # One post per topic x platform x tone x date. Each topic/platform/tone combination is asked for its
+        # posts in JSON batches, so the shared brief is sent once per batch rather than once per date.
+        # on_post is called on the calling thread as each post is ready.
+        topics = list(dict.fromkeys(topic.strip() for topic in topics if topic.strip()))
+        platforms, tones, dates = list(dict.fromkeys(platforms)), list(dict.fromkeys(tones)), sorted(set(dates))
+        batches = {}
+        for topic in topics:
+            for platform in platforms:
+                for tone in tones:
+                    for start in range(0, len(dates), posts_per_request):
+                        batches[(topic, platform, tone, start)] = dates[start:start + posts_per_request]
+        if not batches:
+            return []
+
+        entries = []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches)), **_worker_context()) as executor:
+            futures = [submit_in_context(executor, self._calendar_batch, topic, platform, tone, batch_dates)
+                       for (topic, platform, tone, _), batch_dates in batches.items()]
+            for future in as_completed(futures):
+                for entry in future.result():
+                    entries.append(entry)
+                    if on_post:
+                        on_post(entry)
+        return sorted(entries, key=lambda entry: (entry["date"], entry["posting_time"], entry["platform"]))
+
+    def _calendar_batch(self, topic: str, platform: str, tone: str, dates: List[date]) -> List[Dict[str, Any]]:
+        prompt = f"""
+        Create {len(dates)} distinct {platform} posts about {topic} with a {tone} tone,
+        one for each of these publishing dates: {', '.join(day.isoformat() for day in dates)}.
+        Vary the angle, hook and call to action from post to post.
+        Respond with a JSON object only, in exactly this form:
+        {{"posts": [{{"date": "<YYYY-MM-DD>", "content": "<main post content>",
+                      "hashtags": ["<hashtag>"], "call_to_action": "<call to action>"}}]}}
+        """
+        response = self._get_completion(prompt, json_mode=True, task="creative",
+                                        max_tokens=self.router.token_budget("creative", current_tool.get(), len(dates)))
+        posts = _load_json_object(response).get("posts")
+        posts = [post for post in posts if isinstance(post, dict)] if isinstance(posts, list) else []
+        by_date = {str(post.get("date")): post for post in posts}
+        entries = []
+        for index, day in enumerate(dates):
+            # Match by date, then by position; a missing post costs one single-post request
+            post = by_date.get(day.isoformat()) or (posts[index] if index < len(posts) else None)
+            if not post or not post.get("content"):
+                post = {"content": self._get_completion(f"""
+                Create a {platform} post about {topic} with a {tone} tone, to be published on {day.isoformat()}.
+                Include:
+                1. Main post content
+                2. Relevant hashtags
+                3. Call to action
+                """, task="creative"), "hashtags": [], "call_to_action": ""}
+            hashtags = post.get("hashtags")
+            entries.append({
+                "date": day.isoformat(),
+                "posting_time": recommend_posting_time(platform, day),
+                "platform": platform,
+                "topic": topic,
+                "tone": tone,
+                "content": str(post["content"]),
+                "hashtags": [str(tag) for tag in hashtags] if isinstance(hashtags, list) else [],
+                "call_to_action": str(post.get("call_to_action") or "")
+            })
+        return entries
 
-    def smart_email_manager(self, campaign_type: str, audience: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @traced_tool
+    @recorded_tool
+    def smart_email_manager(self, campaign_type: str, audience: List[Dict[str, Any]],
+                            stream_to: Optional[Dict[str, Any]] = None, batched: bool = True,
+                            segments_per_request: int = 3) -> Dict[str, Any]:
+        # stream_to maps a segment name to the placeholder its email body is streamed into. A batched JSON
+        # response can only be shown once all of it has arrived, so streaming callers get one request per
+        # segment: more prompt tokens, but each email appears as it is written. batched applies otherwise.
+        stream_to = stream_to or {}
         email_templates = {}
+        if batched and not stream_to:
+            email_templates = self._batched_email_templates(campaign_type, audience, segments_per_request)
+        # Segments the batched response did not cover fall back to one call each
         for segment in audience:
+            if segment["segment_name"] in email_templates:
+                continue
             email_prompt = f"""
             Create an email campaign for:
             Campaign Type: {campaign_type}
@@ -396,7 +909,8 @@ class MarketingAgencyAutomation:
             3. Call to action
             4. Personalization elements
             """
-            email_content = self._get_completion(email_prompt)
+            email_content = self._get_completion(email_prompt, placeholder=stream_to.get(segment["segment_name"]),
+                                                 task="long_form")
             email_templates[segment["segment_name"]] = {
                 "content": email_content,
                 "subject_lines": self.generate_subject_lines(campaign_type, segment),
@@ -404,9 +918,54 @@ class MarketingAgencyAutomation:
             }
         return email_templates
 
+    def _batched_email_templates(self, campaign_type: str, audience: List[Dict[str, Any]],
+                                 segments_per_request: int) -> Dict[str, Any]:
+        # Packs several segments into one JSON-mode request so the shared instructions are sent once
+        batches = [audience[i:i + segments_per_request] for i in range(0, len(audience), segments_per_request)]
+        prompts = {}
+        for index, batch in enumerate(batches):
+            prompts[index] = f"""
+            Create one email campaign per audience segment below.
+            Campaign Type: {campaign_type}
+            Audience Segments: {json.dumps(batch)}
+            For each segment include:
+            1. Subject line options
+            2. Email body
+            3. Call to action
+            4. Personalization elements
+            Respond with a JSON object only, in exactly this form:
+            {{"segments": [{{"segment_name": "<segment name as given>",
+                             "content": "<the full email campaign as markdown>",
+                             "subject_lines": ["<5 engaging subject lines>"]}}]}}
+            """
+        responses = self._get_completions(prompts, json_mode=True, task="long_form",
+                                          max_tokens=self.router.token_budget("long_form", current_tool.get(),
+                                                                              segments_per_request))
+        email_templates = {}
+        for index, batch in enumerate(batches):
+            try:
+                generated = {item["segment_name"]: item for item in json.loads(responses[index])["segments"]}
+            except (ValueError, KeyError, TypeError):
+                continue
+            for segment in batch:
+                item = generated.get(segment["segment_name"])
+                if not isinstance(item, dict) or not item.get("content") or not isinstance(item.get("subject_lines"), list):
+                    continue
+                email_templates[segment["segment_name"]] = {
+                    "content": item["content"],
+                    "subject_lines": [str(line) for line in item["subject_lines"]],
+                    "send_time": self.optimize_send_time(segment)
+                }
+        return email_templates
+
+    @traced_tool
     def generate_subject_lines(self, campaign_type: str, segment: Dict[str, Any]) -> List[str]:
         prompt = f"Generate 5 engaging subject lines for {campaign_type} campaign targeting {segment['segment_name']}"
-        return self._get_completion(prompt).split("\n")
+        # Near-identical segments (e.g. "New Customers" and "New customers") may share subject lines, but only
+        # within the same campaign type
+        segment_text = f"{segment['segment_name']}: {segment.get('characteristics', '')}"
+        return self._get_completion(prompt, semantic=segment_text, task="short",
+                                    semantic_scope=campaign_type).split("\n")
 
     def optimize_send_time(self, segment: Dict[str, Any]) -> str:
         if segment.get("characteristics") == "first_time_buyers":
@@ -415,44 +974,516 @@ class MarketingAgencyAutomation:
             return "09:00 AM"
         return "10:00 AM"
 
+class TaskGraph:
+    # Runs each node as soon as all the nodes it depends on have finished
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.tasks = {}
+
+    def add(self, name: str, func: Callable[..., Any], depends_on: Optional[List[str]] = None):
+        # func receives the results of its dependencies as keyword arguments
+        self.tasks[name] = (func, list(depends_on or []))
+
+    def run(self, on_complete: Optional[Callable[[str, Any, int, int], None]] = None,
+            completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # completed seeds results from an earlier, interrupted run; those nodes are not executed again
+        results = {name: result for name, result in (completed or {}).items() if name in self.tasks}
+        pending = {name: task for name, task in self.tasks.items() if name not in results}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, **_worker_context()) as executor:
+            while pending or running:
+                for name, (func, deps) in list(pending.items()):
+                    if all(dep in results for dep in deps):
+                        del pending[name]
+                        running[submit_in_context(executor, func, **{dep: results[dep] for dep in deps})] = name
+                if not running:
+                    raise ValueError(f"Unresolvable dependencies for: {', '.join(pending)}")
+                # Callbacks fire on the calling thread, so they may safely update Streamlit widgets
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                error = self._collect(done, running, results, on_complete)
+                if error is not None:
+                    # Nodes already running finish while the pool shuts down anyway; report the ones that
+                    # succeed, so a resumed run does not pay for them again, and only then fail
+                    self._collect(as_completed(list(running)), running, results, on_complete)
+                    raise error
+        return results
+
+    def _collect(self, futures, running: Dict[Any, str], results: Dict[str, Any],
+                 on_complete: Optional[Callable[[str, Any, int, int], None]]) -> Optional[BaseException]:
+        # Records the finished futures and returns the first exception among them, if any
+        error = None
+        for future in futures:
+            name = running.pop(future)
+            if future.exception() is not None:
+                error = error or future.exception()
+                continue
+            results[name] = future.result()
+            if on_complete:
+                on_complete(name, results[name], len(results), len(self.tasks))
+        return error
+
+REPORT_STAGE_LABELS = {
+    "seo": "SEO analysis",
+    "competitors": "competitor analysis",
+    "content": "content ideas",
+    "email": "email strategy",
+    "summary": "final report"
+}
+
+REPORT_AUDIENCE = [
+    {"segment_name": "New Customers", "characteristics": "First-time Buyers", "engagement": "Medium"},
+    {"segment_name": "Returning Customers", "characteristics": "Repeat Customers", "engagement": "High"}
+]
+
+def build_report_graph(marketing_system: "MarketingAgencyAutomation", main_url: str, brand_name: str, industry: str,
+                       keywords_list: List[str], competitors: List[str], current_date: datetime) -> TaskGraph:
+    competitor_str = ", ".join(competitors)
+
+    def summarize(seo, competitors, content, email):
+        # Each input is compacted to its own budget so the prompt stays bounded as competitors are added
+        compact = marketing_system.compactor.compact
+        per_competitor = SUMMARY_BUDGETS["competitors"] // max(len(competitors), 1)
+        seo_summary = compact(seo.get('recommendations', 'N/A'), SUMMARY_BUDGETS["seo"], keywords_list)
+        competitor_insights = ', '.join([f"{comp}: {compact(data['analysis'], per_competitor, keywords_list)}"
+                                         for comp, data in competitors.items()])
+        content_summary = compact(content['content'], SUMMARY_BUDGETS["content"], keywords_list)
+        email_budget = SUMMARY_BUDGETS["email"] // max(len(email), 1)
+        email_strategy = ', '.join([f"{seg}: {compact(data['content'], email_budget)}" for seg, data in email.items()])
+        summary_prompt = f"""
+        Create a comprehensive marketing analysis report based on:
+        Website: {main_url}
+        Brand: {brand_name}
+        Industry: {industry}
+        Keywords: {', '.join(keywords_list)}
+        Competitors: {competitor_str}
+        SEO Analysis: {seo_summary}
+        Competitor Insights: {competitor_insights}
+        Content Suggestions: {content_summary}
+        Email Strategy: {email_strategy}
+        
+        Provide a detailed report with:
+        1. Executive Summary
+        2. Current Market Position
+        3. Competitive Landscape
+        4. Marketing Opportunities
+        5. Action Plan with specific deadlines starting from {current_date.strftime('%Y-%m-%d')}:
+           - Short-term actions (within 1 week)
+           - Medium-term actions (within 1 month)
+           - Long-term actions (within 3 months)
+        """
+        with tool_span("comprehensive_summary"):
+            return marketing_system._get_completion(summary_prompt, task="long_form")
+
+    graph = TaskGraph()
+    graph.add("seo", lambda: marketing_system.seo_optimizer(main_url, keywords_list))
+    graph.add("competitors", lambda: marketing_system.competitor_watchdog(competitors, keywords_list))
+    graph.add("content", lambda: marketing_system.post_creator(f"{industry} trends", "LinkedIn", "professional"))
+    graph.add("email", lambda: marketing_system.smart_email_manager("Promotional", REPORT_AUDIENCE))
+    graph.add("summary", summarize, depends_on=["seo", "competitors", "content", "email"])
+    return graph
+
+REPORT_POLL_SECONDS = 2
+
+def run_report_job(params: Dict[str, Any], completed_stages: Dict[str, Any],
+                   on_stage: Callable[[str, Any], None]) -> str:
+    # API failures fail the stage instead of saving the fallback text, so the job can be resumed from it
+    marketing_system = MarketingAgencyAutomation(raise_errors=True)
+    graph = build_report_graph(marketing_system, params["main_url"], params["brand_name"], params["industry"],
+                               params["keywords"], params["competitors"],
+                               datetime.fromisoformat(params["current_date"]))
+    # Reports run in the background, so they queue as batch work behind interactive requests
+    with brand_scope(params["brand_name"]), tenant_scope(params["brand_name"], BATCH):
+        stage_results = graph.run(on_complete=lambda name, result, done, total: on_stage(name, result),
+                                  completed=completed_stages)
+    return stage_results["summary"]
+
+def _create_job_manager() -> JobManager:
+    return JobManager({"comprehensive_report": run_report_job})
+
+def _create_marketing_system() -> "MarketingAgencyAutomation":
+    import streamlit as st
+    return MarketingAgencyAutomation(on_error=st.error)
+
+def _session_id() -> str:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+def _create_monitor_store():
+    # Imported here: monitor builds on this module to run its schedules
+    from monitor import MonitorStore
+    return MonitorStore()
+
+def get_monitor_store():
+    import streamlit as st
+    return st.cache_resource(_create_monitor_store)()
+
+def get_job_manager() -> JobManager:
+    # Shared by every session of this server process; workers outlive individual script reruns
+    import streamlit as st
+    return st.cache_resource(_create_job_manager)()
+
+def get_marketing_system() -> "MarketingAgencyAutomation":
+    # One engine (HTTP session, rate limiter, lazily built Groq client) for all sessions of this process
+    import streamlit as st
+    return st.cache_resource(_create_marketing_system)()
+
+def render_competitor_card(competitor: str, data: Dict[str, Any]):
+    import streamlit as st
+    st.markdown('<div class="competitor-card">', unsafe_allow_html=True)
+    st.subheader(f"Analysis for {competitor}")
+
+    # Display metrics in a grid
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### Key Metrics")
+        st.markdown(f'<div class="metric-box">{data["metrics"]}</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown("### Quick Summary")
+        st.markdown(f'<div class="metric-box">{data["quick_summary"]}</div>', unsafe_allow_html=True)
+
+    # Results stored before structured output only carry the analysis text
+    sections = data.get("sections") or parse_analysis_sections(data["analysis"])
+    analysis_tabs = st.tabs(list(sections.keys()))
+    for tab, content in zip(analysis_tabs, sections.values()):
+        with tab:
+            st.markdown(content or "*No analysis was returned for this section.*")
+
+    st.markdown("---")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def render_competitor_results(marketing_system: "MarketingAgencyAutomation", results: Dict[str, Any],
+                              keywords: List[str]):
+    # One scoreboard for all competitors, then the written analysis per competitor in tabs
+    import streamlit as st
+    from scoring import latest_run
+    matrix = marketing_system.competitor_score_matrix(keywords, list(results))
+    if not matrix.empty:
+        latest = latest_run(matrix)
+        st.markdown("### Competitor Scoreboard")
+        columns = ["rank", "composite", "composite change", "band"] + COMPETITOR_METRICS + ["run_at"]
+        st.dataframe(latest[columns], use_container_width=True)
+        st.bar_chart(latest[COMPETITOR_METRICS])
+        if matrix.index.get_level_values("run_at").nunique() > 1:
+            with st.expander("Composite score history"):
+                st.line_chart(matrix["composite"].unstack("competitor"))
+    for tab, (competitor, data) in zip(st.tabs(list(results)), results.items()):
+        with tab:
+            render_competitor_card(competitor, data)
+
+def render_comprehensive_report(params: Dict[str, Any], stage_results: Dict[str, Any], generated_at: datetime):
+    import streamlit as st
+    main_url, brand_name, industry = params["main_url"], params["brand_name"], params["industry"]
+    keywords_list, competitors = params["keywords"], params["competitors"]
+    current_date = datetime.fromisoformat(params["current_date"])
+    competitor_results = stage_results["competitors"]
+    comprehensive_report = stage_results["summary"]
+    competitor_str = ", ".join(competitors)
+
+    st.markdown("---")
+    st.subheader("Comprehensive Marketing Analysis Report")
+
+    # Full report section first
+    with st.expander("Full Report", expanded=True):
+        st.write(f"**Generated on:** {generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        st.write(f"**Brand:** {brand_name}")
+        st.markdown(comprehensive_report)
+
+    st.markdown("### Action Plan Timeline")
+    deadlines = {
+        "Short-term (1 week)": current_date + timedelta(weeks=1),
+        "Medium-term (1 month)": current_date + timedelta(weeks=4),
+        "Long-term (3 months)": current_date + timedelta(weeks=12)
+    }
+    for term, deadline in deadlines.items():
+        st.write(f"**{term}:** {deadline.strftime('%Y-%m-%d')}")
+
+    # Key Findings Summary moved after full report
+    st.markdown("### Key Findings Summary")
+    summary_data = {
+        "Aspect": ["Website", "Industry", "Keywords", "Competitors"],
+        "Details": [main_url, industry, ", ".join(keywords_list), competitor_str]
+    }
+    st.table(summary_data)
+
+    # Competitive Landscape Analysis section with scores
+    st.markdown("### Competitive Analysis & Scoring")
+
+    render_competitor_results(get_marketing_system(), competitor_results, keywords_list)
+
+    st.download_button(
+        label="Download Report",
+        data=comprehensive_report,
+        file_name=f"{brand_name}_marketing_report_{generated_at.strftime('%Y%m%d')}.txt",
+        mime="text/plain"
+    )
+
+def admit_or_warn(marketing_system: "MarketingAgencyAutomation", calls: int, priority: Optional[str] = None) -> bool:
+    # Shows the expected queueing delay before a run, and refuses the run when the queue is too long
+    import streamlit as st
+    try:
+        expected_wait = marketing_system.admit(calls, priority)
+    except AdmissionError as e:
+        st.warning(str(e))
+        return False
+    if expected_wait >= 5:
+        st.caption(f"Sharing the API quota with other users: expected wait about {expected_wait:.0f}s")
+    return True
+
+RECORDED_TOOL_LABELS = {
+    "seo_optimizer": "SEO Optimizer",
+    "competitor_watchdog": "Competitor Watchdog",
+    "post_creator": "Post Creator",
+    "content_calendar": "Content Calendar",
+    "smart_email_manager": "Smart Email Manager"
+}
+
+def render_recorded_run(run: Dict[str, Any]):
+    # Renders a stored run as it was produced; nothing is regenerated
+    import streamlit as st
+    output, inputs = run["output"], run["inputs"]
+    if run["tool"] == "seo_optimizer":
+        if "error" in output:
+            st.error(f"SEO analysis failed: {output['error']}")
+            return
+        st.write(f"Title: {output['current_title']}")
+        st.write(f"Meta Description: {output['current_meta']}")
+        st.write(f"H1 Tags: {', '.join(output['current_h1'])}")
+        st.write("Recommendations:")
+        st.markdown(output["recommendations"])
+    elif run["tool"] == "competitor_watchdog":
+        st.dataframe({competitor: data.get("scores", {}) for competitor, data in output.items()},
+                     use_container_width=True)
+        for tab, (competitor, data) in zip(st.tabs(list(output)), output.items()):
+            with tab:
+                render_competitor_card(competitor, data)
+    elif run["tool"] == "post_creator":
+        st.markdown(output["content"])
+        st.caption(f"Suggested posting time: {output['posting_time']}")
+    elif run["tool"] == "content_calendar":
+        st.dataframe([{**entry, "hashtags": " ".join(entry["hashtags"])} for entry in output],
+                     use_container_width=True)
+    else:
+        for segment_name, template in output.items():
+            st.subheader(f"Campaign for {segment_name}")
+            st.markdown(template["content"])
+    with st.expander("Inputs"):
+        st.json(inputs)
+
+def render_history(marketing_system: "MarketingAgencyAutomation"):
+    # Past runs come from the results store, so browsing and reopening them costs no API calls
+    import streamlit as st
+    store = marketing_system.results_store
+    st.subheader("Results History")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        tool = st.selectbox("Tool:", [None] + list(RECORDED_TOOL_LABELS), key="hist_tool",
+                            format_func=lambda name: RECORDED_TOOL_LABELS.get(name, "All tools"))
+    with col2:
+        brand = st.selectbox("Brand:", [None] + store.brands(), key="hist_brand",
+                             format_func=lambda name: name or "All brands")
+    with col3:
+        competitor = st.selectbox("Competitor:", [None] + store.competitors(), key="hist_competitor",
+                                  format_func=lambda name: name or "All competitors")
+    query = st.text_input("Search inputs and results:", key="hist_query")
+    page = st.session_state.get("hist_page", 1)
+    history = store.history(tool=tool, brand=brand, competitor=competitor, query=query or None, page=page)
+    if not history["runs"]:
+        st.info("No recorded runs match.")
+        return
+    if history["pages"] > 1:
+        page = st.number_input(f"Page (of {history['pages']}):", min_value=1, max_value=history["pages"],
+                               value=min(page, history["pages"]), key="hist_page")
+        history = store.history(tool=tool, brand=brand, competitor=competitor, query=query or None, page=page)
+    st.caption(f"{history['total']} runs")
+    labels = {}
+    for run in history["runs"]:
+        subject = run["inputs"].get("url") or run["inputs"].get("topic") or run["inputs"].get("campaign_type") \
+            or ", ".join(run["inputs"].get("competitors") or run["inputs"].get("topics") or [])
+        labels[run["id"]] = (f"{datetime.fromtimestamp(run['started_at']).strftime('%Y-%m-%d %H:%M')} · "
+                             f"{RECORDED_TOOL_LABELS.get(run['tool'], run['tool'])} · {run['brand'] or '-'} · "
+                             f"{subject} ({run['elapsed_seconds']:.1f}s)")
+    run_id = st.radio("Runs:", list(labels), format_func=labels.get, key="hist_run")
+    run = store.get(run_id)
+    if run is not None:
+        render_recorded_run(run)
+
+def render_monitoring_diff(tool: str, diff: Dict[str, Any]):
+    import streamlit as st
+    if diff.get("first_run"):
+        st.write("First monitored run.")
+    elif tool == "seo":
+        for field, change in diff.items():
+            st.write(f"**{field.replace('_', ' ').title()}:** {change['before']} → {change['after']}")
+    else:
+        for competitor, change in diff.items():
+            if change.get("new") or change.get("removed"):
+                st.write(f"**{competitor}:** {'added' if change.get('new') else 'removed'}")
+                continue
+            scores = ", ".join(f"{metric} {delta:+.1f}" for metric, delta in change["score_changes"].items())
+            sections = ", ".join(change["sections_changed"])
+            st.write(f"**{competitor}:** " + "; ".join(part for part in (scores, sections and f"changed: {sections}")
+                                                       if part))
+
+def render_monitoring(marketing_system: "MarketingAgencyAutomation"):
+    # Reads only what the monitoring daemon (python monitor.py run) stored, so it never calls the API
+    import streamlit as st
+    store = get_monitor_store()
+    st.subheader("Scheduled Monitoring")
+    schedules = store.list_schedules()
+    with st.expander("Add Schedule"):
+        client = st.text_input("Client:", key="mon_client")
+        tool = st.selectbox("Tool:", ["competitors", "seo"], key="mon_tool",
+                            format_func={"competitors": "Competitor Watchdog", "seo": "SEO Optimizer"}.get)
+        targets = st.text_input("Competitor URLs (separated by ;):" if tool == "competitors" else "Page URL:",
+                                key="mon_targets")
+        keywords = st.text_input("Keywords:", placeholder="e.g., keyword1, keyword2", key="mon_keywords")
+        cron = st.text_input("Schedule (cron):", value="0 6 * * 1", key="mon_cron",
+                             help="minute hour day-of-month month day-of-week; the default is Mondays at 06:00")
+        if st.button("Add Schedule", key="mon_add"):
+            params = {"keywords": [k.strip() for k in keywords.split(',') if k.strip()]}
+            if tool == "competitors":
+                params["competitors"] = [url.strip() for url in targets.split(';') if url.strip()]
+            else:
+                params["url"] = targets.strip()
+            if not client or not targets or not params["keywords"]:
+                st.error("Please fill in all fields")
+            else:
+                try:
+                    store.add_schedule(client, tool, params, cron)
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
+    if not schedules:
+        st.info("No schedules yet. Runs happen in the background daemon: python monitor.py run")
+        return
+    labels, overview = {}, []
+    for schedule in schedules:
+        latest = store.latest(schedule["id"])
+        tool_label = "Competitor Watchdog" if schedule["tool"] == "competitors" else "SEO Optimizer"
+        labels[schedule["id"]] = f"{schedule['client']} · {tool_label}"
+        overview.append({
+            "Client": schedule["client"],
+            "Tool": tool_label,
+            "Schedule": schedule["cron"],
+            "Last run": datetime.fromtimestamp(latest["ran_at"]).strftime('%Y-%m-%d %H:%M') if latest else "",
+            "Changes": "" if latest is None else ("yes" if latest["changed"] else "no"),
+            "Next run": datetime.fromtimestamp(schedule["next_run_at"]).strftime('%Y-%m-%d %H:%M')
+        })
+    st.dataframe(overview, hide_index=True)
+
+    schedule_id = st.selectbox("Schedule:", list(labels), format_func=labels.get, key="mon_schedule")
+    schedule = next(schedule for schedule in schedules if schedule["id"] == schedule_id)
+    latest = store.latest(schedule_id)
+    if latest is None:
+        st.write("Waiting for the first run.")
+    else:
+        st.markdown("#### What changed")
+        changes = store.changes(schedule_id)
+        for change in changes[:5]:
+            st.caption(datetime.fromtimestamp(change["ran_at"]).strftime('%Y-%m-%d %H:%M'))
+            render_monitoring_diff(schedule["tool"], change["diff"])
+        if not changes:
+            st.write("Nothing has changed since monitoring started.")
+        st.markdown("#### Latest results")
+        if schedule["tool"] == "competitors":
+            render_competitor_results(marketing_system, latest["result"], schedule["params"]["keywords"])
+        else:
+            st.json(latest["result"])
+    if st.button("Stop monitoring", key="mon_remove"):
+        store.remove_schedule(schedule_id)
+        st.rerun()
+
 def main():
+    import streamlit as st
     init_streamlit()
     
     try:
-        marketing_system = MarketingAgencyAutomation()
+        marketing_system = get_marketing_system()
     except ValueError as e:
         st.error(f"Error: {str(e)}")
         st.info("Please set up your API key in the .env file:\nGROQ_API_KEY=your_groq_api_key_here")
         return
 
+    # Every run of this script starts from the sidebar value, so runs are filed under the brand shown there.
+    # The brand is also the tenant its requests queue as; without one, each browser session is its own tenant.
+    brand = st.sidebar.text_input("Brand / client:", key="brand").strip()
+    current_brand.set(brand or None)
+    current_tenant.set(brand or f"session-{_session_id()[:8]}")
+    cache_stats = marketing_system.cache.stats()
+    st.sidebar.caption(f"Completion cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                       f"({cache_stats['entries']} stored)")
+    semantic_stats = marketing_system.semantic_cache.stats()
+    if semantic_stats["entries"] or semantic_stats["hits"]:
+        st.sidebar.caption(f"Semantic cache: {semantic_stats['hits']} near-duplicate hits "
+                           f"({semantic_stats['entries']} stored)")
+    with st.sidebar.expander("Diagnostics"):
+        tracer = get_tracer()
+        summary = tracer.summary()
+        if summary:
+            st.markdown("**Per-tool calls**")
+            st.dataframe(summary)
+            st.markdown("**Recent calls**")
+            st.dataframe(tracer.snapshot()[-50:][::-1])
+        else:
+            st.caption("No LLM calls or fetches recorded yet.")
+        st.markdown("**Request queue**")
+        st.dataframe(marketing_system.llm.scheduler.stats())
+        flights = flight_stats()
+        if flights:
+            st.markdown("**Request coalescing**")
+            st.dataframe(flights)
+        st.download_button("Export JSON", tracer.to_json(), file_name="brandpulse_telemetry.json",
+                           mime="application/json", key="diag_json")
+        st.download_button("Export Prometheus", tracer.to_prometheus(), file_name="brandpulse_metrics.prom",
+                           mime="text/plain", key="diag_prom")
+
     # Define tabs with cleaner styling
-    tab1, tab2 = st.tabs(["Individual Analysis", "Comprehensive Analysis"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Individual Analysis", "Comprehensive Analysis", "Monitoring", "History"])
 
     with tab1:
         st.subheader("Individual Analysis Tools")
         
         # Clean tool selection
         tool = st.selectbox("Select Analysis Tool:", 
-                           ["SEO Optimizer", "Competitor Watchdog", "Post Creator", "Smart Email Manager"],
+                           ["SEO Optimizer", "SEO Batch Audit", "Competitor Watchdog", "Post Creator", "Content Calendar",
+                            "Smart Email Manager"],
                            key="individual_tool")
         
-        if tool == "SEO Optimizer":
+        if tool == "SEO Batch Audit":
+            page_urls = st.text_area("Page URLs (one per line):", key="ind_seo_batch_urls")
+            sitemap_url = st.text_input("Or sitemap URL:", placeholder="https://example.com/sitemap.xml", key="ind_seo_sitemap")
+            if st.button("Audit Pages", key="ind_seo_batch_button"):
+                urls = [u.strip() for u in page_urls.splitlines() if u.strip()]
+                if (urls or sitemap_url) and admit_or_warn(marketing_system, max(len(urls), 1)):
+                    with st.spinner("Auditing pages..."):
+                        results = marketing_system.seo_batch_audit(urls, sitemap_url or None)
+                        st.subheader(f"Audited {len(results)} pages")
+                        st.dataframe([
+                            {**page, "current_h1": ", ".join(page.get("current_h1", []))} for page in results
+                        ])
+
+        elif tool == "SEO Optimizer":
             url = st.text_input("Website URL:", placeholder="https://example.com", key="ind_seo_url")
             keywords = st.text_input("Target Keywords:", placeholder="e.g., keyword1, keyword2", key="ind_seo_keywords")
             if st.button("Analyze SEO", key="ind_seo_button"):
-                if url and keywords:
+                if url and keywords and admit_or_warn(marketing_system, 1):
                     with st.spinner("Analyzing SEO..."):
                         keywords_list = [k.strip() for k in keywords.split(',')]
-                        results = marketing_system.seo_optimizer(url, keywords_list)
+                        header = st.container()
+                        st.write("Recommendations:")
+                        recommendations = st.empty()
+                        results = marketing_system.seo_optimizer(url, keywords_list, stream_to=recommendations)
                         if "error" in results:
+                            recommendations.empty()
                             st.error(f"SEO analysis failed: {results['error']}")
                         else:
-                            st.subheader("SEO Analysis Results")
-                            st.write(f"Title: {results['current_title']}")
-                            st.write(f"Meta Description: {results['current_meta']}")
-                            st.write(f"H1 Tags: {', '.join(results['current_h1'])}")
-                            st.write("Recommendations:")
-                            st.write(results['recommendations'])
+                            with header:
+                                st.subheader("SEO Analysis Results")
+                                st.write(f"Title: {results['current_title']}")
+                                st.write(f"Meta Description: {results['current_meta']}")
+                                st.write(f"H1 Tags: {', '.join(results['current_h1'])}")
 
         elif tool == "Competitor Watchdog":
             num_competitors = st.number_input("Number of competitors:", min_value=1, max_value=5, value=1, key="ind_comp_num")
@@ -463,65 +1494,27 @@ def main():
                 with cols[i % 2]:
                     comp_url = st.text_input(f"Competitor {i+1} URL:", key=f"ind_comp_url_{i}")
                     competitors.append(comp_url)
+            if all(competitors) and keywords:
+                # Results precomputed by the monitoring daemon for the same inputs show up without any API calls
+                keywords_list = [k.strip() for k in keywords.split(',')]
+                monitored = get_monitor_store().latest_for("competitors",
+                                                           {"competitors": competitors, "keywords": keywords_list})
+                if monitored and not st.session_state.get("ind_comp_button"):
+                    st.caption(f"Latest monitored results from "
+                               f"{datetime.fromtimestamp(monitored['ran_at']).strftime('%Y-%m-%d %H:%M')}")
+                    render_competitor_results(marketing_system, monitored["result"], keywords_list)
+            full_refresh = st.checkbox("Re-analyse competitors whose sites have not changed", key="ind_comp_refresh")
             if st.button("Analyze Competitors", key="ind_comp_button"):
-                if all(competitors) and keywords:
+                if all(competitors) and keywords and admit_or_warn(marketing_system, 3 * len(competitors)):
                     with st.spinner("Analyzing competitors..."):
                         keywords_list = [k.strip() for k in keywords.split(',')]
-                        results = marketing_system.competitor_watchdog(competitors, keywords_list)
+                        live_analysis = {competitor: st.empty() for competitor in competitors}
+                        results = marketing_system.competitor_watchdog(competitors, keywords_list, stream_to=live_analysis,
+                                                                       incremental=not full_refresh)
+                        for placeholder in live_analysis.values():
+                            placeholder.empty()
                         
-                        # Display detailed analysis for each competitor
-                        for competitor, data in results.items():
-                            st.markdown(f'<div class="competitor-card">', unsafe_allow_html=True)
-                            st.subheader(f"Analysis for {competitor}")
-                            
-                            # Display metrics in a grid
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.markdown("### Key Metrics")
-                                st.markdown(f'<div class="metric-box">{data["metrics"]}</div>', unsafe_allow_html=True)
-                            
-                            with col2:
-                                st.markdown("### Quick Summary")
-                                st.markdown(f'<div class="metric-box">{data["quick_summary"]}</div>', unsafe_allow_html=True)
-                            
-                            # Parse and display analysis sections
-                            analysis_text = data['analysis']
-                            sections = {
-                                "Content Strategy": "",
-                                "Keyword Analysis": "",
-                                "Market Presence": "",
-                                "Competitive Advantages": "",
-                                "Actionable Recommendations": ""
-                            }
-                            
-                            # Parse sections
-                            current_section = ""
-                            current_content = []
-                            
-                            for line in analysis_text.split('\n'):
-                                if any(section in line for section in sections.keys()):
-                                    if current_section and current_content:
-                                        sections[current_section] = '\n'.join(current_content)
-                                        current_content = []
-                                    current_section = next(section for section in sections.keys() if section in line)
-                                elif current_section and line.strip():
-                                    current_content.append(line)
-                            
-                            if current_section and current_content:
-                                sections[current_section] = '\n'.join(current_content)
-                            
-                            # Display sections in tabs
-                            analysis_tabs = st.tabs(list(sections.keys()))
-                            
-                            for tab, (section_name, content) in zip(analysis_tabs, sections.items()):
-                                with tab:
-                                    if content:
-                                        st.markdown(content)
-                                    else:
-                                        st.markdown("*Analysis for this section is being generated...*")
-                            
-                            st.markdown("---")
-                            st.markdown('</div>', unsafe_allow_html=True)
+                        render_competitor_results(marketing_system, results, keywords_list)
 
         elif tool == "Post Creator":
             content_type = st.selectbox("Content Type:", ["Social Media Post", "Blog Post", "Marketing Copy"], key="ind_content_type")
@@ -536,11 +1529,59 @@ def main():
             with col2:
                 tone = st.selectbox("Tone:", ["Professional", "Casual", "Friendly", "Formal"], key="ind_content_tone")
             if st.button("Generate Content", key="ind_content_button"):
-                if topic:
+                if topic and admit_or_warn(marketing_system, 1):
                     with st.spinner("Generating content..."):
-                        post = marketing_system.post_creator(topic, platform, tone.lower())
                         st.subheader("Generated Content")
-                        st.write(post['content'])
+                        post = marketing_system.post_creator(topic, platform, tone.lower(), stream_to=st.empty())
+                        st.caption(f"Suggested posting time: {post['posting_time']}")
+
+        elif tool == "Content Calendar":
+            topics = st.text_area("Topics (one per line):", key="cal_topics")
+            col1, col2 = st.columns(2)
+            with col1:
+                platforms = st.multiselect("Platforms:", ["LinkedIn", "Twitter", "Facebook", "Instagram"],
+                                           default=["LinkedIn"], key="cal_platforms")
+                tones = st.multiselect("Tones:", ["Professional", "Casual", "Friendly", "Formal"],
+                                       default=["Professional"], key="cal_tones")
+            with col2:
+                today = date.today()
+                period = st.date_input("Period:", (today, today + timedelta(days=27)), key="cal_period")
+                weekday_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+                post_days = st.multiselect("Post on:", weekday_names, default=weekday_names[:5], key="cal_weekdays")
+            if st.button("Build Calendar", key="cal_button"):
+                topic_list = [t.strip() for t in topics.splitlines() if t.strip()]
+                # At least one request per topic, platform and tone
+                if topic_list and platforms and tones and len(period) == 2 \
+                        and admit_or_warn(marketing_system, len(topic_list) * len(platforms) * len(tones)):
+                    from content_calendar import date_range
+                    dates = date_range(period[0], period[1], [weekday_names.index(day) for day in post_days])
+                    total = len(topic_list) * len(platforms) * len(tones) * len(dates)
+                    progress = st.progress(0, text=f"0 of {total} posts")
+                    live_table = st.empty()
+                    entries = []
+
+                    def show_post(entry):
+                        entries.append(entry)
+                        progress.progress(len(entries) / total, text=f"{len(entries)} of {total} posts")
+                        live_table.dataframe(entries, use_container_width=True)
+
+                    st.session_state["content_calendar"] = marketing_system.content_calendar(
+                        topic_list, platforms, [tone.lower() for tone in tones], dates, on_post=show_post)
+                    progress.empty()
+                    live_table.empty()
+            # Kept in session state so the download buttons' reruns do not discard the calendar
+            calendar_entries = st.session_state.get("content_calendar")
+            if calendar_entries:
+                from content_calendar import calendar_to_csv, calendar_to_jsonl
+                st.subheader(f"Content Calendar ({len(calendar_entries)} posts)")
+                st.dataframe(calendar_entries, use_container_width=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button("Download CSV", calendar_to_csv(calendar_entries),
+                                       file_name="content_calendar.csv", mime="text/csv", key="cal_csv")
+                with col2:
+                    st.download_button("Download JSONL", calendar_to_jsonl(calendar_entries),
+                                       file_name="content_calendar.jsonl", mime="application/jsonl", key="cal_jsonl")
 
         elif tool == "Smart Email Manager":
             col1, col2, col3 = st.columns(3)
@@ -564,12 +1605,20 @@ def main():
                 if name:
                     segments.append({"segment_name": name.strip(), "characteristics": characteristics, "engagement": previous_engagement})
             if st.button("Generate Campaign", key="ind_email_button"):
-                if brand_name and segments:
+                if brand_name and segments and admit_or_warn(marketing_system, -(-len(segments) // 3)):
                     with st.spinner("Crafting your email campaign..."):
-                        results = marketing_system.smart_email_manager(campaign_type, segments)
-                        for segment_name, email in results.items():
-                            st.subheader(f"Campaign for {segment_name}")
-                            st.write(email['content'])
+                        live_emails = {}
+                        for segment in segments:
+                            st.subheader(f"Campaign for {segment['segment_name']}")
+                            live_emails[segment["segment_name"]] = st.empty()
+                        marketing_system.smart_email_manager(campaign_type, segments, stream_to=live_emails)
+
+    # Rendered before the comprehensive tab, whose early returns would otherwise skip them
+    with tab3:
+        render_monitoring(marketing_system)
+
+    with tab4:
+        render_history(marketing_system)
 
     with tab2:
         st.subheader("Comprehensive Marketing Analysis Dashboard")
@@ -594,151 +1643,63 @@ def main():
         progress_bar = st.progress(0)
         status_text = st.empty()
 
+        job_manager = get_job_manager()
+        with st.expander("Recent Reports"):
+            recent_jobs = job_manager.list_jobs("comprehensive_report", limit=10)
+            if recent_jobs:
+                labels = {job["id"]: f"{job['params']['brand_name']} · {job['status']} · "
+                                     f"{datetime.fromtimestamp(job['created_at']).strftime('%Y-%m-%d %H:%M')}"
+                          for job in recent_jobs}
+                selected_job = st.selectbox("Reattach to report:", list(labels), format_func=labels.get,
+                                            key="comp_recent_job")
+                if st.button("Open Report", key="comp_open_job"):
+                    st.session_state["report_job_id"] = selected_job
+                    st.query_params["report_job"] = selected_job
+            else:
+                st.write("No reports yet.")
+
         if st.button("Generate Comprehensive Report", key="comp_button"):
             if not all([main_url, brand_name, industry]) or not all(competitors):
                 st.error("Please fill in all required fields")
                 return
-            
-            with st.spinner("Generating comprehensive marketing analysis..."):
-                current_date = datetime(2025, 3, 24)
-                keywords_list = [k.strip() for k in keywords.split(',')] if keywords else ["generic"]
-
-                status_text.text("Step 1/4: Analyzing SEO...")
-                seo_results = marketing_system.seo_optimizer(main_url, keywords_list)
-                progress_bar.progress(0.25)
-
-                status_text.text("Step 2/4: Analyzing competitors...")
-                competitor_results = marketing_system.competitor_watchdog(competitors, keywords_list)
-                progress_bar.progress(0.5)
-
-                status_text.text("Step 3/4: Generating content ideas...")
-                content_results = marketing_system.post_creator(f"{industry} trends", "LinkedIn", "professional")
-                progress_bar.progress(0.75)
-
-                status_text.text("Step 4/4: Creating email strategy...")
-                audience = [
-                    {"segment_name": "New Customers", "characteristics": "First-time Buyers", "engagement": "Medium"},
-                    {"segment_name": "Returning Customers", "characteristics": "Repeat Customers", "engagement": "High"}
-                ]
-                email_results = marketing_system.smart_email_manager("Promotional", audience)
-                progress_bar.progress(0.9)
-
-                status_text.text("Compiling final report with deadlines...")
-                competitor_str = ", ".join(competitors)
-                summary_prompt = f"""
-                Create a comprehensive marketing analysis report based on:
-                Website: {main_url}
-                Brand: {brand_name}
-                Industry: {industry}
-                Keywords: {', '.join(keywords_list)}
-                Competitors: {competitor_str}
-                SEO Analysis: {seo_results.get('recommendations', 'N/A')}
-                Competitor Insights: {', '.join([f"{comp}: {data['analysis']}" for comp, data in competitor_results.items()])}
-                Content Suggestions: {content_results['content']}
-                Email Strategy: {', '.join([f"{seg}: {data['content'][:100]}..." for seg, data in email_results.items()])}
-                
-                Provide a detailed report with:
-                1. Executive Summary
-                2. Current Market Position
-                3. Competitive Landscape
-                4. Marketing Opportunities
-                5. Action Plan with specific deadlines starting from {current_date.strftime('%Y-%m-%d')}:
-                   - Short-term actions (within 1 week)
-                   - Medium-term actions (within 1 month)
-                   - Long-term actions (within 3 months)
-                """
-                comprehensive_report = marketing_system._get_completion(summary_prompt)
-                progress_bar.progress(1.0)
-
-                st.markdown("---")
-                st.subheader("Comprehensive Marketing Analysis Report")
-                
-                # Full report section first
-                with st.expander("Full Report", expanded=True):
-                    st.write(f"**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                    st.write(f"**Brand:** {brand_name}")
-                    st.markdown(comprehensive_report)
-
-                st.markdown("### Action Plan Timeline")
-                deadlines = {
-                    "Short-term (1 week)": current_date + timedelta(weeks=1),
-                    "Medium-term (1 month)": current_date + timedelta(weeks=4),
-                    "Long-term (3 months)": current_date + timedelta(weeks=12)
-                }
-                for term, deadline in deadlines.items():
-                    st.write(f"**{term}:** {deadline.strftime('%Y-%m-%d')}")
-
-                # Key Findings Summary moved after full report
-                st.markdown("### Key Findings Summary")
-                summary_data = {
-                    "Aspect": ["Website", "Industry", "Keywords", "Competitors"],
-                    "Details": [main_url, industry, ", ".join(keywords_list), competitor_str]
-                }
-                st.table(summary_data)
-
-                # Competitive Landscape Analysis section with scores
-                st.markdown("### Competitive Analysis & Scoring")
-
-                # Display detailed analysis for each competitor
-                for competitor, data in competitor_results.items():
-                    st.markdown(f'<div class="competitor-card">', unsafe_allow_html=True)
-                    st.subheader(f"Analysis for {competitor}")
-                    
-                    # Display metrics in a grid
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("### Key Metrics")
-                        st.markdown(f'<div class="metric-box">{data["metrics"]}</div>', unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.markdown("### Quick Summary")
-                        st.markdown(f'<div class="metric-box">{data["quick_summary"]}</div>', unsafe_allow_html=True)
-                    
-                    # Parse and display analysis sections
-                    analysis_text = data['analysis']
-                    sections = {
-                        "Content Strategy": "",
-                        "Keyword Analysis": "",
-                        "Market Presence": "",
-                        "Competitive Advantages": "",
-                        "Actionable Recommendations": ""
-                    }
-                    
-                    # Parse sections
-                    current_section = ""
-                    current_content = []
-                    
-                    for line in analysis_text.split('\n'):
-                        if any(section in line for section in sections.keys()):
-                            if current_section and current_content:
-                                sections[current_section] = '\n'.join(current_content)
-                                current_content = []
-                            current_section = next(section for section in sections.keys() if section in line)
-                        elif current_section and line.strip():
-                            current_content.append(line)
-                    
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content)
-                    
-                    # Display sections in tabs
-                    analysis_tabs = st.tabs(list(sections.keys()))
-                    
-                    for tab, (section_name, content) in zip(analysis_tabs, sections.items()):
-                        with tab:
-                            if content:
-                                st.markdown(content)
-                            else:
-                                st.markdown("*Analysis for this section is being generated...*")
-                    
-                    st.markdown("---")
-                    st.markdown('</div>', unsafe_allow_html=True)
-
-                st.download_button(
-                    label="Download Report",
-                    data=comprehensive_report,
-                    file_name=f"{brand_name}_marketing_report_{datetime.now().strftime('%Y%m%d')}.txt",
-                    mime="text/plain"
-                )
+
+            # One SEO call, three per competitor, one post, one email batch and the summary
+            if not admit_or_warn(marketing_system, 3 * len(competitors) + 4, BATCH):
+                return
+            keywords_list = [k.strip() for k in keywords.split(',')] if keywords else ["generic"]
+            job_id = job_manager.submit("comprehensive_report", {
+                "main_url": main_url,
+                "brand_name": brand_name,
+                "industry": industry,
+                "keywords": keywords_list,
+                "competitors": competitors,
+                "current_date": datetime(2025, 3, 24).isoformat()
+            })
+            st.session_state["report_job_id"] = job_id
+            st.query_params["report_job"] = job_id
+
+        # The job id lives in the URL too, so a reload or a new tab reattaches to the same report
+        job_id = st.session_state.get("report_job_id") or st.query_params.get("report_job")
+        if job_id:
+            job = job_manager.get(job_id)
+            if job is None:
+                status_text.text("Report job not found.")
+                return
+            completed, total = len(job["stages"]), len(REPORT_STAGE_LABELS)
+            progress_bar.progress(completed / total)
+            if job["status"] in ("queued", "running"):
+                finished = ", ".join(REPORT_STAGE_LABELS[stage] for stage in job["stages"]) or "nothing yet"
+                status_text.text(f"Report {job['status']} ({completed}/{total} stages done: {finished})")
+                time.sleep(REPORT_POLL_SECONDS)
+                st.rerun()
+            elif job["status"] == "failed":
+                status_text.text(f"Report failed after {completed}/{total} stages.")
+                st.error(job["error"].splitlines()[0] if job["error"] else "Unknown error")
+                if st.button("Resume Report", key="comp_resume_job"):
+                    job_manager.resume(job_id)
+                    st.rerun()
+            else:
+                render_comprehensive_report(job["params"], job["stages"], datetime.fromtimestamp(job["updated_at"]))
                 status_text.text("Report complete!")
 
 if __name__ == "__main__":
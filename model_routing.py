@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_MAX_TOKENS = 1000
+# Cap for prompts that batch several outputs into one response
+MAX_BATCH_TOKENS = 8000
+DEFAULT_MODEL_TIERS_PATH = os.getenv(
+    "BRANDPULSE_MODEL_TIERS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_tiers.json")
+)
+
+class ModelRouter:
+    # Maps a task class (declared by each prompt) to a model and token budget. model_tiers.json names the
+    # tiers, the defaults per task class and per-tool overrides, e.g.
+    #   "tools": {"competitor_watchdog": {"scoring": {"tier": "quality"}}}
+    # Anything not configured goes to DEFAULT_MODEL with DEFAULT_MAX_TOKENS.
+    def __init__(self, config: Optional[Dict[str, Any]] = None, path: str = DEFAULT_MODEL_TIERS_PATH):
+        if config is None:
+            config = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    config = json.load(f)
+            else:
+                logger.info("No model tier config at %s; every prompt uses %s", path, DEFAULT_MODEL)
+        self.config = config
+        self.tiers: Dict[str, Dict[str, Any]] = config.get("tiers", {})
+        self.tasks: Dict[str, Dict[str, Any]] = config.get("tasks", {})
+        self.tools: Dict[str, Dict[str, Dict[str, Any]]] = config.get("tools", {})
+
+    def route(self, task: Optional[str] = None, tool: str = "unknown") -> Dict[str, Any]:
+        # Task defaults, then the tool's override for that task; a route may name a tier or a model directly
+        task = task or "default"
+        settings = {**self.tasks.get("default", {}), **self.tasks.get(task, {}),
+                    **self.tools.get(tool, {}).get(task, {})}
+        tier = settings.get("tier")
+        model = settings.get("model") or self.tiers.get(tier, {}).get("model") or DEFAULT_MODEL
+        return {"task": task, "tier": tier, "model": model,
+                "max_tokens": int(settings.get("max_tokens", DEFAULT_MAX_TOKENS))}
+
+    def token_budget(self, task: Optional[str], tool: str, items: int) -> int:
+        # Budget for one response carrying `items` outputs of the task
+        return min(self.route(task, tool)["max_tokens"] * items, MAX_BATCH_TOKENS)
+
+    def task_classes(self) -> List[str]:
+        return sorted(set(self.tasks) | {"default"})
+
+    def pinned(self, tier: str) -> "ModelRouter":
+        # Same budgets, every task on one tier; used to compare tiers against each other
+        return ModelRouter({
+            "tiers": self.tiers,
+            "tasks": {task: {**settings, "tier": tier} for task, settings in {"default": {}, **self.tasks}.items()},
+            "tools": {tool: {task: {key: value for key, value in settings.items() if key not in ("tier", "model")}
+                             for task, settings in overrides.items()}
+                      for tool, overrides in self.tools.items()}
+        })
+
+_shared_router = None
+_shared_router_lock = threading.Lock()
+
+def get_model_router() -> ModelRouter:
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter()
+        return _shared_router
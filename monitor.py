@@ -0,0 +1,360 @@
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from competitor_store import DEFAULT_RESULTS_PATH, keywords_key
+from marketing_agency import COMPETITOR_METRICS, COMPETITOR_SECTIONS, MarketingAgencyAutomation
+from fair_scheduler import BATCH, tenant_scope
+from results_store import brand_scope
+
+logger = logging.getLogger(__name__)
+
+MONITOR_TOOLS = ["competitors", "seo"]
+# Due runs are offset by a stable per-schedule delay within this window, so clients sharing a cron line
+# (e.g. every Monday 06:00) do not all fire in the same minute
+DEFAULT_SPREAD_SECONDS = 15 * 60
+# Fraction of the Groq request budget scheduled runs may use, leaving the rest for interactive sessions
+DEFAULT_BUDGET_SHARE = 0.5
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+def parse_cron(expression: str) -> List[Set[int]]:
+    # Standard five-field cron (minute hour day-of-month month day-of-week) with *, lists, ranges and steps
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Expected 5 cron fields, got {len(fields)}: {expression!r}")
+    parsed = []
+    for field, (low, high) in zip(fields, CRON_FIELDS):
+        values = set()
+        for part in field.split(","):
+            base, _, step = part.partition("/")
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start, end = (int(value) for value in base.split("-", 1))
+            else:
+                start = int(base)
+                end = high if step else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step or 1)))
+        parsed.append(values)
+    # 7 is Sunday as well as 0
+    if 7 in parsed[4]:
+        parsed[4] = (parsed[4] - {7}) | {0}
+    return parsed
+
+def next_run(expression: str, after: datetime) -> datetime:
+    # First minute strictly after `after` matching the expression
+    minutes, hours, days, months, weekdays = parse_cron(expression)
+    fields = expression.split()
+    any_day, any_weekday = fields[2] == "*", fields[4] == "*"
+    candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = candidate + timedelta(days=366 * 5)
+    while candidate < limit:
+        day_matches = candidate.day in days
+        weekday_matches = (candidate.weekday() + 1) % 7 in weekdays
+        # As in cron, a restricted day-of-month and day-of-week match when either does
+        if any_day or any_weekday:
+            day_ok = day_matches and weekday_matches
+        else:
+            day_ok = day_matches or weekday_matches
+        if candidate.month not in months or not day_ok:
+            candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+        elif candidate.hour not in hours:
+            candidate = candidate.replace(minute=0) + timedelta(hours=1)
+        elif candidate.minute not in minutes:
+            candidate += timedelta(minutes=1)
+        else:
+            return candidate
+    raise ValueError(f"Cron expression never matches: {expression!r}")
+
+def spread_offset(schedule_id: int, client: str, spread_seconds: int = DEFAULT_SPREAD_SECONDS) -> int:
+    digest = hashlib.sha1(f"{schedule_id}|{client}".encode("utf-8")).hexdigest()
+    return int(digest, 16) % max(spread_seconds, 1)
+
+def estimated_calls(tool: str, params: Dict[str, Any]) -> int:
+    return 3 * len(params.get("competitors", [])) if tool == "competitors" else 1
+
+def target_key(tool: str, params: Dict[str, Any]) -> str:
+    # Identifies what a run looked at, so interactive tools can find precomputed results for the same inputs
+    if tool == "competitors":
+        return json.dumps(["competitors", sorted(params["competitors"]), keywords_key(params["keywords"])])
+    return json.dumps(["seo", params["url"], keywords_key(params["keywords"])])
+
+def diff_results(tool: str, previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    # Only what changed since the previous run; an empty dict means nothing did
+    if previous is None:
+        return {"first_run": True}
+    if tool == "seo":
+        if "error" in current or "error" in previous:
+            return {"error": {"before": previous.get("error"), "after": current.get("error")}} \
+                if previous.get("error") != current.get("error") else {}
+        return {field: {"before": previous.get(field), "after": current.get(field)}
+                for field in ("current_title", "current_meta", "current_h1")
+                if previous.get(field) != current.get(field)}
+    changes = {}
+    for competitor, data in current.items():
+        before = previous.get(competitor)
+        if before is None:
+            changes[competitor] = {"new": True}
+            continue
+        score_changes = {
+            metric: round(data["scores"][metric] - before["scores"][metric], 1)
+            for metric in COMPETITOR_METRICS
+            if data.get("scores", {}).get(metric) is not None and before.get("scores", {}).get(metric) is not None
+            and data["scores"][metric] != before["scores"][metric]
+        }
+        sections_changed = [name for name in COMPETITOR_SECTIONS
+                            if data.get("sections", {}).get(name) != before.get("sections", {}).get(name)]
+        if score_changes or sections_changed:
+            changes[competitor] = {"score_changes": score_changes, "sections_changed": sections_changed}
+    for competitor in previous:
+        if competitor not in current:
+            changes[competitor] = {"removed": True}
+    return changes
+
+class MonitorStore:
+    # Schedules and their timestamped results, next to the competitor results in the results database
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH, spread_seconds: int = DEFAULT_SPREAD_SECONDS):
+        self.spread_seconds = spread_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS monitor_schedules (
+                id INTEGER PRIMARY KEY,
+                client TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                params TEXT NOT NULL,
+                target_key TEXT NOT NULL,
+                cron TEXT NOT NULL,
+                next_run_at REAL NOT NULL,
+                enabled INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_monitor_due ON monitor_schedules (enabled, next_run_at)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS monitor_results (
+                id INTEGER PRIMARY KEY,
+                schedule_id INTEGER NOT NULL,
+                target_key TEXT NOT NULL,
+                ran_at REAL NOT NULL,
+                elapsed_seconds REAL NOT NULL,
+                result TEXT NOT NULL,
+                diff TEXT NOT NULL,
+                changed INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_monitor_results_schedule ON monitor_results (schedule_id, ran_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_monitor_results_target ON monitor_results (target_key, ran_at)"
+        )
+        self._conn.commit()
+
+    def _next_run_at(self, schedule_id: int, client: str, cron: str, after: datetime) -> float:
+        offset = spread_offset(schedule_id, client, self.spread_seconds)
+        # The offset is removed before looking for the next cron time, so it never accumulates
+        return next_run(cron, after - timedelta(seconds=offset)).timestamp() + offset
+
+    def add_schedule(self, client: str, tool: str, params: Dict[str, Any], cron: str) -> int:
+        if tool not in MONITOR_TOOLS:
+            raise ValueError(f"Unknown monitoring tool: {tool}")
+        parse_cron(cron)
+        with self._lock:
+            schedule_id = self._conn.execute(
+                "INSERT INTO monitor_schedules (client, tool, params, target_key, cron, next_run_at) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (client, tool, json.dumps(params), target_key(tool, params), cron)
+            ).lastrowid
+            self._conn.execute("UPDATE monitor_schedules SET next_run_at = ? WHERE id = ?",
+                               (self._next_run_at(schedule_id, client, cron, datetime.now()), schedule_id))
+            self._conn.commit()
+        return schedule_id
+
+    def remove_schedule(self, schedule_id: int):
+        with self._lock:
+            self._conn.execute("UPDATE monitor_schedules SET enabled = 0 WHERE id = ?", (schedule_id,))
+            self._conn.commit()
+
+    def _schedule_row(self, row) -> Dict[str, Any]:
+        return {"id": row[0], "client": row[1], "tool": row[2], "params": json.loads(row[3]), "cron": row[4],
+                "next_run_at": row[5]}
+
+    def list_schedules(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, client, tool, params, cron, next_run_at FROM monitor_schedules WHERE enabled = 1 "
+                "ORDER BY client, id"
+            ).fetchall()
+        return [self._schedule_row(row) for row in rows]
+
+    def due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, client, tool, params, cron, next_run_at FROM monitor_schedules "
+                "WHERE enabled = 1 AND next_run_at <= ? ORDER BY next_run_at",
+                (now or time.time(),)
+            ).fetchall()
+        return [self._schedule_row(row) for row in rows]
+
+    def reschedule(self, schedule: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE monitor_schedules SET next_run_at = ? WHERE id = ?",
+                (self._next_run_at(schedule["id"], schedule["client"], schedule["cron"], datetime.now()),
+                 schedule["id"])
+            )
+            self._conn.commit()
+
+    def save_result(self, schedule: Dict[str, Any], result: Any, elapsed: float) -> Dict[str, Any]:
+        previous = self.latest(schedule["id"])
+        diff = diff_results(schedule["tool"], previous["result"] if previous else None, result)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO monitor_results (schedule_id, target_key, ran_at, elapsed_seconds, result, diff, changed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (schedule["id"], target_key(schedule["tool"], schedule["params"]), time.time(), elapsed,
+                 json.dumps(result), json.dumps(diff), int(bool(diff)))
+            )
+            self._conn.commit()
+        return diff
+
+    def _result_row(self, row) -> Dict[str, Any]:
+        return {"schedule_id": row[0], "ran_at": row[1], "elapsed_seconds": row[2], "result": json.loads(row[3]),
+                "diff": json.loads(row[4]), "changed": bool(row[5])}
+
+    def latest(self, schedule_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT schedule_id, ran_at, elapsed_seconds, result, diff, changed FROM monitor_results "
+                "WHERE schedule_id = ? ORDER BY ran_at DESC LIMIT 1",
+                (schedule_id,)
+            ).fetchone()
+        return self._result_row(row) if row else None
+
+    def latest_for(self, tool: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Newest precomputed result of any schedule that looks at exactly these inputs
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT schedule_id, ran_at, elapsed_seconds, result, diff, changed FROM monitor_results "
+                "WHERE target_key = ? ORDER BY ran_at DESC LIMIT 1",
+                (target_key(tool, params),)
+            ).fetchone()
+        return self._result_row(row) if row else None
+
+    def changes(self, schedule_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+        # Runs that changed something, newest first; unchanged runs are stored but not surfaced
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT schedule_id, ran_at, elapsed_seconds, result, diff, changed FROM monitor_results "
+                "WHERE schedule_id = ? AND changed = 1 ORDER BY ran_at DESC LIMIT ?",
+                (schedule_id, limit)
+            ).fetchall()
+        return [self._result_row(row) for row in rows]
+
+class MonitorDaemon:
+    # Runs due schedules one after another, paced so scheduled work stays within its share of the request budget
+    def __init__(self, marketing_system: Optional[MarketingAgencyAutomation] = None,
+                 store: Optional[MonitorStore] = None, requests_per_minute: int = 30,
+                 budget_share: float = DEFAULT_BUDGET_SHARE):
+        # Failed completions raise instead of returning the fallback text, so they are never saved as a result
+        # (or diffed as a change); run_due logs them and the schedule simply runs again next time
+        self.marketing_system = marketing_system or MarketingAgencyAutomation(raise_errors=True,
+                                                                              requests_per_minute=requests_per_minute)
+        self.store = store or MonitorStore()
+        self.calls_per_minute = max(requests_per_minute * budget_share, 1)
+
+    def run_schedule(self, schedule: Dict[str, Any]) -> Dict[str, Any]:
+        params = schedule["params"]
+        started = time.perf_counter()
+        with brand_scope(schedule["client"]), tenant_scope(schedule["client"], BATCH):
+            if schedule["tool"] == "competitors":
+                result = self.marketing_system.competitor_watchdog(params["competitors"], params["keywords"])
+            else:
+                result = self.marketing_system.seo_optimizer(params["url"], params["keywords"])
+        return self.store.save_result(schedule, result, time.perf_counter() - started)
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        schedules = self.store.due(now)
+        for schedule in schedules:
+            started = time.monotonic()
+            try:
+                diff = self.run_schedule(schedule)
+                logger.info("Monitored %s (%s): %s", schedule["client"], schedule["tool"],
+                            "changes found" if diff else "no changes")
+            except Exception:
+                logger.exception("Monitoring run failed for %s (%s)", schedule["client"], schedule["tool"])
+            self.store.reschedule(schedule)
+            # Space the next run by the time this one's calls take at the allotted rate
+            gap = 60 * estimated_calls(schedule["tool"], schedule["params"]) / self.calls_per_minute
+            time.sleep(max(0.0, gap - (time.monotonic() - started)))
+        return len(schedules)
+
+    def run_forever(self, poll_seconds: float = 30):
+        while True:
+            if not self.run_due():
+                time.sleep(poll_seconds)
+
+def _split(value: str, separator: str) -> List[str]:
+    return [item.strip() for item in (value or "").split(separator) if item.strip()]
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scheduled competitor and SEO monitoring.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Add a schedule")
+    add.add_argument("--client", required=True)
+    add.add_argument("--tool", choices=MONITOR_TOOLS, required=True)
+    add.add_argument("--cron", required=True, help='Five-field cron, e.g. "0 6 * * 1" for Mondays at 06:00')
+    add.add_argument("--competitors", default="", help="Semicolon-separated competitor URLs (competitors tool)")
+    add.add_argument("--url", default="", help="Page URL (seo tool)")
+    add.add_argument("--keywords", required=True, help="Comma-separated keywords")
+    remove = commands.add_parser("remove", help="Disable a schedule")
+    remove.add_argument("schedule_id", type=int)
+    commands.add_parser("list", help="List schedules")
+    for name in ("run", "once"):
+        command = commands.add_parser(name, help="Run due schedules " + ("forever" if name == "run" else "once"))
+        command.add_argument("--requests-per-minute", type=int, default=30, help="Shared Groq request budget")
+        command.add_argument("--budget-share", type=float, default=DEFAULT_BUDGET_SHARE,
+                             help="Fraction of the budget scheduled runs may use")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = MonitorStore()
+    if args.command == "add":
+        params = {"keywords": _split(args.keywords, ",")}
+        if args.tool == "competitors":
+            params["competitors"] = _split(args.competitors, ";")
+            if not params["competitors"]:
+                parser.error("--competitors is required for the competitors tool")
+        else:
+            if not args.url:
+                parser.error("--url is required for the seo tool")
+            params["url"] = args.url
+        schedule_id = store.add_schedule(args.client, args.tool, params, args.cron)
+        print(f"Added schedule {schedule_id}")
+    elif args.command == "remove":
+        store.remove_schedule(args.schedule_id)
+    elif args.command == "list":
+        for schedule in store.list_schedules():
+            next_at = datetime.fromtimestamp(schedule["next_run_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{schedule['id']}\t{schedule['client']}\t{schedule['tool']}\t{schedule['cron']}\tnext {next_at}")
+    else:
+        daemon = MonitorDaemon(store=store, requests_per_minute=args.requests_per_minute,
+                               budget_share=args.budget_share)
+        if args.command == "once":
+            daemon.run_due()
+        else:
+            daemon.run_forever()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import contextvars
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from competitor_store import DEFAULT_RESULTS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Brand or client the current run is for; set by the UI, the CLI, report jobs and the monitoring daemon
+current_brand = contextvars.ContextVar("current_brand", default=None)
+
+DEFAULT_PAGE_SIZE = 20
+
+@contextmanager
+def brand_scope(brand: Optional[str]) -> Iterator[None]:
+    token = current_brand.set(brand or None)
+    try:
+        yield
+    finally:
+        current_brand.reset(token)
+
+def searchable_text(value: Any) -> str:
+    # Every string in a JSON-like value, so full-text search matches content rather than JSON syntax
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(searchable_text(item) for pair in value.items() for item in pair)
+    if isinstance(value, (list, tuple)):
+        return " ".join(searchable_text(item) for item in value)
+    return "" if value is None else str(value)
+
+class ResultsStore:
+    # Inputs, outputs and timing of every tool run, so past results can be browsed and reopened without
+    # regenerating them. Runs are indexed by tool, brand, competitor and date; inputs and outputs are
+    # full-text searchable through FTS5 when SQLite has it, and through LIKE otherwise.
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS result_runs (
+                id INTEGER PRIMARY KEY,
+                tool TEXT NOT NULL,
+                brand TEXT,
+                inputs TEXT NOT NULL,
+                output TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                elapsed_seconds REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_result_runs_tool ON result_runs (tool, started_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_result_runs_brand ON result_runs (brand, started_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_result_runs_started ON result_runs (started_at)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS result_run_competitors (
+                run_id INTEGER NOT NULL,
+                competitor TEXT NOT NULL,
+                PRIMARY KEY (competitor, run_id)
+            )
+        """)
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS result_runs_fts USING fts5(inputs, output)")
+            self.full_text = True
+        except sqlite3.OperationalError:
+            logger.info("SQLite has no FTS5; history search falls back to LIKE")
+            self.full_text = False
+        self._conn.commit()
+
+    def record(self, tool: str, inputs: Dict[str, Any], output: Any, elapsed: float,
+               brand: Optional[str] = None, started_at: Optional[float] = None) -> int:
+        brand = brand or current_brand.get()
+        started_at = started_at or time.time() - elapsed
+        competitors = inputs.get("competitors") or []
+        with self._lock:
+            run_id = self._conn.execute(
+                "INSERT INTO result_runs (tool, brand, inputs, output, started_at, elapsed_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (tool, brand, json.dumps(inputs, default=str), json.dumps(output, default=str), started_at, elapsed)
+            ).lastrowid
+            self._conn.executemany("INSERT OR IGNORE INTO result_run_competitors (run_id, competitor) VALUES (?, ?)",
+                                   [(run_id, competitor) for competitor in competitors])
+            if self.full_text:
+                self._conn.execute("INSERT INTO result_runs_fts (rowid, inputs, output) VALUES (?, ?, ?)",
+                                   (run_id, searchable_text(inputs), searchable_text(output)))
+            self._conn.commit()
+        return run_id
+
+    def get(self, run_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, tool, brand, inputs, output, started_at, elapsed_seconds FROM result_runs WHERE id = ?",
+                (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "tool": row[1], "brand": row[2], "inputs": json.loads(row[3]),
+                "output": json.loads(row[4]), "started_at": row[5], "elapsed_seconds": row[6]}
+
+    def history(self, tool: Optional[str] = None, brand: Optional[str] = None, competitor: Optional[str] = None,
+                query: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+                page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        # One page of runs, newest first, without their outputs; open a run with get()
+        conditions, params = [], []
+        if tool:
+            conditions.append("tool = ?")
+            params.append(tool)
+        if brand:
+            conditions.append("brand = ?")
+            params.append(brand)
+        if competitor:
+            conditions.append("id IN (SELECT run_id FROM result_run_competitors WHERE competitor = ?)")
+            params.append(competitor)
+        if since is not None:
+            conditions.append("started_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("started_at < ?")
+            params.append(until)
+        if query:
+            if self.full_text:
+                conditions.append("id IN (SELECT rowid FROM result_runs_fts WHERE result_runs_fts MATCH ?)")
+                # Each word is quoted so user input is never parsed as FTS5 query syntax
+                params.append(" ".join('"' + word.replace('"', '""') + '"' for word in query.split()))
+            else:
+                conditions.append("(inputs LIKE ? OR output LIKE ?)")
+                params.extend([f"%{query}%"] * 2)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        page = max(page, 1)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM result_runs {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT id, tool, brand, inputs, started_at, elapsed_seconds FROM result_runs {where} "
+                "ORDER BY started_at DESC LIMIT ? OFFSET ?",
+                [*params, page_size, (page - 1) * page_size]
+            ).fetchall()
+        return {
+            "runs": [{"id": row[0], "tool": row[1], "brand": row[2], "inputs": json.loads(row[3]),
+                      "started_at": row[4], "elapsed_seconds": row[5]} for row in rows],
+            "total": total,
+            "page": page,
+            "pages": max((total + page_size - 1) // page_size, 1)
+        }
+
+    def brands(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT brand FROM result_runs WHERE brand IS NOT NULL ORDER BY brand"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def competitors(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT competitor FROM result_run_competitors ORDER BY competitor")
+            return [row[0] for row in rows.fetchall()]
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def get_results_store() -> ResultsStore:
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ResultsStore()
+        return _shared_store
@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PERCENTILE_BANDS = ["Bottom quartile", "Lower middle", "Upper middle", "Top quartile"]
+
+def scores_frame(rows: Sequence[Tuple[str, str, float, float]]) -> pd.DataFrame:
+    # Long-format (competitor, metric, score, run_at) rows as returned by CompetitorStore.score_history
+    frame = pd.DataFrame.from_records(list(rows), columns=["competitor", "metric", "score", "run_at"])
+    frame["run_at"] = pd.to_datetime(frame["run_at"], unit="s")
+    return frame
+
+def scoring_matrix(history: pd.DataFrame, metrics: List[str],
+                   weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    # One row per (run_at, competitor) with a column per metric, plus composite, rank, percentile band and
+    # the change of every score since that competitor's previous run. Everything is computed column-wise.
+    wide = history.pivot_table(index=["run_at", "competitor"], columns="metric", values="score", aggfunc="last")
+    wide = wide.reindex(columns=metrics).sort_index()
+    wide.columns.name = None
+
+    weight = pd.Series({metric: (weights or {}).get(metric, 1.0) for metric in metrics})
+    # Missing metrics drop out of both numerator and denominator instead of counting as zero
+    covered = wide[metrics].notna().mul(weight).sum(axis=1).replace(0, np.nan)
+    wide["composite"] = (wide[metrics].mul(weight).sum(axis=1, min_count=1) / covered).round(1)
+
+    by_run = wide.groupby(level="run_at")["composite"]
+    wide["rank"] = by_run.rank(ascending=False, method="min").astype("Int64")
+    wide["percentile"] = by_run.rank(pct=True).round(3)
+    wide["band"] = pd.cut(wide["percentile"], [0, 0.25, 0.5, 0.75, 1.0], labels=PERCENTILE_BANDS,
+                          include_lowest=True)
+
+    scored = metrics + ["composite"]
+    deltas = wide.groupby(level="competitor")[scored].diff()
+    wide[[f"{column} change" for column in scored]] = deltas.to_numpy()
+    return wide
+
+def latest_run(matrix: pd.DataFrame) -> pd.DataFrame:
+    # Each competitor's most recent row, best composite first
+    latest = matrix.groupby(level="competitor").tail(1).reset_index(level="run_at")
+    return latest.sort_values("composite", ascending=False)
@@ -0,0 +1,210 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from completion_cache import DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS
+
+# sentence-transformers, faiss and numpy are optional and imported on first use; without them the
+# semantic cache reports itself unavailable and every lookup is a miss
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = os.getenv("BRANDPULSE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+DEFAULT_SIMILARITY_THRESHOLD = float(os.getenv("BRANDPULSE_SEMANTIC_THRESHOLD", "0.92"))
+DEFAULT_SEMANTIC_MAX_ENTRIES = int(os.getenv("BRANDPULSE_SEMANTIC_MAX_ENTRIES", "2000"))
+# Inserts mark the on-disk index stale and it is rewritten at most this often (and at exit); a stale file is
+# rebuilt from the stored embeddings on the next load
+INDEX_SAVE_INTERVAL = 30.0
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+def load_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    # One CPU model per name for the whole process, shared by every index; None when faiss or
+    # sentence-transformers is missing or the model cannot be loaded
+    with _models_lock:
+        if model_name not in _models:
+            try:
+                import faiss  # noqa: F401
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                logger.info("Embeddings disabled (%s); install faiss-cpu and sentence-transformers to enable them", e)
+                _models[model_name] = None
+                return None
+            try:
+                _models[model_name] = SentenceTransformer(model_name, device="cpu")
+            except Exception as e:
+                logger.warning("Embeddings disabled: could not load %s (%s)", model_name, e)
+                _models[model_name] = None
+        return _models[model_name]
+
+def embed(model, texts: List[str]):
+    # Normalised, so inner product in a flat index is cosine similarity
+    return model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype("float32")
+
+class SemanticCache:
+    # Reuses the completion of a near-duplicate request: the request's varying input (not the whole templated
+    # prompt) is embedded with a local CPU model and looked up by cosine similarity in a FAISS index. Rows and
+    # embeddings live in SQLite; the index is persisted next to it and rebuilt from the stored embeddings if it
+    # is missing or out of date.
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_SEMANTIC_MAX_ENTRIES):
+        self.index_path = f"{path}.faiss"
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._model = None
+        self._index = None
+        self._available: Optional[bool] = None
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS semantic_completions (
+                id INTEGER PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                value TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_semantic_last_used ON semantic_completions (last_used)"
+        )
+        self._conn.commit()
+        atexit.register(self.save)
+
+    @property
+    def available(self) -> bool:
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> bool:
+        # Loads the embedding model and index once; callers hold self._lock
+        if self._available is not None:
+            return self._available
+        self._model = load_embedding_model(self.model_name)
+        if self._model is None:
+            self._available = False
+            return False
+        import faiss
+        import numpy as np
+        rows = self._conn.execute("SELECT id, embedding FROM semantic_completions").fetchall()
+        index = faiss.read_index(self.index_path) if os.path.exists(self.index_path) else None
+        if index is None or set(faiss.vector_to_array(index.id_map).tolist()) != {row[0] for row in rows}:
+            index = faiss.IndexIDMap(faiss.IndexFlatIP(self._model.get_sentence_embedding_dimension()))
+            if rows:
+                index.add_with_ids(np.vstack([np.frombuffer(row[1], dtype="float32") for row in rows]),
+                                   np.array([row[0] for row in rows], dtype="int64"))
+            faiss.write_index(index, self.index_path)
+        self._index = index
+        self._saved_at = time.monotonic()
+        self._available = True
+        return True
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    def _write_index(self):
+        # Callers hold self._lock
+        import faiss
+        faiss.write_index(self._index, self.index_path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _embed(self, text: str):
+        return embed(self._model, [text])
+
+    def get(self, text: str, namespace: str) -> Optional[str]:
+        # text is what is compared, e.g. a post's topic; namespace separates requests whose answers must not be
+        # shared (model, tool, output limits and the inputs that must match exactly)
+        now = time.time()
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM semantic_completions WHERE namespace = ? AND created_at >= ?",
+                (namespace, now - self.ttl_seconds)
+            )] if self._load() else []
+            if not ids:
+                self.misses += 1
+                return None
+            import faiss
+            import numpy as np
+            # Restrict the search to this namespace's entries, so other tools' entries cannot crowd them out
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.array(ids, dtype="int64")))
+            similarities, found = self._index.search(self._embed(text), 1, params=params)
+            row_id, similarity = int(found[0][0]), similarities[0][0]
+            if row_id < 0 or similarity < self.threshold:
+                self.misses += 1
+                return None
+            value = self._conn.execute("SELECT value FROM semantic_completions WHERE id = ?", (row_id,)).fetchone()[0]
+            self._conn.execute("UPDATE semantic_completions SET last_used = ? WHERE id = ?", (now, row_id))
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, text: str, namespace: str, value: str):
+        now = time.time()
+        with self._lock:
+            if not self._load():
+                return
+            import numpy as np
+            embedding = self._embed(text)
+            cursor = self._conn.execute(
+                "INSERT INTO semantic_completions (namespace, prompt, value, embedding, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, text, value, embedding.tobytes(), now, now)
+            )
+            self._index.add_with_ids(embedding, np.array([cursor.lastrowid], dtype="int64"))
+            # Expired rows go first, then the least recently used ones beyond the size bound
+            evicted = [row[0] for row in self._conn.execute(
+                "SELECT id FROM semantic_completions WHERE created_at < ? "
+                "UNION SELECT id FROM (SELECT id FROM semantic_completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (now - self.ttl_seconds, self.max_entries)
+            )]
+            if evicted:
+                self._conn.executemany("DELETE FROM semantic_completions WHERE id = ?",
+                                       [(row_id,) for row_id in evicted])
+                self._index.remove_ids(np.array(evicted, dtype="int64"))
+            self._conn.commit()
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= INDEX_SAVE_INTERVAL:
+                self._write_index()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM semantic_completions")
+            self._conn.commit()
+            if self._index is not None:
+                self._index.reset()
+            self._dirty = False
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM semantic_completions").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticCache:
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SemanticCache()
+        return _shared_cache
@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+_coalescing = True
+
+# What followers get when the leader was interrupted rather than failed; they retry the call themselves
+ABANDONED = object()
+
+class SingleFlight:
+    # Collapses identical concurrent calls: the first caller for a key does the work, everyone who asks for the
+    # same key while it is in flight waits for and shares its result (or exception). Nothing is kept afterwards.
+    # Only ordinary exceptions are shared; if the leader is interrupted (KeyboardInterrupt, task cancellation,
+    # a Streamlit rerun) its followers are released with ABANDONED and one of them takes over.
+    def __init__(self, name: str):
+        self.name = name
+        # With enabled off every caller runs its own call, e.g. to benchmark runs that must stay independent
+        self.enabled = _coalescing
+        self.executed = 0
+        self.collapsed = 0
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: Hashable) -> Tuple[Future, bool]:
+        # Returns the shared future and whether the caller is the leader that must run the call and finish() it.
+        # Futures are thread-safe, so callers on other threads or event loops (asyncio.wrap_future) can wait on them.
+        # A follower whose future resolves to ABANDONED should join again.
+        with self._lock:
+            if not self.enabled:
+                self.executed += 1
+                return Future(), True
+            future = self._inflight.get(key)
+            if future is not None:
+                self.collapsed += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.executed += 1
+            return future, True
+
+    def finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            future.set_result(ABANDONED)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        # Returns fn's result and whether it was shared from another caller's flight
+        while True:
+            future, leader = self.join(key)
+            if leader:
+                break
+            result = future.result()
+            if result is not ABANDONED:
+                return result, True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result=result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._inflight)
+        return {"group": self.name, "executed": self.executed, "collapsed": self.collapsed, "in_flight": in_flight}
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+def get_flight_group(name: str) -> SingleFlight:
+    # Process-wide, so calls from every Streamlit session and worker thread are collapsed together
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+def set_coalescing(enabled: bool):
+    # Turns collapsing on or off for every flight group, including ones created later
+    global _coalescing
+    with _groups_lock:
+        _coalescing = enabled
+        for group in _groups.values():
+            group.enabled = enabled
+
+def flight_stats() -> List[Dict[str, Any]]:
+    with _groups_lock:
+        groups = list(_groups.values())
+    return [group.stats() for group in groups]
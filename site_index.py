@@ -0,0 +1,240 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from html_extract import detect_charset, extract_text
+from semantic_cache import DEFAULT_EMBEDDING_MODEL, embed, load_embedding_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITE_INDEX_PATH = os.getenv("BRANDPULSE_SITE_INDEX_PATH", ".brandpulse_site_index.sqlite3")
+DEFAULT_MAX_PAGES = int(os.getenv("BRANDPULSE_CRAWL_MAX_PAGES", "10"))
+DEFAULT_REINDEX_SECONDS = 7 * 24 * 3600
+CHUNK_WORDS = 180
+CHUNK_OVERLAP = 30
+HREF_RE = re.compile(rb"<a\s[^>]*?href\s*=\s*[\"']([^\"'#]+)", re.IGNORECASE)
+SKIPPED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".mp4", ".mp3", ".css",
+                      ".js")
+WORD_RE = re.compile(r"\w+")
+
+def chunk_text(text: str, size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    words = text.split()
+    step = max(size - overlap, 1)
+    return [" ".join(words[start:start + size]) for start in range(0, max(len(words) - overlap, 1), step)
+            if words[start:start + size]]
+
+def page_links(body: bytes, base_url: str, content_type: str = "") -> List[str]:
+    # Same-host HTML links only, without fragments, in page order
+    charset = detect_charset(body, content_type)
+    host = urlparse(base_url).netloc
+    links = []
+    for match in HREF_RE.finditer(body):
+        url = urldefrag(urljoin(base_url, match.group(1).decode(charset, errors="replace").strip()))[0]
+        parsed = urlparse(url)
+        if parsed.scheme in ("http", "https") and parsed.netloc == host \
+                and not parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+            links.append(url)
+    return list(dict.fromkeys(links))
+
+class SiteIndex:
+    # Crawls a bounded number of pages per domain, stores their text as overlapping chunks and retrieves the
+    # chunks most relevant to a query, so prompts carry a fixed amount of site content however big the site is.
+    # Chunks are embedded into a FAISS index persisted next to the database; without faiss and
+    # sentence-transformers, retrieval falls back to ranking chunks by keyword overlap.
+    def __init__(self, path: str = DEFAULT_SITE_INDEX_PATH, model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 max_pages: int = DEFAULT_MAX_PAGES, reindex_after: int = DEFAULT_REINDEX_SECONDS):
+        self.index_path = f"{path}.faiss"
+        self.model_name = model_name
+        self.max_pages = max_pages
+        self.reindex_after = reindex_after
+        self._model = None
+        self._index = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS site_pages (
+                url TEXT PRIMARY KEY,
+                domain TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                links TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS site_chunks (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                text TEXT NOT NULL,
+                embedding BLOB
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_site_chunks_domain ON site_chunks (domain)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_site_chunks_url ON site_chunks (url)")
+        self._conn.commit()
+
+    def _load(self):
+        # Loads the embedding model and the on-disk index once; callers hold self._lock
+        if self._loaded:
+            return
+        self._loaded = True
+        self._model = load_embedding_model(self.model_name)
+        if self._model is None:
+            return
+        import faiss
+        import numpy as np
+        rows = self._conn.execute("SELECT id, embedding FROM site_chunks WHERE embedding IS NOT NULL").fetchall()
+        index = faiss.read_index(self.index_path) if os.path.exists(self.index_path) else None
+        if index is None or index.ntotal != len(rows):
+            index = faiss.IndexIDMap(faiss.IndexFlatIP(self._model.get_sentence_embedding_dimension()))
+            if rows:
+                index.add_with_ids(np.vstack([np.frombuffer(row[1], dtype="float32") for row in rows]),
+                                   np.array([row[0] for row in rows], dtype="int64"))
+            faiss.write_index(index, self.index_path)
+        self._index = index
+
+    def ingest(self, start_url: str, fetcher: Any = None, refresh: bool = False) -> Dict[str, int]:
+        # Breadth-first crawl from start_url within its host. Pages indexed within reindex_after are not
+        # fetched again, unless refresh is set; their stored links still extend the crawl.
+        if fetcher is None:
+            from fetcher import AsyncFetcher
+            fetcher = AsyncFetcher()
+        stats = {"fetched": 0, "reused": 0, "changed": 0, "chunks": 0}
+        frontier, seen = [start_url], set()
+        while frontier and len(seen) < self.max_pages:
+            batch = [url for url in dict.fromkeys(frontier) if url not in seen][:self.max_pages - len(seen)]
+            seen.update(batch)
+            frontier = []
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                fresh = {} if refresh else dict(self._conn.execute(
+                    f"SELECT url, links FROM site_pages WHERE indexed_at >= ? AND url IN ({placeholders})",
+                    [time.time() - self.reindex_after, *batch]
+                ).fetchall())
+            for url in batch:
+                if url in fresh:
+                    stats["reused"] += 1
+                    frontier.extend(json.loads(fresh[url]))
+            for page in fetcher.fetch_all([url for url in batch if url not in fresh]):
+                if "error" in page or "html" not in (page.get("content_type") or "text/html"):
+                    continue
+                stats["fetched"] += 1
+                links = page_links(page["content"], page["url"], page["content_type"])
+                frontier.extend(links)
+                added = self._index_page(page["url"], extract_text(page["content"], page["content_type"]), links)
+                if added is not None:
+                    stats["changed"] += 1
+                    stats["chunks"] += added
+        if stats["changed"]:
+            self.save()
+        return stats
+
+    def add_page(self, url: str, body: bytes, content_type: str = "") -> Optional[int]:
+        # Indexes a page the caller already fetched, e.g. the page under SEO review
+        added = self._index_page(url, extract_text(body, content_type), page_links(body, url, content_type))
+        if added is not None:
+            self.save()
+        return added
+
+    def save(self):
+        with self._lock:
+            if self._index is not None:
+                import faiss
+                faiss.write_index(self._index, self.index_path)
+
+    def _index_page(self, url: str, text: str, links: List[str]) -> Optional[int]:
+        # Returns the number of chunks written, or None when the page text is unchanged
+        domain = urlparse(url).netloc
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        chunks = chunk_text(text)
+        with self._lock:
+            self._load()
+            row = self._conn.execute("SELECT content_hash FROM site_pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO site_pages (url, domain, content_hash, links, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, domain, content_hash, json.dumps(links), time.time())
+            )
+            if row and row[0] == content_hash:
+                self._conn.commit()
+                return None
+            stale = [row[0] for row in self._conn.execute("SELECT id FROM site_chunks WHERE url = ?", (url,))]
+            self._conn.execute("DELETE FROM site_chunks WHERE url = ?", (url,))
+            if stale and self._index is not None:
+                import numpy as np
+                self._index.remove_ids(np.array(stale, dtype="int64"))
+            embeddings = embed(self._model, chunks) if self._model is not None and chunks else None
+            ids = []
+            for position, chunk in enumerate(chunks):
+                vector = embeddings[position].tobytes() if embeddings is not None else None
+                ids.append(self._conn.execute(
+                    "INSERT INTO site_chunks (url, domain, text, embedding) VALUES (?, ?, ?, ?)",
+                    (url, domain, chunk, vector)
+                ).lastrowid)
+            if embeddings is not None and ids:
+                import numpy as np
+                self._index.add_with_ids(embeddings, np.array(ids, dtype="int64"))
+            self._conn.commit()
+        return len(chunks)
+
+    def search(self, domain: str, query: str, k: int = 4) -> List[str]:
+        with self._lock:
+            self._load()
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM site_chunks WHERE domain = ?", (domain,))]
+            if not ids:
+                return []
+            if self._index is not None and self._index.ntotal:
+                import faiss
+                import numpy as np
+                # Restrict the search to this domain's chunks instead of over-fetching and filtering
+                params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.array(ids, dtype="int64")))
+                _, found = self._index.search(embed(self._model, [query]), min(k, len(ids)), params=params)
+                ranked = [int(row_id) for row_id in found[0] if row_id >= 0]
+            else:
+                ranked = self._lexical_rank(domain, query, k)
+            texts = dict(self._conn.execute(
+                f"SELECT id, text FROM site_chunks WHERE id IN ({','.join('?' * len(ranked))})", ranked
+            ).fetchall()) if ranked else {}
+        return [texts[row_id] for row_id in ranked if row_id in texts]
+
+    def _lexical_rank(self, domain: str, query: str, k: int) -> List[int]:
+        # Fallback without embeddings: chunks sharing the most query words first; callers hold self._lock
+        terms = set(WORD_RE.findall(query.lower()))
+        rows = self._conn.execute("SELECT id, text FROM site_chunks WHERE domain = ?", (domain,)).fetchall()
+        scored = sorted(rows, key=lambda row: -len(terms & set(WORD_RE.findall(row[1].lower()))))
+        return [row[0] for row in scored[:k]]
+
+    def context_for(self, url: str, query: str, k: int = 4, max_words: int = 600, refresh: bool = False) -> str:
+        # Ingests the site if needed (always, with refresh) and returns its top-k chunks for the query,
+        # capped at max_words
+        try:
+            self.ingest(url, refresh=refresh)
+        except Exception as e:
+            logger.warning("Could not crawl %s: %s", url, e)
+        words, excerpts = 0, []
+        for chunk in self.search(urlparse(url).netloc, query, k):
+            chunk_words = chunk.split()[:max_words - words]
+            if not chunk_words:
+                break
+            excerpts.append(" ".join(chunk_words))
+            words += len(chunk_words)
+        return "\n---\n".join(excerpts)
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+def get_site_index() -> SiteIndex:
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = SiteIndex()
+        return _shared_index
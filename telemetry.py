@@ -0,0 +1,152 @@
+import contextvars
+import functools
+import json
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from singleflight import flight_stats
+
+current_tool = contextvars.ContextVar("current_tool", default="unknown")
+
+@contextmanager
+def tool_span(name: str) -> Iterator[None]:
+    # Attributes every LLM call and HTTP fetch made inside the block to the named tool
+    token = current_tool.set(name)
+    try:
+        yield
+    finally:
+        current_tool.reset(token)
+
+def traced_tool(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tool_span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+def submit_in_context(executor, fn: Callable, *args, **kwargs):
+    # Pool threads do not inherit contextvars, so each task runs in a copy of the submitter's context
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def _metric_key(name: str, labels: Dict[str, Any]) -> str:
+    label_text = ",".join(f'{key}="{str(val)}"' for key, val in sorted(labels.items()))
+    return f"{name}{{{label_text}}}"
+
+class Tracer:
+    # In-memory ring buffer of per-call records with aggregate and JSON views over the recent window, plus
+    # cumulative counters for Prometheus: those only ever increase, however many records roll off the buffer
+    def __init__(self, max_records: int = 5000):
+        self.records = deque(maxlen=max_records)
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_llm(self, model: str, latency: float, cache: str, prompt_tokens: Optional[int] = None,
+                   completion_tokens: Optional[int] = None, error: Optional[str] = None, streamed: bool = False):
+        self._add({
+            "kind": "llm", "tool": current_tool.get(), "model": model, "latency_s": round(latency, 4),
+            "cache": cache, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "streamed": streamed, "error": error
+        })
+
+    def record_http(self, url: str, latency: float, status: Optional[int] = None, size: Optional[int] = None,
+                    not_modified: bool = False, error: Optional[str] = None, coalesced: bool = False):
+        # coalesced marks a caller that shared another caller's in-flight request (see singleflight.py)
+        self._add({
+            "kind": "http", "tool": current_tool.get(), "url": url, "latency_s": round(latency, 4),
+            "status": status, "bytes": size, "not_modified": not_modified, "error": error, "coalesced": coalesced
+        })
+
+    def _add(self, record: Dict[str, Any]):
+        record["timestamp"] = time.time()
+        with self._lock:
+            self.records.append(record)
+            self._count(record)
+
+    def _increment(self, name: str, labels: Dict[str, Any], value: float):
+        # Callers hold self._lock
+        key = _metric_key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def _count(self, record: Dict[str, Any]):
+        # Callers hold self._lock
+        tool = record["tool"]
+        if record["kind"] == "llm":
+            self._increment("brandpulse_llm_calls_total", {"tool": tool, "cache": record["cache"]}, 1)
+            self._increment("brandpulse_llm_errors_total", {"tool": tool}, 1 if record["error"] else 0)
+            self._increment("brandpulse_llm_tokens_total", {"tool": tool, "type": "prompt"},
+                            record["prompt_tokens"] or 0)
+            self._increment("brandpulse_llm_tokens_total", {"tool": tool, "type": "completion"},
+                            record["completion_tokens"] or 0)
+            self._increment("brandpulse_llm_latency_seconds_sum", {"tool": tool}, record["latency_s"])
+            self._increment("brandpulse_llm_latency_seconds_count", {"tool": tool}, 1)
+        else:
+            self._increment("brandpulse_http_fetches_total",
+                            {"tool": tool, "status": record["status"] or "error",
+                             "not_modified": str(record["not_modified"]).lower(),
+                             "coalesced": str(record.get("coalesced", False)).lower()}, 1)
+            self._increment("brandpulse_http_latency_seconds_sum", {"tool": tool}, record["latency_s"])
+            self._increment("brandpulse_http_latency_seconds_count", {"tool": tool}, 1)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.records)
+
+    def clear(self):
+        # Clears the recent window only; the Prometheus counters keep counting
+        with self._lock:
+            self.records.clear()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for record in self.snapshot():
+            groups.setdefault((record["kind"], record["tool"]), []).append(record)
+        rows = []
+        for (kind, tool), records in sorted(groups.items()):
+            latencies = sorted(r["latency_s"] for r in records)
+            rows.append({
+                "kind": kind,
+                "tool": tool,
+                "calls": len(records),
+                "errors": sum(1 for r in records if r["error"]),
+                "cache_hits": sum(1 for r in records if r.get("cache") in ("hit", "semantic")),
+                "coalesced": sum(1 for r in records if r.get("cache") == "coalesced" or r.get("coalesced")),
+                "p50_s": round(statistics.median(latencies), 3),
+                "p95_s": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3),
+                "prompt_tokens": sum(r.get("prompt_tokens") or 0 for r in records),
+                "completion_tokens": sum(r.get("completion_tokens") or 0 for r in records),
+                "bytes": sum(r.get("bytes") or 0 for r in records)
+            })
+        return rows
+
+    def to_json(self) -> str:
+        return json.dumps({"summary": self.summary(), "singleflight": flight_stats(), "records": self.snapshot()},
+                          indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# TYPE brandpulse_llm_calls_total counter",
+            "# TYPE brandpulse_llm_errors_total counter",
+            "# TYPE brandpulse_llm_tokens_total counter",
+            "# TYPE brandpulse_llm_latency_seconds summary",
+            "# TYPE brandpulse_http_fetches_total counter",
+            "# TYPE brandpulse_http_latency_seconds summary",
+            "# TYPE brandpulse_singleflight_executed_total counter",
+            "# TYPE brandpulse_singleflight_collapsed_total counter"
+        ]
+        with self._lock:
+            counters = dict(self.counters)
+        # The single-flight groups keep cumulative counts of their own
+        for group in flight_stats():
+            for stat in ("executed", "collapsed"):
+                counters[_metric_key(f"brandpulse_singleflight_{stat}_total", {"group": group["group"]})] = group[stat]
+        lines.extend(f"{key} {value:g}" for key, value in sorted(counters.items()))
+        return "\n".join(lines) + "\n"
+
+_tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    return _tracer
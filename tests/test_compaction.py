@@ -0,0 +1,25 @@
+from compaction import count_tokens, trim_to_budget, truncate_tokens
+
+LONG_SENTENCES = ("## Findings\n"
+                  "The homepage title never mentions trail gear even though it is the main product line here\n"
+                  "Page speed is poor on mobile because every product image is served at full resolution today")
+
+def test_text_within_budget_is_unchanged():
+    assert trim_to_budget("Short enough.", 10) == "Short enough."
+
+def test_keeps_keyword_sentences_with_their_heading():
+    text = "## SEO\nTitles are weak. Trail gear is missing. Speed is fine.\n## Links\nFew backlinks."
+    trimmed = trim_to_budget(text, 12, ["trail gear"])
+    assert trimmed.startswith("## SEO")
+    assert "Trail gear is missing." in trimmed
+    assert count_tokens(trimmed) <= 12
+
+def test_falls_back_to_the_start_of_the_best_sentence():
+    trimmed = trim_to_budget(LONG_SENTENCES, 6, ["trail gear"])
+    assert trimmed == "The homepage title never mentions trail"
+    assert count_tokens(trimmed) == 6
+
+def test_truncate_tokens():
+    assert truncate_tokens("a, b c", 2) == "a,"
+    assert truncate_tokens("a b", 5) == "a b"
+    assert truncate_tokens("a b", 0) == ""
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from competitor_store import CompetitorStore
+from completion_cache import CompletionCache
+from marketing_agency import MarketingAgencyAutomation
+from results_store import ResultsStore
+from semantic_cache import SemanticCache
+
+KEYWORDS = ["trail gear"]
+
+class FakeLLM:
+    # Answers every prompt with the current site version, as if the model had read the site
+    def __init__(self):
+        self.version = "v1"
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        message = SimpleNamespace(content=f"summary of {self.version}")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+class FakeSiteIndex:
+    def __init__(self):
+        self.refreshed = []
+
+    def context_for(self, url, query, refresh=False):
+        if refresh:
+            self.refreshed.append(url)
+        return ""
+
+def make_system(tmp_path, monkeypatch, site_index=None):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    system = MarketingAgencyAutomation(cache=CompletionCache(str(tmp_path / "cache.sqlite3")),
+                                       competitor_store=CompetitorStore(str(tmp_path / "competitors.sqlite3")),
+                                       results_store=ResultsStore(str(tmp_path / "results.sqlite3")),
+                                       semantic_cache=SemanticCache(str(tmp_path / "semantic.sqlite3")),
+                                       site_index=site_index or FakeSiteIndex())
+    system._llm = FakeLLM()
+    return system
+
+def watch(system, fingerprint, **options):
+    system._competitor_fingerprints = lambda competitors: {competitor: fingerprint for competitor in competitors}
+    return system.competitor_watchdog(["rival.example"], KEYWORDS, **options)["rival.example"]
+
+def test_changed_site_gets_a_new_analysis(tmp_path, monkeypatch):
+    system = make_system(tmp_path, monkeypatch)
+    assert watch(system, "first", grounded=False)["quick_summary"] == "summary of v1"
+    system.llm.version = "v2"
+    # Same fingerprint: the stored result is reused without calling the model
+    calls = system.llm.calls
+    assert watch(system, "first", grounded=False)["quick_summary"] == "summary of v1"
+    assert system.llm.calls == calls
+    # New fingerprint, same prompts: the completion cache must not hand back the old analysis
+    assert watch(system, "second", grounded=False)["quick_summary"] == "summary of v2"
+    assert system.competitor_store.get("rival.example", KEYWORDS)["fingerprint"] == "second"
+
+def test_full_refresh_skips_cached_completions(tmp_path, monkeypatch):
+    system = make_system(tmp_path, monkeypatch)
+    watch(system, "first", grounded=False)
+    system.llm.version = "v2"
+    assert watch(system, "first", grounded=False, incremental=False)["quick_summary"] == "summary of v2"
+
+def test_changed_site_is_crawled_again(tmp_path, monkeypatch):
+    site_index = FakeSiteIndex()
+    system = make_system(tmp_path, monkeypatch, site_index)
+    watch(system, "first")
+    assert site_index.refreshed == []
+    watch(system, "second")
+    assert site_index.refreshed == ["https://rival.example"]
+
+def test_full_refresh_replaces_the_stored_result(tmp_path, monkeypatch):
+    system = make_system(tmp_path, monkeypatch)
+    watch(system, "first", grounded=False)
+    system.llm.version = "v2"
+    assert watch(system, "first", grounded=False, incremental=False)["quick_summary"] == "summary of v2"
+    # The next normal run reuses the refreshed analysis, not the one from before it
+    calls = system.llm.calls
+    assert watch(system, "first", grounded=False)["quick_summary"] == "summary of v2"
+    assert system.llm.calls == calls
@@ -0,0 +1,10 @@
+from completion_cache import CompletionCache
+
+def test_json_mode_is_part_of_the_key(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"))
+    plain = CompletionCache.make_key("model", "prompt", 0.7, 100)
+    json_mode = CompletionCache.make_key("model", "prompt", 0.7, 100, json_mode=True)
+    assert plain != json_mode
+    cache.set(json_mode, '{"answer": 1}')
+    assert cache.get(plain) is None
+    assert cache.get(json_mode) == '{"answer": 1}'
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from fair_scheduler import BATCH, INTERACTIVE, AdmissionError, FairScheduler, tenant_scope
+
+class GateBucket:
+    # Hands out one slot per release(); each slot is expected to take `interval` seconds
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._slots = threading.Semaphore(0)
+
+    def acquire(self):
+        self._slots.acquire()
+
+    def release(self):
+        self._slots.release()
+
+    def expected_wait(self, requests: int) -> float:
+        return requests * self.interval
+
+def queued(scheduler: FairScheduler) -> int:
+    return sum(row["queued"] for row in scheduler.stats() if row["tenant"] == "all")
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def grant_order(scheduler: FairScheduler, bucket: GateBucket, requests):
+    # A first request holds the bucket while the others queue up in the given order, then slots are handed
+    # out one at a time so the order they are granted in is the scheduler's choice
+    granted, threads = [], []
+
+    def request(label, tenant, priority):
+        with tenant_scope(tenant, priority):
+            scheduler.acquire()
+        granted.append(label)
+
+    for index, (label, tenant, priority) in enumerate([("blocker", "blocker", INTERACTIVE), *requests]):
+        thread = threading.Thread(target=request, args=(label, tenant, priority))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: queued(scheduler) == index + 1)
+    for count in range(len(threads)):
+        bucket.release()
+        wait_until(lambda: len(granted) == count + 1)
+    for thread in threads:
+        thread.join(5)
+    return granted[1:]
+
+def test_interactive_requests_go_before_batch_ones():
+    bucket = GateBucket()
+    scheduler = FairScheduler(bucket)
+    order = grant_order(scheduler, bucket, [("report-1", "acme", BATCH), ("report-2", "acme", BATCH),
+                                            ("post", "globex", INTERACTIVE)])
+    assert order == ["post", "report-1", "report-2"]
+
+def test_tenants_take_turns_within_a_class():
+    bucket = GateBucket()
+    scheduler = FairScheduler(bucket)
+    order = grant_order(scheduler, bucket, [(f"acme-{n}", "acme", BATCH) for n in range(4)]
+                        + [("globex-0", "globex", BATCH)])
+    assert order == ["acme-0", "globex-0", "acme-1", "acme-2", "acme-3"]
+
+def test_weights_give_a_tenant_a_larger_share():
+    bucket = GateBucket()
+    scheduler = FairScheduler(bucket, weights={"acme": 2.0})
+    order = grant_order(scheduler, bucket, [(f"globex-{n}", "globex", BATCH) for n in range(2)]
+                        + [(f"acme-{n}", "acme", BATCH) for n in range(4)])
+    assert order == ["acme-0", "globex-0", "acme-1", "acme-2", "globex-1", "acme-3"]
+
+def test_aged_batch_requests_compete_with_interactive_ones():
+    bucket = GateBucket()
+    scheduler = FairScheduler(bucket, batch_aging=0.0)
+    order = grant_order(scheduler, bucket, [("report", "acme", BATCH), ("post", "globex", INTERACTIVE)])
+    assert order == ["report", "post"]
+
+def test_stats_count_served_requests():
+    bucket = GateBucket()
+    scheduler = FairScheduler(bucket)
+    grant_order(scheduler, bucket, [("report", "acme", BATCH)])
+    rows = {row["priority"]: row for row in scheduler.stats() if row["tenant"] == "all"}
+    assert rows[INTERACTIVE]["served"] == 1
+    assert rows[BATCH]["served"] == 1
+    assert rows[BATCH]["queued"] == 0
+
+def test_estimate_wait_counts_the_queue_ahead():
+    scheduler = FairScheduler(GateBucket(interval=2.0))
+    assert scheduler.estimate_wait(1, tenant="acme", priority=INTERACTIVE) == 2.0
+    # Later calls of a batch only compete with the caller's own earlier ones when nobody else is queued
+    assert scheduler.estimate_wait(3, tenant="acme", priority=INTERACTIVE) == 6.0
+
+def test_estimate_wait_with_other_tenants_queued():
+    bucket = GateBucket()
+    scheduler = FairScheduler(bucket)
+    threads = []
+    for index, tenant in enumerate(["blocker", "globex", "initech"]):
+        thread = threading.Thread(target=scheduler.acquire, args=(tenant, INTERACTIVE))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: queued(scheduler) == index + 1)
+    try:
+        # Three requests ahead, then acme's first call; its second takes turns with the three queued tenants
+        assert scheduler.estimate_wait(2, tenant="acme", priority=INTERACTIVE) == 3 + 1 + 4
+        # Batch requests wait behind every interactive one as well
+        assert scheduler.estimate_wait(1, tenant="acme", priority=BATCH) == 4
+    finally:
+        for _ in threads:
+            bucket.release()
+        for thread in threads:
+            thread.join(5)
+
+def test_admit_refuses_waits_over_the_class_limit():
+    scheduler = FairScheduler(GateBucket(interval=10.0), max_wait={INTERACTIVE: 25.0})
+    assert scheduler.admit(2, tenant="acme", priority=INTERACTIVE) == 20.0
+    with pytest.raises(AdmissionError) as refused:
+        scheduler.admit(3, tenant="acme", priority=INTERACTIVE)
+    assert (refused.value.expected_wait, refused.value.limit) == (30.0, 25.0)
+    # Batch work has no limit by default
+    assert scheduler.admit(100, tenant="acme", priority=BATCH) == 1000.0
@@ -0,0 +1,21 @@
+import time
+
+from fetcher import PageValidatorCache
+
+def test_least_recently_validated_pages_are_evicted(tmp_path):
+    cache = PageValidatorCache(str(tmp_path / "pages.sqlite3"), max_entries=2)
+    for url in ("https://a.test/", "https://b.test/"):
+        cache.set(url, '"v1"', None, "text/html", b"<h1>page</h1>")
+        time.sleep(0.01)
+    cache.touch("https://a.test/")
+    cache.set("https://c.test/", '"v1"', None, "text/html", b"<h1>page</h1>")
+    assert cache.get("https://b.test/") is None
+    assert cache.get("https://a.test/")["etag"] == '"v1"'
+    assert cache.stats() == {"entries": 2, "bytes": 2 * len(b"<h1>page</h1>")}
+
+def test_expired_pages_are_not_revalidated(tmp_path):
+    cache = PageValidatorCache(str(tmp_path / "pages.sqlite3"), ttl_seconds=0)
+    cache.set("https://a.test/", '"v1"', None, "text/html", b"body")
+    time.sleep(0.01)
+    assert cache.get("https://a.test/") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,82 @@
+import random
+import time
+
+import pytest
+
+import html_extract
+from html_extract import extract_seo_fields
+
+bs4 = pytest.importorskip("bs4")
+
+def beautifulsoup_seo_fields(markup: str):
+    # The extractor html_extract replaced, kept verbatim as the reference
+    soup = bs4.BeautifulSoup(markup, 'html.parser')
+    title = soup.title.string if soup.title else ""
+    meta_desc = soup.find("meta", {"name": "description"})
+    meta_desc = meta_desc["content"] if meta_desc else ""
+    h1_tags = [h1.text.strip() for h1 in soup.find_all("h1")]
+    return {"current_title": title, "current_meta": meta_desc, "current_h1": h1_tags}
+
+PAGES = [
+    "<html><head><title>Trail shoes</title><meta name='description' content='Grip'></head>"
+    "<body><h1>Trail <b>running</b> shoes</h1><h1>  Sale &amp; more </h1></body></html>",
+    "<head><title>T</title></head><body><!-- <h1>Old heading</h1> --><h1>New heading</h1></body>",
+    "<head><script>var banner = '<h1>Not a heading</h1>';</script></head><body><h1>Real</h1></body>",
+    "<head><script>document.write('<body>')</script><title>T</title><meta name=description content=D></head>",
+    "<head><style>h1:before { content: '<h1>'; }</style></head><body><h1>Styled</h1></body>",
+    "<title>A<b>B</b></title>",
+    "<title><b>Bold only</b></title>",
+    "<title></title><title>Second</title>",
+    "<title>   </title>",
+    "<body><h1>Unclosed heading<p>and the rest of the page",
+    "<head></head><body><meta name='description' content='Late'><h1>x</h1></body>",
+    "<div><h1>Closed by its parent</div>after",
+    "<h1>Outer<h1>Inner</h1>tail</h1>",
+    "<h1>Ruby<rt>ignored</rt> and <template>hidden</template>text</h1>",
+    "<h1>Refs &amp &foo; &#150; &#x41; &#1;</h1>",
+    "<h1><br>Line</br>break<br/>s</h1><h1/>",
+    "<svg><title>Icon</title></svg><title>Page</title>",
+    "<h1>a <b>x</b>   \n  <b>y</b></h1><pre><h1>  kept  <b>x</b>   </h1></pre>",
+]
+
+PIECES = ["<h1>", "</h1>", "<title>", "</title>", "<b>", "</b>", "<div>", "</div>", "<!--", "-->", "<script>",
+          "</script>", "<style>", "</style>", "<template>", "</template>", "<pre>", "</pre>", "<br>", "</br>",
+          "<br/>", "<h1/>", "<meta name=description content='M'>", "<meta name=description content=N/>",
+          "<head>", "</head>", "<body>", "text", " ", "\n", "&amp;", "&amp", "&foo;", "&#150;", "&#x41;",
+          "<![CDATA[c]]>", "<?pi?>", "<!DOCTYPE html>", "<rt>", "</rt>", "<textarea>", "</textarea>", "é", "<", ">",
+          "&", "'", "<a href='x>y'>", "</a>"]
+
+def random_pages(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(PIECES) for _ in range(rng.randint(1, 25))) for _ in range(count)]
+
+@pytest.mark.parametrize("markup", PAGES)
+def test_matches_beautifulsoup(markup):
+    assert extract_seo_fields(markup.encode("utf-8"), "text/html") == beautifulsoup_seo_fields(markup)
+
+@pytest.mark.parametrize("chunk_size", [html_extract.FEED_CHUNK_SIZE, 3])
+def test_matches_beautifulsoup_on_random_markup(monkeypatch, chunk_size):
+    monkeypatch.setattr(html_extract, "FEED_CHUNK_SIZE", chunk_size)
+    for markup in random_pages(2000):
+        assert extract_seo_fields(markup.encode("utf-8"), "text/html") == beautifulsoup_seo_fields(markup), markup
+
+def test_charset_from_the_page():
+    markup = "<meta charset='iso-8859-1'><title>Café</title><h1>Crème</h1>"
+    fields = extract_seo_fields(markup.encode("iso-8859-1"))
+    assert fields == beautifulsoup_seo_fields(markup)
+
+def test_description_without_content_is_empty():
+    # The old extractor raised KeyError here, which failed the whole page
+    assert extract_seo_fields(b"<meta name='description'><h1>x</h1>")["current_meta"] == ""
+
+def test_large_page_with_many_void_elements_stays_linear():
+    # A multi-MB listing page: every product card has void elements, some with stray end tags
+    card = ("<div class='card'><img src='/p.jpg' alt='Shoe'><br><input type='hidden' value='1'></br>"
+            "<a href='/p'>Trail shoe</a><span>$99</span></div>\n")
+    markup = ("<html><head><title>Shop</title><meta name='description' content='All shoes'></head>"
+              f"<body><h1>Shoes</h1>{card * 20000}<h1>Footer</h1></body></html>")
+    started = time.perf_counter()
+    fields = extract_seo_fields(markup.encode("utf-8"), "text/html")
+    # The quadratic version took well over 10 seconds on this page
+    assert time.perf_counter() - started < 5
+    assert fields == {"current_title": "Shop", "current_meta": "All shoes", "current_h1": ["Shoes", "Footer"]}
@@ -0,0 +1,52 @@
+import threading
+
+from jobs import JobStore
+
+def test_two_workers_never_claim_the_same_job(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    # Separate connections, as two worker processes would have
+    stores = [JobStore(path), JobStore(path)]
+    job_ids = {stores[0].create("report", {"index": index}) for index in range(40)}
+    claimed, claimed_lock = [], threading.Lock()
+
+    def drain(store):
+        while True:
+            job = store.claim_next()
+            if job is None:
+                return
+            with claimed_lock:
+                claimed.append(job["id"])
+
+    threads = [threading.Thread(target=drain, args=(store,)) for store in stores for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(job_ids)
+    assert all(stores[1].get(job_id)["status"] == "running" for job_id in job_ids)
+
+def test_stale_running_jobs_are_requeued_with_their_stages(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    stale, alive = store.create("report", {}), store.create("report", {})
+    assert store.claim_next()["id"] == stale
+    store.save_stage(stale, "seo", {"title": "T"})
+    store._conn.execute("UPDATE jobs SET heartbeat_at = heartbeat_at - 120 WHERE id = ?", (stale,))
+    assert store.claim_next()["id"] == alive
+
+    assert store.requeue_stale() == 1
+    assert store.get(stale)["status"] == "queued"
+    assert store.get(alive)["status"] == "running"
+    job = store.claim_next()
+    assert job["id"] == stale
+    assert store.stages(stale) == {"seo": {"title": "T"}}
+
+def test_running_job_is_not_requeued_by_resume(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("report", {})
+    store.claim_next()
+    store.requeue(job_id)
+    assert store.get(job_id)["status"] == "running"
+    store.finish(job_id, error="boom")
+    store.requeue(job_id)
+    assert store.get(job_id)["status"] == "queued"
+    assert store.get(job_id)["error"] is None
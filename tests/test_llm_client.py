@@ -0,0 +1,109 @@
+import time
+from types import SimpleNamespace
+
+import groq
+import httpx
+import pytest
+
+from llm_client import CircuitBreaker, CircuitOpenError, ResilientGroq, TokenBucket, shared_bucket, shared_scheduler
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+def outage():
+    return groq.APIConnectionError(request=REQUEST)
+
+def throttled():
+    return groq.RateLimitError("rate limited", response=httpx.Response(429, request=REQUEST), body=None)
+
+class Interrupted(BaseException):
+    pass
+
+class FakeClient:
+    # Plays back a script of exceptions and results for chat.completions.with_raw_response.create
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=self))
+
+    def create(self, **request):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return SimpleNamespace(headers={}, parse=lambda: outcome)
+
+def resilient(client, breaker, max_retries=0):
+    return ResilientGroq(client, TokenBucket(60000), breaker, max_retries=max_retries, base_delay=0)
+
+def open_breaker(client, breaker):
+    llm = resilient(client, breaker)
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(groq.APIConnectionError):
+            llm.create()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        llm.create()
+    time.sleep(breaker.reset_timeout + 0.01)
+    assert breaker.state == "half_open"
+    return llm
+
+def test_breaker_opens_after_consecutive_failures_and_closes_on_probe_success():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    llm = open_breaker(FakeClient(outage(), outage()), breaker)
+    assert llm.create() == "ok"
+    assert breaker.state == "closed"
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    llm = open_breaker(FakeClient(outage(), outage(), outage()), breaker)
+    with pytest.raises(groq.APIConnectionError):
+        llm.create()
+    assert breaker.state == "open"
+
+def test_throttled_probe_does_not_lock_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    llm = open_breaker(FakeClient(outage(), outage(), throttled()), breaker)
+    with pytest.raises(groq.RateLimitError):
+        llm.create()
+    assert llm.create() == "ok"
+    assert llm.create() == "ok"
+    assert breaker.state == "closed"
+
+def test_throttled_probe_retries_within_the_same_call():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    client = FakeClient(outage(), outage(), throttled())
+    open_breaker(client, breaker)
+    assert resilient(client, breaker, max_retries=2).create() == "ok"
+    assert breaker.state == "closed"
+
+def test_interrupted_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    llm = open_breaker(FakeClient(outage(), outage(), Interrupted()), breaker)
+    with pytest.raises(Interrupted):
+        llm.create()
+    assert llm.create() == "ok"
+    assert breaker.state == "closed"
+
+def test_only_one_probe_at_a_time():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    probe = breaker.before_call()
+    assert probe is not None
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    # A stale release from someone else's probe token changes nothing
+    breaker.release_probe(object())
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release_probe(probe)
+    assert breaker.before_call() is not None
+
+def test_every_rate_shares_one_bucket_and_scheduler():
+    bucket = shared_bucket(30)
+    scheduler = shared_scheduler(30)
+    assert shared_bucket(120) is bucket
+    assert shared_scheduler(60) is scheduler
+    assert scheduler.bucket is bucket
+    assert bucket.requests_per_minute == 60
+    assert bucket.rate == 1.0
@@ -0,0 +1,97 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from competitor_store import CompetitorStore
+from completion_cache import CompletionCache
+from monitor import MonitorDaemon, MonitorStore, next_run, parse_cron
+from results_store import ResultsStore
+
+# 2026-10-17 is a Saturday
+SATURDAY_NOON = datetime(2026, 10, 17, 12, 0)
+
+def test_parse_cron_fields():
+    minutes, hours, days, months, weekdays = parse_cron("*/15 9-17/4 1,15 * 1-5")
+    assert minutes == {0, 15, 30, 45}
+    assert hours == {9, 13, 17}
+    assert days == {1, 15}
+    assert months == set(range(1, 13))
+    assert weekdays == {1, 2, 3, 4, 5}
+
+def test_parse_cron_step_from_a_start_value():
+    assert parse_cron("5/20 * * * *")[0] == {5, 25, 45}
+
+def test_parse_cron_sunday_is_0_and_7():
+    assert parse_cron("0 0 * * 7")[4] == {0}
+    assert parse_cron("0 0 * * 5-7")[4] == {0, 5, 6}
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "* * * 13 *",
+                                        "* * * * 8", "5-1 * * * *"])
+def test_parse_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        parse_cron(expression)
+
+@pytest.mark.parametrize("expression, expected", [
+    ("* * * * *", datetime(2026, 10, 17, 12, 1)),
+    ("30 * * * *", datetime(2026, 10, 17, 12, 30)),
+    ("0 6 * * *", datetime(2026, 10, 18, 6, 0)),
+    ("0 6 * * 1", datetime(2026, 10, 19, 6, 0)),
+    ("0 6 * * 0", datetime(2026, 10, 18, 6, 0)),
+    ("0 0 1 * *", datetime(2026, 11, 1, 0, 0)),
+    ("0 0 1 1 *", datetime(2027, 1, 1, 0, 0)),
+    ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+])
+def test_next_run(expression, expected):
+    assert next_run(expression, SATURDAY_NOON) == expected
+
+def test_next_run_is_strictly_after():
+    assert next_run("0 12 * * *", SATURDAY_NOON) == datetime(2026, 10, 18, 12, 0)
+    assert next_run("0 12 * * *", SATURDAY_NOON.replace(second=30)) == datetime(2026, 10, 18, 12, 0)
+
+def test_next_run_restricted_day_fields_match_either():
+    # The 20th is a Tuesday; the first Monday after the 17th comes sooner
+    assert next_run("0 0 20 * 1", SATURDAY_NOON) == datetime(2026, 10, 19, 0, 0)
+    assert next_run("0 0 18 * 3", SATURDAY_NOON) == datetime(2026, 10, 18, 0, 0)
+
+def test_next_run_day_of_month_with_any_weekday():
+    assert next_run("0 0 20 * *", SATURDAY_NOON) == datetime(2026, 10, 20, 0, 0)
+
+def test_next_run_never_matching_expression():
+    with pytest.raises(ValueError):
+        next_run("0 0 31 2 *", SATURDAY_NOON)
+
+class FlakyLLM:
+    def __init__(self):
+        self.failing = False
+
+    def create(self, **request):
+        if self.failing:
+            raise RuntimeError("rate limited")
+        message = SimpleNamespace(content="Rival leads on trail gear")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+def test_failed_llm_call_keeps_the_previous_result(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    store = MonitorStore(str(tmp_path / "monitor.sqlite3"))
+    daemon = MonitorDaemon(store=store)
+    daemon.calls_per_minute = 1e9
+    system = daemon.marketing_system
+    system.cache = CompletionCache(str(tmp_path / "cache.sqlite3"))
+    system.competitor_store = CompetitorStore(str(tmp_path / "competitors.sqlite3"))
+    system.results_store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    system.site_index = SimpleNamespace(context_for=lambda url, query, refresh=False: "")
+    system._competitor_fingerprints = lambda competitors: dict.fromkeys(competitors)
+    system._llm = FlakyLLM()
+    schedule_id = store.add_schedule("acme", "competitors",
+                                     {"competitors": ["rival.example"], "keywords": ["trail gear"]}, "0 6 * * 1")
+
+    assert daemon.run_due(now=time.time() + 8 * 24 * 3600) == 1
+    first = store.latest(schedule_id)
+    assert first["result"]["rival.example"]["quick_summary"] == "Rival leads on trail gear"
+
+    system._llm.failing = True
+    assert daemon.run_due(now=time.time() + 16 * 24 * 3600) == 1
+    assert store.latest(schedule_id) == first
@@ -0,0 +1,64 @@
+import pytest
+
+from results_store import ResultsStore, brand_scope
+
+@pytest.fixture(params=["fts5", "like"])
+def store(request, tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    if request.param == "like":
+        # As on an SQLite build without FTS5
+        store.full_text = False
+    elif not store.full_text:
+        pytest.skip("SQLite has no FTS5")
+    return store
+
+def record_runs(store):
+    store.record("seo_optimizer", {"url": "https://acme.example", "keywords": ["trail gear"]},
+                 {"recommendations": "Shorten the title"}, 1.0, brand="Acme", started_at=100)
+    store.record("competitor_watchdog", {"competitors": ["rival.example", "other.example"], "keywords": ["shoes"]},
+                 {"rival.example": {"quick_summary": "Strong on running shoes"}}, 2.0, brand="Acme", started_at=200)
+    store.record("competitor_watchdog", {"competitors": ["other.example"], "keywords": ["socks"]},
+                 {"other.example": {"quick_summary": "Wool socks"}}, 2.0, brand="Beta", started_at=300)
+
+def first_keywords(page):
+    return [run["inputs"].get("keywords", [None])[0] for run in page["runs"]]
+
+def test_search_matches_inputs_and_outputs(store):
+    record_runs(store)
+    assert first_keywords(store.history(query="running shoes")) == ["shoes"]
+    assert first_keywords(store.history(query="title")) == ["trail gear"]
+    assert first_keywords(store.history(query="acme.example")) == ["trail gear"]
+    assert store.history(query="nothing like this")["total"] == 0
+
+def test_search_input_is_not_query_syntax(store):
+    record_runs(store)
+    assert store.history(query='socks" OR "shoes')["total"] == 0
+    assert first_keywords(store.history(query="Wool socks", brand="Beta")) == ["socks"]
+
+def test_competitor_filter(store):
+    record_runs(store)
+    assert first_keywords(store.history(competitor="other.example")) == ["socks", "shoes"]
+    assert first_keywords(store.history(competitor="rival.example")) == ["shoes"]
+    assert store.history(competitor="rival.example", brand="Beta")["total"] == 0
+    assert store.competitors() == ["other.example", "rival.example"]
+
+def test_pagination_boundaries(store):
+    for index in range(5):
+        store.record("post_creator", {"topic": f"topic {index}"}, "post", 1.0, started_at=100 + index)
+    first = store.history(page_size=2)
+    assert [run["inputs"]["topic"] for run in first["runs"]] == ["topic 4", "topic 3"]
+    assert (first["total"], first["pages"]) == (5, 3)
+    last = store.history(page=3, page_size=2)
+    assert [run["inputs"]["topic"] for run in last["runs"]] == ["topic 0"]
+    assert store.history(page=4, page_size=2)["runs"] == []
+    # Pages below the first are clamped to it
+    assert store.history(page=0, page_size=2)["runs"] == first["runs"]
+    assert store.history(page_size=5)["pages"] == 1
+    assert store.history(tool="missing")["pages"] == 1
+
+def test_brand_comes_from_the_scope(store):
+    with brand_scope("Acme"):
+        run_id = store.record("post_creator", {"topic": "t"}, "post", 1.0)
+    assert store.get(run_id)["brand"] == "Acme"
+    assert store.brands() == ["Acme"]
+    assert store.history(since=0, until=1)["total"] == 0
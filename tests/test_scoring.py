@@ -0,0 +1,58 @@
+import math
+
+import pandas as pd
+
+from scoring import latest_run, scores_frame, scoring_matrix
+
+METRICS = ["Content", "Keywords"]
+
+def run(run_at, scores):
+    return [(competitor, metric, score, run_at)
+            for competitor, by_metric in scores.items() for metric, score in by_metric.items()]
+
+def test_ranks_and_bands_within_each_run():
+    history = scores_frame(run(100, {"a": {"Content": 80, "Keywords": 60}, "b": {"Content": 90, "Keywords": 90},
+                                     "c": {"Content": 50, "Keywords": 50}, "d": {"Content": 70, "Keywords": 70}}))
+    matrix = scoring_matrix(history, METRICS).reset_index(level="run_at")
+    assert matrix["composite"].to_dict() == {"a": 70.0, "b": 90.0, "c": 50.0, "d": 70.0}
+    assert matrix["rank"].to_dict() == {"a": 2, "b": 1, "c": 4, "d": 2}
+    assert matrix.loc["b", "band"] == "Top quartile"
+    assert matrix.loc["c", "band"] == "Bottom quartile"
+
+def test_weights_change_the_composite():
+    history = scores_frame(run(100, {"a": {"Content": 80, "Keywords": 40}}))
+    matrix = scoring_matrix(history, METRICS, weights={"Content": 3.0})
+    assert matrix["composite"].iloc[0] == 70.0
+
+def test_changes_are_against_the_same_competitors_previous_run():
+    history = scores_frame(run(100, {"a": {"Content": 60, "Keywords": 60}, "b": {"Content": 80, "Keywords": 80}})
+                           + run(200, {"a": {"Content": 75, "Keywords": 65}})
+                           + run(300, {"a": {"Content": 70, "Keywords": 65}, "b": {"Content": 90, "Keywords": 80}}))
+    matrix = scoring_matrix(history, METRICS)
+    a = matrix.xs("a", level="competitor")
+    assert math.isnan(a["Content change"].iloc[0])
+    assert a["Content change"].tolist()[1:] == [15.0, -5.0]
+    assert a["composite change"].tolist()[1:] == [10.0, -2.5]
+    # b skipped the second run, so its change spans from the first run to the third
+    assert matrix.xs("b", level="competitor")["Content change"].tolist()[1:] == [10.0]
+    latest = latest_run(matrix)
+    assert latest.index.tolist() == ["b", "a"]
+    assert latest["run_at"].tolist() == [pd.Timestamp(300, unit="s")] * 2
+
+def test_missing_metric_drops_out_of_the_composite():
+    history = scores_frame(run(100, {"a": {"Content": 80}, "b": {"Content": 60, "Keywords": 100}}))
+    matrix = scoring_matrix(history, METRICS).reset_index(level="run_at")
+    assert math.isnan(matrix.loc["a", "Keywords"])
+    assert matrix["composite"].to_dict() == {"a": 80.0, "b": 80.0}
+
+def test_no_scored_metrics_gives_no_composite():
+    history = scores_frame(run(100, {"a": {"Other": 50}, "b": {"Content": 60}}))
+    matrix = scoring_matrix(history, METRICS).reset_index(level="run_at")
+    assert math.isnan(matrix.loc["a", "composite"])
+    assert matrix.loc["b", "rank"] == 1
+
+def test_empty_history():
+    matrix = scoring_matrix(scores_frame([]), METRICS)
+    assert matrix.empty
+    assert {"composite", "rank", "band", "composite change"} <= set(matrix.columns)
+    assert latest_run(matrix).empty
@@ -0,0 +1,98 @@
+import hashlib
+import re
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("faiss")
+import numpy as np
+
+import semantic_cache
+from completion_cache import CompletionCache
+from competitor_store import CompetitorStore
+from marketing_agency import MarketingAgencyAutomation
+from results_store import ResultsStore
+from semantic_cache import SemanticCache
+
+DIMENSION = 256
+
+class BagOfWordsModel:
+    # Stands in for the sentence-transformers model: texts sharing most of their words come out close
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, texts, normalize_embeddings=True, convert_to_numpy=True):
+        vectors = np.zeros((len(texts), DIMENSION), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIMENSION] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+class EchoLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        message = SimpleNamespace(content=f"post {self.calls}")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "load_embedding_model", lambda model_name: BagOfWordsModel())
+    return SemanticCache(str(tmp_path / "semantic.sqlite3"))
+
+@pytest.fixture
+def system(tmp_path, monkeypatch, cache):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    system = MarketingAgencyAutomation(cache=CompletionCache(str(tmp_path / "cache.sqlite3")),
+                                       competitor_store=CompetitorStore(str(tmp_path / "competitors.sqlite3")),
+                                       results_store=ResultsStore(str(tmp_path / "results.sqlite3")),
+                                       semantic_cache=cache)
+    system._llm = EchoLLM()
+    return system
+
+def test_posts_on_different_topics_do_not_collide(system):
+    retail = system.post_creator("AI in retail", "LinkedIn")["content"]
+    banking = system.post_creator("AI in banking", "LinkedIn")["content"]
+    assert retail != banking
+    assert system.llm.calls == 2
+
+def test_near_duplicate_topic_reuses_the_post(system):
+    post = system.post_creator("AI in retail", "LinkedIn")["content"]
+    assert system.post_creator("AI in Retail", "LinkedIn")["content"] == post
+    assert system.llm.calls == 1
+    # Platform and tone must match exactly
+    assert system.post_creator("AI in Retail", "Twitter")["content"] != post
+    assert system.post_creator("AI in Retail", "LinkedIn", tone="playful")["content"] != post
+    assert system.llm.calls == 3
+
+def test_near_identical_segments_reuse_subject_lines(system):
+    new_customers = {"segment_name": "New Customers", "characteristics": "First-time Buyers"}
+    lines = system.generate_subject_lines("Promotional", new_customers)
+    assert system.generate_subject_lines("Promotional", {"segment_name": "New customers",
+                                                         "characteristics": "First-time buyers"}) == lines
+    assert system.llm.calls == 1
+    # Another segment or another campaign type gets its own subject lines
+    assert system.generate_subject_lines("Promotional", {"segment_name": "Returning Customers",
+                                                         "characteristics": "Repeat Customers"}) != lines
+    assert system.generate_subject_lines("Newsletter", new_customers) != lines
+    assert system.llm.calls == 3
+
+def test_entries_of_other_namespaces_do_not_crowd_out_a_match(cache):
+    for index in range(20):
+        cache.set("AI in retail", f"other|{index}", f"other {index}")
+    cache.set("AI in retail", "post_creator", "mine")
+    assert cache.get("AI in Retail", "post_creator") == "mine"
+    assert cache.get("AI in retail", "missing") is None
+
+def test_index_writes_are_batched_and_rebuilt_when_stale(cache, tmp_path, monkeypatch):
+    cache.set("AI in retail", "post_creator", "first")
+    written = []
+    monkeypatch.setattr(cache, "_write_index", lambda: written.append(True))
+    cache.set("AI in banking", "post_creator", "second")
+    cache.set("AI in farming", "post_creator", "third")
+    assert written == []
+    # A process that never flushed leaves a stale file; the next load rebuilds it from the stored rows
+    reopened = SemanticCache(str(tmp_path / "semantic.sqlite3"))
+    assert reopened.get("AI in farming", "post_creator") == "third"
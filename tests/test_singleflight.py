@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from singleflight import ABANDONED, SingleFlight
+
+class Interrupted(BaseException):
+    pass
+
+def start_follower(flights, key, fn, outcomes):
+    def follow():
+        try:
+            outcomes.append(flights.do(key, fn))
+        except Exception as e:
+            outcomes.append(e)
+    thread = threading.Thread(target=follow)
+    thread.start()
+    return thread
+
+def wait_for_follower(flights):
+    for _ in range(1000):
+        if flights.collapsed:
+            return
+        threading.Event().wait(0.001)
+    raise AssertionError("follower never joined the flight")
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    outcomes = []
+    leader = start_follower(flights, "key", slow, outcomes)
+    while not flights.executed:
+        threading.Event().wait(0.001)
+    follower = start_follower(flights, "key", slow, outcomes)
+    wait_for_follower(flights)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert len(calls) == 1
+    assert sorted(outcomes, key=lambda outcome: outcome[1]) == [("answer", False), ("answer", True)]
+    assert flights.stats()["in_flight"] == 0
+
+def test_nothing_is_kept_after_the_flight():
+    flights = SingleFlight("test")
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+    assert flights.executed == 2
+
+def test_exceptions_are_shared_with_followers():
+    flights = SingleFlight("test")
+    future, leader = flights.join("key")
+    outcomes = []
+    follower = start_follower(flights, "key", lambda: "retried", outcomes)
+    wait_for_follower(flights)
+    flights.finish("key", future, error=ValueError("down"))
+    follower.join(5)
+    assert isinstance(outcomes[0], ValueError)
+
+def test_interrupted_leader_hands_the_call_to_a_follower():
+    flights = SingleFlight("test")
+    future, leader = flights.join("key")
+    outcomes = []
+    follower = start_follower(flights, "key", lambda: "retried", outcomes)
+    wait_for_follower(flights)
+    flights.finish("key", future, error=Interrupted())
+    follower.join(5)
+    assert future.result() is ABANDONED
+    assert outcomes == [("retried", False)]
+    assert flights.executed == 2
+
+def test_interrupted_leader_still_raises_and_releases_the_key():
+    flights = SingleFlight("test")
+
+    def interrupted():
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        flights.do("key", interrupted)
+    assert flights.stats()["in_flight"] == 0
+    assert flights.do("key", lambda: "fresh") == ("fresh", False)
+
+def test_disabled_group_runs_every_call():
+    flights = SingleFlight("test")
+    flights.enabled = False
+    future, leader = flights.join("key")
+    other, other_leader = flights.join("key")
+    assert leader and other_leader and other is not future
+    flights.finish("key", other, result="mine")
+    flights.finish("key", future, result="theirs")
+    assert (future.result(), other.result()) == ("theirs", "mine")
+    assert flights.collapsed == 0
@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from marketing_agency import TaskGraph
+
+def test_failed_node_still_reports_a_sibling_that_finishes_later():
+    failed = threading.Event()
+    completed = []
+
+    def fail():
+        failed.set()
+        raise RuntimeError("stage failed")
+
+    def slow():
+        # Finishes only after its sibling has already failed
+        failed.wait(5)
+        return "done"
+
+    graph = TaskGraph(max_workers=2)
+    graph.add("slow", slow)
+    graph.add("fail", fail)
+    graph.add("after", lambda slow, fail: "never", depends_on=["slow", "fail"])
+    with pytest.raises(RuntimeError, match="stage failed"):
+        graph.run(on_complete=lambda name, result, done, total: completed.append((name, result)))
+    assert completed == [("slow", "done")]
+
+def test_completed_nodes_are_not_run_again():
+    calls = []
+    graph = TaskGraph()
+    graph.add("a", lambda: calls.append("a") or 1)
+    graph.add("b", lambda a: a + 1, depends_on=["a"])
+    assert graph.run(completed={"a": 5}) == {"a": 5, "b": 6}
+    assert calls == []
@@ -0,0 +1,27 @@
+from telemetry import Tracer, tool_span
+
+def prometheus_values(tracer):
+    return dict(line.rsplit(" ", 1) for line in tracer.to_prometheus().splitlines() if not line.startswith("#"))
+
+def test_prometheus_counters_never_decrease_when_records_roll_off():
+    tracer = Tracer(max_records=2)
+    with tool_span("seo_optimizer"):
+        for _ in range(5):
+            tracer.record_llm("model", 0.5, "miss", prompt_tokens=10, completion_tokens=20)
+        tracer.record_llm("model", 0.5, "miss", error="timeout")
+    assert len(tracer.snapshot()) == 2
+    values = prometheus_values(tracer)
+    assert values['brandpulse_llm_calls_total{cache="miss",tool="seo_optimizer"}'] == "6"
+    assert values['brandpulse_llm_errors_total{tool="seo_optimizer"}'] == "1"
+    assert values['brandpulse_llm_tokens_total{tool="seo_optimizer",type="completion"}'] == "100"
+    assert values['brandpulse_llm_latency_seconds_count{tool="seo_optimizer"}'] == "6"
+    # Clearing the recent window does not reset the counters either
+    tracer.clear()
+    assert prometheus_values(tracer) == values
+
+def test_summary_covers_the_recent_window_only():
+    tracer = Tracer(max_records=2)
+    with tool_span("post_creator"):
+        for _ in range(3):
+            tracer.record_http("https://example.com", 0.1, status=200, size=100)
+    assert [row["calls"] for row in tracer.summary()] == [2]